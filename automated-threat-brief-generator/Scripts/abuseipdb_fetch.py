@@ -1,6 +1,6 @@
 import os
-import requests
-from datetime import datetime
+import http_client
+import abuseipdb_snapshot
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,18 +15,14 @@ def fetch_abuseipdb_data():
         "Accept": "application/json",
         "Key": API_KEY
     }
-    response = requests.get(url, headers=headers, params=params)
+    response = http_client.get(url, headers=headers, params=params, cache="abuseipdb")
     if response.status_code != 200:
         raise Exception(f"Error: {response.status_code}")
     return response.json()
 
 def save_to_file(data):
-    timestamp = datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')
-    filename = f"../data/abuseipdb_{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        import json
-        json.dump(data, f, indent=2)
-    print(f"[+] Saved AbuseIPDB data to {filename}")
+    # Packed snapshot plus an added/removed diff against the previous pull
+    abuseipdb_snapshot.save_snapshot(data.get("data", []))
 
 if __name__ == "__main__":
     print("[*] Fetching high-confidence IPs from AbuseIPDB...")
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import bisect
+import argparse
+import ipaddress
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+import ioc_store
+import snapshot_catalog
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+
+# === Snapshot Layout ===
+# header | v4 addresses (4 bytes each, sorted) | v6 addresses (16 bytes each, sorted)
+#        | last reported (uint32 epoch seconds, little endian) | score (uint8)
+# Addresses are stored big endian so byte order equals numeric order, and the
+# columns follow the v4 block then the v6 block.
+MAGIC = b"ABIP"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xIIQ8x")  # magic, version, v4 count, v6 count, created (epoch)
+EXTENSION = ".abip"
+FORMAT = "abip"  # catalog format; legacy abuseipdb_*.json dumps are catalogued as "json" and skipped here
+
+def _to_epoch(value):
+    if not value:
+        return 0
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+def _from_epoch(value):
+    if not value:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+def _uint32_column(values):
+    column = array("I", values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+# === Writer ===
+def write_snapshot(records, path):
+    # records are AbuseIPDB blacklist entries (ipAddress, abuseConfidenceScore, lastReportedAt)
+    v4, v6 = {}, {}
+    for record in records:
+        try:
+            ip = ipaddress.ip_address(record["ipAddress"])
+        except (KeyError, ValueError):
+            continue
+        row = (int(record.get("abuseConfidenceScore") or 0), _to_epoch(record.get("lastReportedAt")))
+        (v4 if ip.version == 4 else v6)[ip.packed] = row
+
+    v4_keys = sorted(v4)
+    v6_keys = sorted(v6)
+    rows = [v4[k] for k in v4_keys] + [v6[k] for k in v6_keys]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(v4_keys), len(v6_keys), int(datetime.now(timezone.utc).timestamp())))
+        f.write(b"".join(v4_keys))
+        f.write(b"".join(v6_keys))
+        f.write(_uint32_column(row[1] for row in rows))
+        f.write(bytes(min(max(row[0], 0), 255) for row in rows))
+    os.replace(tmp, path)
+    return path
+
+# === Reader ===
+class _Packed:
+    # Fixed-width view over a sorted address block, usable with bisect
+    def __init__(self, view, width):
+        self.view = view
+        self.width = width
+
+    def __len__(self):
+        return len(self.view) // self.width
+
+    def __getitem__(self, i):
+        return bytes(self.view[i * self.width:(i + 1) * self.width])
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.v4_count, self.v6_count, self.created = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not an AbuseIPDB snapshot (v{VERSION})")
+
+        self._view = memoryview(self._mmap)
+        offset = HEADER.size
+        self.v4 = _Packed(self._view[offset:offset + 4 * self.v4_count], 4)
+        offset += 4 * self.v4_count
+        self.v6 = _Packed(self._view[offset:offset + 16 * self.v6_count], 16)
+        offset += 16 * self.v6_count
+        self._last_reported = self._view[offset:offset + 4 * len(self)]
+        offset += 4 * len(self)
+        self._scores = self._view[offset:offset + len(self)]
+
+    def __len__(self):
+        return self.v4_count + self.v6_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for name in ("v4", "v6"):
+            if hasattr(self, name):
+                getattr(self, name).view.release()
+        for name in ("_last_reported", "_scores", "_view"):
+            if hasattr(self, name):
+                getattr(self, name).release()
+        self._mmap.close()
+        self._file.close()
+
+    def _row(self, index):
+        last_reported = struct.unpack_from("<I", self._last_reported, index * 4)[0]
+        return self._scores[index], last_reported
+
+    def _locate(self, packed):
+        block, base = (self.v4, 0) if len(packed) == 4 else (self.v6, self.v4_count)
+        i = bisect.bisect_left(block, packed)
+        if i < len(block) and block[i] == packed:
+            return base + i
+        return None
+
+    def __contains__(self, ip):
+        return self._locate(ipaddress.ip_address(ip).packed) is not None
+
+    def lookup(self, ip):
+        index = self._locate(ipaddress.ip_address(ip).packed)
+        if index is None:
+            return None
+        return self.record(index)
+
+    def record(self, index):
+        if index < self.v4_count:
+            packed = self.v4[index]
+        else:
+            packed = self.v6[index - self.v4_count]
+        score, last_reported = self._row(index)
+        return {
+            "ipAddress": str(ipaddress.ip_address(packed)),
+            "abuseConfidenceScore": score,
+            "lastReportedAt": _from_epoch(last_reported)
+        }
+
+    def addresses(self):
+        # packed address -> record index, for joining many addresses at once
+        index = {}
+        for block, width, base in ((self.v4, 4, 0), (self.v6, 16, self.v4_count)):
+            data = block.view.tobytes()
+            index.update((data[i:i + width], base + i // width) for i in range(0, len(data), width))
+        return index
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+# === Diffs ===
+def _merge_diff(old_block, new_block):
+    # One linear merge over two sorted address blocks
+    added, removed = [], []
+    i = j = 0
+    while i < len(old_block) and j < len(new_block):
+        a, b = old_block[i], new_block[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            removed.append(i)
+            i += 1
+        else:
+            added.append(j)
+            j += 1
+    removed.extend(range(i, len(old_block)))
+    added.extend(range(j, len(new_block)))
+    return added, removed
+
+def diff_snapshots(old, new):
+    added_v4, removed_v4 = _merge_diff(old.v4, new.v4)
+    added_v6, removed_v6 = _merge_diff(old.v6, new.v6)
+    added = [new.record(i) for i in added_v4] + [new.record(new.v4_count + i) for i in added_v6]
+    removed = [old.record(i)["ipAddress"] for i in removed_v4] + \
+              [old.record(old.v4_count + i)["ipAddress"] for i in removed_v6]
+    return {"added": added, "removed": removed}
+
+# === Snapshot Files ===
+def list_snapshots(directory=data_path):
+    # Oldest first, from the snapshot catalog
+    return [row["path"] for row in snapshot_catalog.snapshots("abuseipdb", fmt=FORMAT, directory=directory)]
+
+def latest_snapshot(directory=data_path):
+    return snapshot_catalog.latest("abuseipdb", fmt=FORMAT, directory=directory)
+
+def save_snapshot(records, directory=data_path, content_hash=None):
+    # Write a new snapshot plus an added/removed diff against the previous one.
+    # content_hash identifies the response the records came from (defaults to the file hash).
+    directory = Path(directory)
+    previous = latest_snapshot(directory)
+    fetched_at = datetime.utcnow()
+    timestamp = fetched_at.strftime('%Y-%m-%d_%H%M%S')
+    path = write_snapshot(records, directory / f"abuseipdb_{timestamp}{EXTENSION}")
+    with Snapshot(path) as snapshot:
+        count = len(snapshot)
+    snapshot_catalog.record("abuseipdb", path, count, content_hash, fetched_at, FORMAT)
+    print(f"[+] Saved AbuseIPDB snapshot to {path}")
+    ioc_store.ingest_abuseipdb(records)
+
+    if previous and previous != path:
+        with Snapshot(previous) as old, Snapshot(path) as new:
+            diff = diff_snapshots(old, new)
+        diff = {"previous": previous.name, "current": path.name, **diff}
+        diff_path = snapshot_catalog.save_json(diff, "abuseipdb_diff", directory, timestamp, indent=None)
+        print(f"[+] AbuseIPDB diff: {len(diff['added'])} added, {len(diff['removed'])} removed -> {diff_path}")
+    return path
+
+def convert_json_snapshot(json_path):
+    # Turn a legacy abuseipdb_*.json dump into the packed format next to it
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("data", [])
+    return write_snapshot(data, Path(json_path).with_suffix(EXTENSION))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect packed AbuseIPDB blacklist snapshots")
+    parser.add_argument("--convert", nargs="+", metavar="JSON", help="convert legacy abuseipdb_*.json files")
+    args = parser.parse_args()
+
+    if args.convert:
+        for json_file in args.convert:
+            print(f"[+] {json_file} -> {convert_json_snapshot(json_file)}")
+        sys.exit(0)
+
+    snapshots = list_snapshots()
+    if len(snapshots) < 2:
+        print("[-] Need at least two AbuseIPDB snapshots to show what's new.")
+        sys.exit(1)
+    with Snapshot(snapshots[-2]) as old, Snapshot(snapshots[-1]) as new:
+        diff = diff_snapshots(old, new)
+        print(f"[*] {snapshots[-2].name} -> {snapshots[-1].name} ({len(new)} IPs)")
+    print(f"[+] {len(diff['added'])} added, {len(diff['removed'])} removed")
+    for record in diff["added"][:20]:
+        print(f"    + {record['ipAddress']} (score {record['abuseConfidenceScore']})")
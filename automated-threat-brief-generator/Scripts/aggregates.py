@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import hashlib
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import indicators
+import ndjson_snapshot
+import snapshot_catalog
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+aggregates_file = data_path / "aggregates.sqlite"
+
+SCHEMA_VERSION = 2
+DIMENSIONS = ("family", "tag", "threat_type", "technique")
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+HOUR_FORMAT = "%Y-%m-%dT%H"
+# A record (OTX pulse, ThreatFox IOC) is counted at most once in this many hours: a pulse that
+# is modified again comes back in the next OTX delta, and full snapshots fetched before the
+# syncs were incremental (several a day) repeat most records.
+DEDUP_HOURS = 24
+
+# Counts are kept per hour of fetch time, so "the last 24h" is a rolling window rather than
+# the current UTC day. AbuseIPDB snapshots are full blacklists and are not aggregated here.
+PARSERS = {
+    "otx": indicators.parse_otx,
+    "threatfox": indicators.parse_threatfox
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hourly_counts (
+    dimension TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, hour, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingested (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counted_records (
+    source TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    counted_at TEXT NOT NULL,
+    PRIMARY KEY (source, record_id)
+) WITHOUT ROWID;
+"""
+# Version 1 counted per UTC day without deduplication; its tables are dropped and every
+# catalogued snapshot is counted again
+UPGRADE = """
+DROP TABLE IF EXISTS daily_counts;
+DROP TABLE IF EXISTS ingested;
+"""
+
+# === Database ===
+def connect():
+    data_path.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(aggregates_file, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        with conn:
+            conn.executescript(UPGRADE + SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+# === Ingest ===
+def _technique_lookup():
+    # Family -> ATT&CK technique names, when a mapping is available
+    from malware_resolver import MalwareResolver
+    resolver = MalwareResolver.from_cache()
+    return resolver.techniques_for if resolver.entries else None
+
+def record_id(record):
+    # OTX pulses and ThreatFox IOCs carry an id; anything else is identified by its content
+    if isinstance(record, dict) and record.get("id") is not None:
+        return str(record["id"])
+    return hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def count_snapshot(source, path, techniques_for=None, fresh=None):
+    # fresh(record) -> False skips a record that was already counted
+    counts = {dimension: Counter() for dimension in DIMENSIONS}
+    records = 0
+    raw = ndjson_snapshot.iter_records(path)
+    for item in PARSERS[source](filter(fresh, raw) if fresh else raw):
+        records += 1
+        if item.family:
+            counts["family"][item.family] += 1
+            if techniques_for:
+                counts["technique"].update(techniques_for(item.family))
+        counts["tag"].update(item.tags)
+        if item.threat_type:
+            counts["threat_type"][item.threat_type] += 1
+    return counts, records
+
+def update():
+    # Fold every catalogued snapshot that has not been counted yet into the hourly totals,
+    # oldest first. Each snapshot is claimed, deduplicated and added in one transaction, so two
+    # reports updating at the same time never count a snapshot (or a record) twice.
+    conn = connect()
+    techniques_for = None
+    ingested = 0
+    try:
+        done = {row[0] for row in conn.execute("SELECT path FROM ingested")}
+        for source in PARSERS:
+            for snapshot in snapshot_catalog.snapshots(source):
+                path = snapshot["path"].name  # timestamped, so unique per source
+                if path in done:
+                    continue
+                if techniques_for is None:
+                    techniques_for = _technique_lookup() or False
+                fetched_at = snapshot["fetched_at"]
+                hour = fetched_at[:13]
+                with conn:
+                    claimed = conn.execute("INSERT OR IGNORE INTO ingested VALUES (?, ?, ?, 0, ?)",
+                                           (path, source, fetched_at, datetime.utcnow().isoformat(timespec="seconds")))
+                    if not claimed.rowcount:
+                        continue  # counted by another process meanwhile
+                    fresh = _fresh_records(conn, source, fetched_at)
+                    counts, records = count_snapshot(source, snapshot["path"], techniques_for, fresh)
+                    conn.execute("UPDATE ingested SET records = ? WHERE path = ?", (records, path))
+                    conn.executemany(
+                        "INSERT INTO hourly_counts (dimension, hour, key, count) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (dimension, hour, key) DO UPDATE SET count = count + excluded.count",
+                        [(dimension, hour, key, n) for dimension, counter in counts.items() for key, n in counter.items()])
+                ingested += 1
+        # Only the last DEDUP_HOURS of counted ids matter for records still to come
+        cutoff = (datetime.utcnow() - timedelta(hours=2 * DEDUP_HOURS)).strftime(TIMESTAMP_FORMAT)
+        with conn:
+            conn.execute("DELETE FROM counted_records WHERE counted_at < ?", (cutoff,))
+    finally:
+        conn.close()
+    if ingested:
+        print(f"[+] Aggregates: {ingested} new snapshots counted")
+    return ingested
+
+def _fresh_records(conn, source, fetched_at):
+    # Filter for count_snapshot: True (and remembered) for a record not counted in the
+    # DEDUP_HOURS before fetched_at, including earlier in the same snapshot
+    cutoff = (datetime.strptime(fetched_at, TIMESTAMP_FORMAT) - timedelta(hours=DEDUP_HOURS)).strftime(TIMESTAMP_FORMAT)
+    def fresh(record):
+        key = record_id(record)
+        row = conn.execute("SELECT counted_at FROM counted_records WHERE source = ? AND record_id = ?", (source, key)).fetchone()
+        if row and row[0] > cutoff:
+            return False
+        conn.execute("INSERT OR REPLACE INTO counted_records VALUES (?, ?, ?)", (source, key, fetched_at))
+        return True
+    return fresh
+
+# === Windows ===
+def _hour(offset_days, end=None):
+    return ((end or datetime.utcnow()) - timedelta(days=offset_days)).strftime(HOUR_FORMAT)
+
+def window(dimension, days=1, end=None, conn=None):
+    # Counter of dimension keys over the `days` * 24 hours up to and including `end`'s hour
+    own = conn is None
+    conn = conn or connect()
+    try:
+        rows = conn.execute("SELECT key, SUM(count) FROM hourly_counts WHERE dimension = ? AND hour > ? AND hour <= ? "
+                            "GROUP BY key", (dimension, _hour(days, end), _hour(0, end)))
+        return Counter(dict(rows))
+    finally:
+        if own:
+            conn.close()
+
+def top(dimension, days=1, n=10, end=None):
+    return window(dimension, days, end).most_common(n)
+
+def compare(dimension, days=7, end=None):
+    # (key, current window, previous window) for every key seen in either window
+    end = end or datetime.utcnow()
+    conn = connect()
+    try:
+        current = window(dimension, days, end, conn)
+        previous = window(dimension, days, end - timedelta(days=days), conn)
+    finally:
+        conn.close()
+    return [(key, current[key], previous[key]) for key in set(current) | set(previous)]
+
+def movers(dimension, days=7, n=10, end=None):
+    # Largest absolute changes between this window and the one before it
+    rows = compare(dimension, days, end)
+    return sorted(rows, key=lambda r: (abs(r[1] - r[2]), r[1]), reverse=True)[:n]
+
+def week_over_week(dimension, n=10, end=None):
+    # This week's top keys with last week's count and the change
+    rows = sorted(compare(dimension, 7, end), key=lambda r: (r[1], r[2]), reverse=True)[:n]
+    return [(key, current, previous, change_label(current, previous)) for key, current, previous in rows]
+
+def change_label(current, previous):
+    if not previous:
+        return "new" if current else "-"
+    delta = current - previous
+    return f"{'▲' if delta > 0 else '▼' if delta < 0 else '='} {delta:+d} ({delta / previous:+.0%})"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update and query the rolling family/tag/technique aggregates")
+    parser.add_argument("--dimension", choices=DIMENSIONS, default="family")
+    parser.add_argument("--days", type=int, choices=(1, 7, 30), default=7)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    update()
+    print(f"\n[+] Top {args.dimension} values, last {args.days} days:")
+    for key, count in top(args.dimension, args.days, args.top):
+        print(f"  - {key}: {count}")
+    print(f"\n[+] Movers vs the previous {args.days} days:")
+    for key, current, previous in movers(args.dimension, args.days, args.top):
+        print(f"  - {key}: {previous} -> {current} ({change_label(current, previous)})")
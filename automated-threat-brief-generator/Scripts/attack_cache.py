@@ -0,0 +1,183 @@
+import os
+import json
+import pickle
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+manifest_file = data_path / "attack_cache.json"
+
+# ATT&CK source: a cti/enterprise-attack folder or a bundle .json. Defaults to the bundle
+# kept up to date by mitre_taxii_parser.py; set MITRE_ATTACK_PATH to use a cti checkout instead.
+MITRE_PATH = os.getenv("MITRE_ATTACK_PATH", str(data_path / "attack" / "enterprise-attack.json"))
+
+# Bump when the layout of the compiled cache changes
+CACHE_VERSION = 1
+
+# === Source Fingerprints ===
+def _source_files(source):
+    source = Path(source)
+    if source.is_file():
+        return [source]
+    return sorted(p for p in source.rglob("*.json") if p.is_file())
+
+def source_fingerprint(source):
+    # Cheap stat-based check; only when it changes do we pay for a full content hash
+    source = Path(source)
+    digest = hashlib.sha256()
+    for path in _source_files(source):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(source) if path != source else path.name}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def source_hash(source):
+    # Content hash of the bundle (or of every file in a cti/enterprise-attack folder)
+    source = Path(source)
+    digest = hashlib.sha256()
+    for path in _source_files(source):
+        if path != source:
+            digest.update(str(path.relative_to(source)).replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+# === Manifest ===
+def _read_manifest():
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_atomic(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def _cache_file(content_hash):
+    return data_path / f"attack_cache_{content_hash[:16]}.pickle"
+
+# === Build ===
+def compile_attack(index, uses, software, groups, content_hash, source):
+    import mitre_stix_parser
+
+    objects, aliases, technique_ids = {}, {}, {}
+    for obj in index.values():
+        objects[obj.id] = {"type": obj.type, "name": obj.name}
+        names = list(obj.get("x_mitre_aliases", [])) + list(obj.get("aliases", []))
+        if names:
+            aliases[obj.id] = sorted(set(names))
+        if obj.type == "attack-pattern":
+            technique_ids[obj.id] = mitre_stix_parser.technique_id(obj)
+    relationships = [(source_id, target_id) for source_id, targets in uses.items() for target_id in sorted(targets)]
+    return {
+        "version": CACHE_VERSION,
+        "source": str(source),
+        "source_hash": content_hash,
+        "built_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "objects": objects,
+        "relationships": relationships,
+        "aliases": aliases,
+        "technique_ids": technique_ids,
+        "software": software,
+        "groups": groups
+    }
+
+def build_cache(source, force=False):
+    # Returns the compiled cache for this bundle, re-parsing STIX only when its content hash changed
+    import mitre_stix_parser
+
+    content_hash = source_hash(source)
+    manifest = _read_manifest()
+    if not force and manifest and manifest.get("source_hash") == content_hash and manifest.get("version") == CACHE_VERSION:
+        cache = _load_pickle(_cache_file(content_hash))
+        if cache is not None:
+            print(f"[+] ATT&CK bundle unchanged ({content_hash[:12]}), reusing compiled cache")
+            _write_manifest(source, content_hash)
+            return cache
+
+    print(f"[*] Loading STIX files from: {source}")
+    stix_source = mitre_stix_parser.open_source(source)
+    index = mitre_stix_parser.build_index(stix_source)
+    relationships = mitre_stix_parser.load_uses_relationships(stix_source)
+    uses = mitre_stix_parser.resolve_uses(index, relationships)
+    software, groups = mitre_stix_parser.build_mappings(index, uses)
+    print(f"[+] Indexed {len(index)} ATT&CK objects, resolved {len(relationships)} 'uses' relationships.")
+
+    cache = compile_attack(index, uses, software, groups, content_hash, source)
+    cache_file = _cache_file(content_hash)
+    _write_atomic(cache_file, pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL))
+    _write_manifest(source, content_hash)
+    for old in data_path.glob("attack_cache_*.pickle"):
+        if old != cache_file:
+            old.unlink()
+    print(f"[+] Compiled ATT&CK cache written to: {cache_file}")
+    return cache
+
+def _write_manifest(source, content_hash):
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": str(Path(source).resolve()),
+        "source_hash": content_hash,
+        "fingerprint": source_fingerprint(source),
+        "cache_file": _cache_file(content_hash).name
+    }
+    _write_atomic(manifest_file, json.dumps(manifest, indent=2).encode("utf-8"))
+
+# === Load ===
+class StaleCacheError(Exception):
+    pass
+
+def _load_pickle(path):
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    return cache if cache.get("version") == CACHE_VERSION else None
+
+def load_cache(rebuild=False):
+    # Milliseconds when the bundle is untouched. A cache whose source changed or disappeared
+    # since the build is never returned: it raises StaleCacheError, or with rebuild the changed
+    # source is compiled again first.
+    manifest = _read_manifest()
+    if not manifest or manifest.get("version") != CACHE_VERSION:
+        return None
+
+    source = Path(manifest["source"])
+    if not source.exists():
+        raise StaleCacheError(f"ATT&CK data at {source} no longer exists; point MITRE_ATTACK_PATH at a bundle and re-run mitre_stix_parser.py (or cli.py map)")
+    if source_fingerprint(source) != manifest["fingerprint"]:
+        if source_hash(source) != manifest["source_hash"]:
+            if not rebuild:
+                raise StaleCacheError(f"ATT&CK data at {source} changed since the cache was built; re-run mitre_stix_parser.py (or cli.py map)")
+            print(f"[*] ATT&CK data at {source} changed since the cache was built, rebuilding it")
+            return build_cache(source)
+        # Touched but identical content, remember the new fingerprint
+        _write_manifest(source, manifest["source_hash"])
+
+    return _load_pickle(data_path / manifest["cache_file"])
+
+def get_latest_mapping_file():
+    import snapshot_catalog
+    return snapshot_catalog.latest("malware_mitre_mapping")
+
+def load_mapping():
+    # Malware/tool → technique mapping for reports and plots. A bundle updated by a TAXII sync
+    # but not compiled yet is compiled here; a cache whose source is gone raises StaleCacheError.
+    cache = load_cache(rebuild=True)
+    if cache is not None:
+        return cache["software"]
+
+    # No compiled cache yet: fall back to the last exported mapping file
+    mapping_file = get_latest_mapping_file()
+    if not mapping_file:
+        return []
+    with open(mapping_file, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,57 @@
+import time
+import argparse
+from stix2 import Filter
+
+import mitre_stix_parser
+
+# === Before: one fs.get() per relationship endpoint (the original parser) ===
+def build_mapping_per_lookup(source, sample=None):
+    relationships = source.query([Filter("type", "=", "relationship")])
+    if sample:
+        relationships = relationships[:sample]
+    malware_to_techniques = {}
+    for rel in relationships:
+        if rel.relationship_type != "uses":
+            continue
+        try:
+            src = source.get(rel.source_ref)
+            target = source.get(rel.target_ref)
+            if src is None or target is None:
+                continue
+            if src.type == "malware" and target.type == "attack-pattern":
+                malware_to_techniques.setdefault(src.name, []).append(target.name)
+        except Exception:
+            continue
+    return malware_to_techniques, len(relationships)
+
+# === After: one indexed pass ===
+def build_mapping_indexed(source):
+    index = mitre_stix_parser.build_index(source)
+    relationships = mitre_stix_parser.load_uses_relationships(source)
+    uses = mitre_stix_parser.resolve_uses(index, relationships)
+    return mitre_stix_parser.build_mappings(index, uses)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time building the malware→technique mapping before/after indexing")
+    parser.add_argument("--path", default=mitre_stix_parser.MITRE_PATH, help="ATT&CK folder or bundle")
+    parser.add_argument("--sample", type=int, help="only time the first N relationships of the old approach and extrapolate")
+    args = parser.parse_args()
+
+    print(f"[*] Benchmarking against {args.path}")
+
+    source = mitre_stix_parser.open_source(args.path)
+    start = time.perf_counter()
+    _, resolved = build_mapping_per_lookup(source, args.sample)
+    before = time.perf_counter() - start
+    if args.sample:
+        total = len(source.query([Filter("type", "=", "relationship")]))
+        print(f"[+] per-relationship fs.get: {before:.2f}s for {resolved} relationships "
+              f"(~{before * total / max(resolved, 1):.1f}s for all {total})")
+    else:
+        print(f"[+] per-relationship fs.get: {before:.2f}s")
+
+    source = mitre_stix_parser.open_source(args.path)
+    start = time.perf_counter()
+    software, groups = build_mapping_indexed(source)
+    after = time.perf_counter() - start
+    print(f"[+] indexed single pass:     {after:.2f}s ({len(software)} software, {len(groups)} groups)")
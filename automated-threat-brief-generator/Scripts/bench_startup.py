@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+history_file = base_path / "data" / "startup_bench.json"
+
+# Startup cost of each cli.py command: the modules it imports before doing any work, measured
+# with `python -X importtime` in a fresh interpreter. Every run is appended to
+# data/startup_bench.json and compared with the previous one, so an import that makes a command
+# slow to start shows up as a regression.
+COMMANDS = ("fetch", "map", "report", "plot")
+# What the commands would pay if the heavy libraries were still imported at module top
+HEAVY_MODULES = ("requests", "stix2", "taxii2client.v20", "matplotlib.pyplot", "networkx")
+KEEP_RUNS = 50
+
+def parse_importtime(stderr):
+    # [(depth, self µs, cumulative µs, module)] in the order imports finished
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:   self |   cumulative | <2 spaces per nesting level>module"
+        self_us, cumulative_us, name = line.split("|", 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((depth, int(self_us.split(":")[1]), int(cumulative_us), name.strip()))
+    return entries
+
+def _importtime(code):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=base_path, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+def measure_command(command):
+    # cli: importing cli.py itself (argument parsing), imports: what the command loads before it runs
+    entries = _importtime(f"import sys; sys.path.insert(0, {str(base_path)!r}); import cli; cli.load({command!r})")
+    top = [i for i, entry in enumerate(entries) if entry[0] == 0]
+    cli_index = next(i for i in top if entries[i][3] == "cli")
+    loaded = [entries[i] for i in top if i > cli_index]
+    # The heaviest modules pulled in directly by the command's own modules
+    children = sorted((entry for entry in entries[cli_index + 1:] if entry[0] == 1), key=lambda e: -e[2])
+    return {
+        "cli_ms": entries[cli_index][2] / 1000,
+        "imports_ms": sum(entry[2] for entry in loaded) / 1000,
+        "modules": sum(1 for entry in entries[cli_index + 1:]),
+        "heaviest": [[entry[3], entry[2] / 1000] for entry in children[:5]]
+    }
+
+def measure_heavy():
+    code = "\n".join(f"try:\n    import {name}\nexcept ImportError:\n    pass" for name in HEAVY_MODULES)
+    entries = _importtime(code)
+    return sum(entry[2] for entry in entries if entry[0] == 0 and entry[3] in HEAVY_MODULES) / 1000
+
+def run(commands=COMMANDS, repeat=5):
+    # Median over several fresh interpreters per command
+    results = {}
+    for command in commands:
+        samples = [measure_command(command) for _ in range(repeat)]
+        results[command] = {
+            "cli_ms": round(statistics.median(s["cli_ms"] for s in samples), 2),
+            "imports_ms": round(statistics.median(s["imports_ms"] for s in samples), 2),
+            "modules": samples[-1]["modules"],
+            "heaviest": samples[-1]["heaviest"]
+        }
+    heavy = round(statistics.median(measure_heavy() for _ in range(repeat)), 2)
+    return results, heavy
+
+def load_history():
+    if not history_file.exists():
+        return []
+    with open(history_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(history):
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = history_file.with_name(f".{history_file.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history[-KEEP_RUNS:], f, indent=2)
+    os.replace(tmp, history_file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track the import-time startup cost of each cli.py command")
+    parser.add_argument("commands", nargs="*", help=f"only these commands ({', '.join(COMMANDS)}, default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="interpreter runs per command, the median is reported")
+    parser.add_argument("--budget", type=float, help="exit 1 if any command takes longer than this many ms to import")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to data/startup_bench.json")
+    args = parser.parse_args()
+
+    unknown = [command for command in args.commands if command not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command {', '.join(unknown)} (expected {', '.join(COMMANDS)})")
+    results, heavy = run(args.commands or COMMANDS, args.repeat)
+    history = load_history()
+    previous = history[-1]["results"] if history else {}
+
+    print(f"[*] Startup cost per command (median of {args.repeat}, python -X importtime)")
+    print(f"    {'command':<8} {'cli.py':>8} {'imports':>9} {'modules':>8} {'vs last':>9}  heaviest")
+    for command, result in results.items():
+        before = previous.get(command, {}).get("imports_ms")
+        change = f"{result['imports_ms'] - before:+8.1f}" if before is not None else f"{'-':>8}"
+        heaviest = ", ".join(f"{name} {ms:.1f}" for name, ms in result["heaviest"][:3])
+        print(f"    {command:<8} {result['cli_ms']:7.1f}ms {result['imports_ms']:7.1f}ms {result['modules']:8} {change}ms  {heaviest}")
+    print(f"[*] For comparison, importing {', '.join(HEAVY_MODULES)} up front: {heavy:.1f}ms")
+
+    if not args.no_save:
+        history.append({
+            "at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "results": results,
+            "heavy_ms": heavy
+        })
+        save_history(history)
+        print(f"[+] Recorded in {history_file}")
+
+    if args.budget is not None:
+        over = [command for command, result in results.items() if result["cli_ms"] + result["imports_ms"] > args.budget]
+        if over:
+            print(f"[!] Over the {args.budget:.0f}ms startup budget: {', '.join(over)}")
+            sys.exit(1)
@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+cache_path = base_path / "data" / "chart_cache"
+
+# Bump when the drawing code changes, so cached images are redrawn
+CHART_VERSION = 3
+FORMATS = ("png", "svg")
+# Cached images nobody asked for in this many days are removed when a new one is written
+MAX_AGE_DAYS = 30
+# Directed graphs with more edges are drawn with plain lines: one arrow patch per edge is what
+# makes large graphs slow to draw, and the columns of the layout already show the direction
+ARROW_LIMIT = 500
+
+# A chart is a plain dict (kind, title, labels, values, ...). Its hash is the cache key, so an
+# unchanged chart costs one file read, and matplotlib is only imported when something has to
+# be drawn. Drawing uses Figure + FigureCanvasAgg directly: no pyplot, no global figure state,
+# safe in threads and in worker processes.
+
+# === Specs ===
+def barh(labels, values, title, xlabel=None, color="skyblue", edgecolor=None, size=(10, 6), annotate=True, **style):
+    # Horizontal bar chart, first label at the top.
+    # style: value_format, label_pad, label_size, xlim_margin, grid, title_size, title_weight,
+    # xlabel_size, empty (text shown when there are no values)
+    return {
+        "kind": "barh",
+        "labels": [str(label) for label in labels],
+        "values": list(values),
+        "title": title,
+        "xlabel": xlabel,
+        "color": color,
+        "edgecolor": edgecolor,
+        "size": list(size),
+        "annotate": annotate,
+        **style
+    }
+
+def network(nodes, edges, title, groups, directed=False, size=(14, 10), layout_key=None, **style):
+    # Node-link graph. nodes: (name, group) pairs, groups: {group: {"color": ..., "label": ...}},
+    # a label puts the group in the legend. Groups are laid out as columns, left to right in
+    # the order given (see graph_layout.py); with a layout_key node positions are kept across
+    # runs. The positions are part of the spec, so they are in the sidecar and the cache key.
+    # style: node_size, node_alpha, edge_color, edge_alpha, width, arrowstyle, arrowsize,
+    # font_size, font_weight, title_size, title_weight
+    import graph_layout
+
+    nodes = [[str(name), group] for name, group in nodes]
+    edges = [[str(source), str(target)] for source, target in edges]
+    positions = graph_layout.layout(nodes, edges, list(groups), key=layout_key)
+    return {
+        "kind": "network",
+        "nodes": nodes,
+        "edges": edges,
+        "pos": {name: [round(x, 4), round(y, 4)] for name, (x, y) in positions.items()},
+        "title": title,
+        "groups": groups,
+        "directed": directed,
+        "size": list(size),
+        **style
+    }
+
+def panels(specs, size):
+    # Several charts side by side in one figure
+    return {
+        "kind": "panels",
+        "panels": list(specs),
+        "size": list(size)
+    }
+
+def chart_hash(spec, fmt="png"):
+    material = json.dumps([CHART_VERSION, fmt, spec], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+# === Drawing ===
+def _font(spec, prefix):
+    # Only what the spec sets, so matplotlib's defaults apply otherwise
+    options = {}
+    if spec.get(f"{prefix}_size"):
+        options["fontsize"] = spec[f"{prefix}_size"]
+    if spec.get(f"{prefix}_weight"):
+        options["fontweight"] = spec[f"{prefix}_weight"]
+    return options
+
+def _draw_barh(ax, spec):
+    values = spec["values"]
+    if not values:
+        ax.text(0.5, 0.5, spec.get("empty", "No data to plot"), ha="center")
+        return
+    bars = ax.barh(spec["labels"], values, color=spec["color"], edgecolor=spec.get("edgecolor"))
+    if spec.get("xlabel"):
+        ax.set_xlabel(spec["xlabel"], **_font(spec, "xlabel"))
+    ax.set_title(spec["title"], **_font(spec, "title"))
+    ax.invert_yaxis()
+    if spec.get("annotate"):
+        value_format, pad = spec.get("value_format", "{}"), spec.get("label_pad", 0.2)
+        label_font = _font(spec, "label")
+        for bar, value in zip(bars, values):
+            ax.text(bar.get_width() + pad, bar.get_y() + bar.get_height() / 2, value_format.format(value),
+                    va="center", **label_font)
+    if spec.get("xlim_margin"):
+        ax.set_xlim(0, max(values) * (1 + spec["xlim_margin"]))
+    if spec.get("grid"):
+        ax.grid(axis="x", linestyle="--", alpha=0.7)
+
+def _draw_network(ax, spec):
+    import networkx as nx
+
+    G = nx.DiGraph() if spec.get("directed") else nx.Graph()
+    members = {}
+    for name, group in spec["nodes"]:
+        G.add_node(name)
+        members.setdefault(group, []).append(name)
+    G.add_edges_from(spec["edges"])
+    pos = {name: tuple(xy) for name, xy in spec["pos"].items()}
+
+    node_size = spec.get("node_size", 600)
+    for group, names in members.items():
+        style = spec["groups"].get(group, {})
+        nx.draw_networkx_nodes(G, pos, nodelist=names, node_color=style.get("color", "skyblue"),
+                               label=style.get("label"), node_size=node_size, alpha=spec.get("node_alpha"), ax=ax)
+    if spec.get("directed") and len(spec["edges"]) <= ARROW_LIMIT:
+        arrows = {"arrowstyle": spec.get("arrowstyle", "-|>"), "arrowsize": spec.get("arrowsize", 10)}
+    else:
+        arrows = {"arrows": False}
+    nx.draw_networkx_edges(G, pos, alpha=spec.get("edge_alpha"), edge_color=spec.get("edge_color", "k"),
+                           width=spec.get("width", 1.0), node_size=node_size, ax=ax, **arrows)
+    nx.draw_networkx_labels(G, pos, font_size=spec.get("font_size", 8), font_weight=spec.get("font_weight", "normal"), ax=ax)
+    ax.set_title(spec["title"], **_font(spec, "title"))
+    ax.margins(x=0.15)  # room for the labels of the outer columns
+    ax.axis("off")
+    if any(style.get("label") for style in spec["groups"].values()):
+        ax.legend()
+
+DRAWERS = {
+    "barh": _draw_barh,
+    "network": _draw_network
+}
+
+def _draw_into(fig, spec):
+    if spec["kind"] == "panels":
+        for i, panel in enumerate(spec["panels"]):
+            DRAWERS[panel["kind"]](fig.add_subplot(1, len(spec["panels"]), i + 1), panel)
+    else:
+        DRAWERS[spec["kind"]](fig.add_subplot(), spec)
+    fig.tight_layout()
+
+def draw(spec, fmt="png"):
+    # Rendered image bytes, never cached
+    from io import BytesIO
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=spec.get("size", (10, 6)))
+    FigureCanvasAgg(fig)
+    _draw_into(fig, spec)
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+def show(spec):
+    # Interactive window, for running the plotting scripts by hand
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=spec.get("size", (10, 6)))
+    _draw_into(fig, spec)
+    plt.show()
+
+# === Cache ===
+def cache_file(spec, fmt="png"):
+    return cache_path / f"{chart_hash(spec, fmt)}.{fmt}"
+
+def _write_atomic(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def prune(max_age_days=MAX_AGE_DAYS):
+    cutoff = time.time() - max_age_days * 86400
+    for path in cache_path.glob("*.*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass  # removed by another process meanwhile
+
+def _render_to_cache(spec, fmt):
+    path = cache_file(spec, fmt)
+    _write_atomic(path, draw(spec, fmt))
+    return path
+
+def render(spec, fmt="png"):
+    # Path of the cached image, drawing it first if this exact chart was never drawn
+    path = cache_file(spec, fmt)
+    if path.exists():
+        os.utime(path)  # keeps it out of prune()
+        return path
+    path = _render_to_cache(spec, fmt)
+    prune()
+    return path
+
+def _try_render_to_cache(spec, fmt):
+    # Error message instead of an exception, so one broken figure does not stop a batch
+    try:
+        _render_to_cache(spec, fmt)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+def _render_jobs(jobs, processes=None, strict=True):
+    # (spec, fmt) pairs: cache hits are touched, misses are drawn in a process pool.
+    # Unless strict, drawing errors are returned as {cache file: message} instead of raised.
+    worker = _render_to_cache if strict else _try_render_to_cache
+    missing = {}
+    for spec, fmt in jobs:
+        path = cache_file(spec, fmt)
+        if path.exists():
+            os.utime(path)
+        else:
+            missing.setdefault(path, (spec, fmt))
+    if len(missing) == 1 or processes == 1:
+        results = [worker(spec, fmt) for spec, fmt in missing.values()]
+    elif missing:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(len(missing), processes or os.cpu_count() or 1)
+        # Spawned, not forked: main.py draws from a worker thread, and forking a threaded process can deadlock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(worker, *zip(*missing.values())))
+    if missing:
+        prune()
+        return {path: error for path, error in zip(missing, results) if not strict and error}
+    return {}
+
+def render_many(specs, fmt="png", processes=None):
+    # Returns the cached paths in the order of specs
+    _render_jobs([(spec, fmt) for spec in specs], processes)
+    return [cache_file(spec, fmt) for spec in specs]
+
+def png_base64(spec):
+    # For inlining a chart into an HTML report
+    return base64.b64encode(render(spec, "png").read_bytes()).decode("ascii")
+
+# === Batch output ===
+def export(figures, directory, formats=("png",), processes=None):
+    # Headless batch mode: {name: spec} -> <name>.<fmt> for every format plus a <name>.json
+    # sidecar holding the data the figure shows. Every figure and format is drawn in parallel;
+    # a figure that fails to draw is reported and left out.
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    errors = _render_jobs([(spec, fmt) for spec in figures.values() for fmt in formats], processes, strict=False)
+
+    generated = datetime.utcnow().isoformat(timespec="seconds")
+    written = []
+    for name, spec in figures.items():
+        failed = [errors[cache_file(spec, fmt)] for fmt in formats if cache_file(spec, fmt) in errors]
+        if failed:
+            print(f"[!] {name} could not be drawn: {failed[0]}")
+            continue
+        for fmt in formats:
+            path = directory / f"{name}.{fmt}"
+            _write_atomic(path, cache_file(spec, fmt).read_bytes())
+            written.append(path)
+        sidecar = {
+            "figure": name,
+            "generated": generated,
+            "chart_hash": chart_hash(spec),
+            "formats": list(formats),
+            "spec": spec
+        }
+        _write_atomic(directory / f"{name}.json", json.dumps(sidecar, indent=2, ensure_ascii=False).encode("utf-8"))
+    return written
+
+def output_parser(description):
+    # Shared command line of the plotting scripts: a window by default, files with --out
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--out", help="write the figures (and JSON sidecars) to this directory instead of showing them")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["png"], dest="formats")
+    parser.add_argument("--processes", type=int, help="worker processes for drawing, defaults to one per CPU")
+    return parser
+
+def output(figures, args):
+    if args.out:
+        written = export(figures, args.out, args.formats, args.processes)
+        print(f"[+] Wrote {len(written)} images for {len(figures)} figures to {args.out}")
+    else:
+        for spec in figures.values():
+            show(spec)
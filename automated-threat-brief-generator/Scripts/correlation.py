@@ -0,0 +1,186 @@
+import os
+import re
+import time
+import pickle
+import socket
+import hashlib
+import argparse
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import indicators
+import ndjson_snapshot
+import snapshot_catalog
+import abuseipdb_snapshot
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+
+# Bump when the cached overlaps change shape (or the keys they are built from)
+CACHE_VERSION = 2
+
+SOURCE_LABELS = {"otx": "OTX", "threatfox": "ThreatFox", "abuseipdb": "AbuseIPDB"}
+HASH_VALUE = re.compile(r"^[0-9a-fA-F]{32}$|^[0-9a-fA-F]{40}$|^[0-9a-fA-F]{64}$")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# === Normalisation ===
+# Addresses are refanged and split from their port by indicators.py, like the IOC store does
+def _host_key(host):
+    ip = indicators.normalise_ip(host)
+    if ip:
+        return ("ip", ip)
+    return ("domain", host.lower().rstrip(".")) if host else None
+
+def normalise_url(value):
+    parts = urlsplit(value)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    # urlsplit drops the brackets of an IPv6 host, which the URL needs back
+    name = f"[{indicators.normalise_ip(host) or host}]" if ":" in host else host
+    netloc = name if port in (None, DEFAULT_PORTS.get(scheme)) else f"{name}:{port}"
+    return f"{scheme}://{netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else ""), host
+
+def keys_for(value, kind=None):
+    # Correlation keys of one indicator. A URL also yields its host, so a ThreatFox URL
+    # corroborates an OTX domain or an AbuseIPDB address.
+    value = indicators.refang(str(value).strip())
+    kind = (kind or "").lower()
+    if "@" in value and "://" not in value:
+        return []  # email addresses
+    if "url" in kind or "://" in value:
+        url, host = normalise_url(value)
+        key = _host_key(host)
+        return [("url", url), key] if key else [("url", url)]
+    if HASH_VALUE.match(value) or "hash" in kind or kind in ("md5", "sha1", "sha256"):
+        return [("hash", value.lower())]
+    ip = indicators.normalise_ip(value)
+    if ip:
+        return [("ip", ip)]
+    if kind in ("domain", "hostname") or "." in value:
+        return [("domain", value.lower().rstrip("."))]
+    return []
+
+# === Join ===
+def correlate(feeds, abuse_snapshot=None):
+    # feeds: {source: iterable of Indicator}. One pass over every feed builds a hash index of
+    # key -> {source: first Indicator}; the indexed addresses are then probed against a hash
+    # index of the packed AbuseIPDB blacklist, so its records are only decoded on a hit.
+    index = {}
+    for source, records in feeds.items():
+        for ind in records:
+            if not ind.value:
+                continue
+            for key in keys_for(ind.value, ind.kind):
+                index.setdefault(key, {}).setdefault(source, ind)
+
+    if abuse_snapshot is not None:
+        addresses = abuse_snapshot.addresses()
+        for key, seen in index.items():
+            if key[0] != "ip":
+                continue
+            position = addresses.get(socket.inet_pton(socket.AF_INET6 if ":" in key[1] else socket.AF_INET, key[1]))
+            if position is not None:
+                seen.setdefault("abuseipdb", next(indicators.parse_abuseipdb([abuse_snapshot.record(position)])))
+
+    overlaps = [(key, seen) for key, seen in index.items() if len(seen) > 1]
+    overlaps.sort(key=lambda item: (-len(item[1]), item[0]))
+    return overlaps
+
+def provenance(ind):
+    # Short description of what one source says about the indicator
+    if ind.source == "abuseipdb":
+        return f"score {ind.confidence}"
+    details = [ind.family, ind.threat_type, ind.name if ind.source == "otx" else None]
+    text = ", ".join(d for d in details if d) or "listed"
+    if ind.confidence is not None and ind.source != "otx":
+        text += f" [{ind.confidence}]"
+    return text
+
+def describe(key, seen):
+    kind, value = key
+    sources = "; ".join(f"{SOURCE_LABELS.get(s, s)}: {provenance(ind)}" for s, ind in sorted(seen.items()))
+    return f"{value} ({kind}) - {sources}"
+
+# === Feeds From The Catalog ===
+FEED_PARSERS = {
+    "otx": (indicators.parse_otx, {"expand": True}),
+    "threatfox": (indicators.parse_threatfox, {})
+}
+
+def _window(days):
+    # The catalogued snapshots a correlation over the last `days` days reads, and a hash of
+    # their contents which keys the cached result
+    snapshots = {source: snapshot_catalog.recent(source, days) for source in FEED_PARSERS}
+    abuse = snapshot_catalog.latest_entry("abuseipdb", fmt=abuseipdb_snapshot.FORMAT)
+    digest = hashlib.sha256(f"v{CACHE_VERSION}|{days}\n".encode("utf-8"))
+    for source, rows in snapshots.items():
+        for row in rows:
+            digest.update(f"{source}|{row['content_hash']}\n".encode("utf-8"))
+    if abuse:
+        digest.update(f"abuseipdb|{abuse['content_hash']}\n".encode("utf-8"))
+    return snapshots, abuse, digest.hexdigest()
+
+def window_key(days=7):
+    return _window(days)[2]
+
+def _stream(rows, parse, kw):
+    for snapshot in rows:
+        yield from parse(ndjson_snapshot.iter_records(snapshot["path"]), **kw)
+
+def recent_feeds(days=7, snapshots=None):
+    # OTX pulse indicators and ThreatFox IOCs from the snapshots of the last `days` days
+    snapshots = snapshots or _window(days)[0]
+    return {source: _stream(snapshots[source], *FEED_PARSERS[source]) for source in FEED_PARSERS}
+
+# === Cached Result ===
+def _cache_file(days):
+    return data_path / f"correlation_{days}d.pickle"
+
+def _load_cached(days, key):
+    try:
+        with open(_cache_file(days), "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    return cached["overlaps"] if cached.get("key") == key else None
+
+def _save_cached(days, key, overlaps):
+    path = _cache_file(days)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump({"key": key, "overlaps": overlaps}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def corroborated(days=7, force=False):
+    # Reuses the last result while the snapshots in the window are the same ones
+    snapshots, abuse, key = _window(days)
+    overlaps = None if force else _load_cached(days, key)
+    if overlaps is not None:
+        return overlaps
+    if abuse is None:
+        overlaps = correlate(recent_feeds(days, snapshots))
+    else:
+        with abuseipdb_snapshot.Snapshot(abuse["path"]) as snapshot:
+            overlaps = correlate(recent_feeds(days, snapshots), snapshot)
+    _save_cached(days, key, overlaps)
+    return overlaps
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indicators reported by more than one feed")
+    parser.add_argument("--days", type=int, default=7, help="how many days of OTX/ThreatFox snapshots to join")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--force", action="store_true", help="recompute even if the snapshots are unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    overlaps = corroborated(args.days, args.force)
+    print(f"[+] {len(overlaps)} indicators corroborated by multiple sources ({time.perf_counter() - start:.2f}s)")
+    for key, seen in overlaps[:args.top]:
+        print(f"  - {describe(key, seen)}")
@@ -1,55 +1,47 @@
-import os
-import json
-import glob
+import sys
 from collections import Counter
-from datetime import datetime
 from pathlib import Path
-import matplotlib.pyplot as plt
-import networkx as nx
+import attack_cache
+import charts
+import snapshot_catalog
+import indicators
+from malware_resolver import MalwareResolver
 
 # === Paths ===
 script_path = Path(__file__).resolve()
 base_path = script_path.parent.parent  # Go up to `automated-threat-brief-generator`
 data_path = base_path / "data"
-data_path.mkdir(parents=True, exist_ok=True)
-
-# === Load latest malware-to-technique mapping ===
-def get_latest_mapping_file():
-    files = sorted(data_path.glob("malware_mitre_mapping_*.json"), key=os.path.getmtime, reverse=True)
-    return files[0] if files else None
 
+# === Load malware-to-technique mapping (compiled ATT&CK cache) ===
 def load_mapping_data():
-    mapping_file = get_latest_mapping_file()
-    if not mapping_file:
+    mapping_data = attack_cache.load_mapping()
+    if not mapping_data:
         print("[-] No mapping file found.")
-        return []
-    with open(mapping_file, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-# === Load latest feed malware ===
-def get_latest_file(prefix):
-    files = sorted(data_path.glob(f"{prefix}_*.json"), key=os.path.getmtime, reverse=True)
-    return files[0] if files else None
-
-def load_json(filepath):
-    if not filepath:
-        return []
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return mapping_data
 
+# === Load today's feed malware ===
 def extract_malware_from_feeds():
-    otx_data = load_json(get_latest_file("otx")) or []
-    threatfox_data = load_json(get_latest_file("threatfox")) or []
+    # Every OTX/ThreatFox delta of the last 24h, not just the latest one
+    otx_data = snapshot_catalog.recent_records("otx", days=1)
+    threatfox_data = snapshot_catalog.recent_records("threatfox", days=1)
     seen = set()
-    for pulse in otx_data:
-        seen.add(pulse.get("malware_family", "").lower())
-    for tf in threatfox_data:
-        seen.add(tf.get("malware", "").lower())
-    return sorted(seen - {""})
+    for src in (indicators.parse_otx(otx_data), indicators.parse_threatfox(threatfox_data)):
+        seen.update(item.family.lower() for item in src if item.family)
+    return sorted(seen)
+
+# === Resolve feed names to ATT&CK software ===
+def resolve_focus(observed, resolver):
+    focus = set()
+    for name in observed:
+        resolution = resolver.resolve(name)
+        if resolution:
+            focus.add(resolution.malware.lower())
+    return focus
 
 # === Build Graph ===
 def build_graph(mapping_data, focus_malware):
-    G = nx.Graph()
+    # {node: "malware" | "technique"} and the undirected edges between them
+    nodes, edges = {}, {}
     for entry in mapping_data:
         malware = entry.get("malware", "").lower()
         techniques = entry.get("techniques", [])
@@ -58,69 +50,66 @@ def build_graph(mapping_data, focus_malware):
         if malware not in focus_malware:
             continue
         for tech in techniques:
-            G.add_node(malware, type="malware")
-            G.add_node(tech, type="technique")
-            G.add_edge(malware, tech)
-    return G
+            nodes[malware] = "malware"
+            nodes[tech] = "technique"
+            edges[frozenset((malware, tech))] = (malware, tech)
+    return nodes, list(edges.values())
 
-# === Plot Bar Chart ===
-def plot_top_techniques(mapping_data):
+# === Bar Chart ===
+def top_techniques_chart(mapping_data):
     technique_counter = Counter()
     for entry in mapping_data:
         for t in entry.get("techniques", []):
             technique_counter[t] += 1
     if not technique_counter:
         print("[-] No techniques found.")
-        return
+        return None
     top_techniques = technique_counter.most_common(15)
     techniques, counts = zip(*top_techniques)
-    plt.figure(figsize=(10, 6))
-    bars = plt.barh(techniques, counts)
-    plt.xlabel("Number of Mapped Malware Families")
-    plt.title("Top 15 MITRE ATT&CK Techniques (All Mappings)")
-    plt.gca().invert_yaxis()
-    for bar, count in zip(bars, counts):
-        plt.text(bar.get_width() + 0.2, bar.get_y() + bar.get_height() / 2, str(count), va='center')
-    plt.tight_layout()
-    plt.show()
+    return charts.barh(techniques, counts, "Top 15 MITRE ATT&CK Techniques (All Mappings)",
+                       xlabel="Number of Mapped Malware Families", color=None)
 
-# === Plot Relationship Graph ===
-def plot_relationship_graph(G):
-    if G.number_of_nodes() == 0:
+# === Relationship Graph ===
+def relationship_graph(nodes, edges):
+    if not nodes:
         print("[-] No graph data to visualize.")
-        return
-    plt.figure(figsize=(14, 10))
-    pos = nx.spring_layout(G, k=0.7)
-    malware_nodes = [n for n, d in G.nodes(data=True) if d["type"] == "malware"]
-    technique_nodes = [n for n, d in G.nodes(data=True) if d["type"] == "technique"]
-    nx.draw_networkx_nodes(G, pos, nodelist=malware_nodes, node_color="lightcoral", label="Malware", node_size=600)
-    nx.draw_networkx_nodes(G, pos, nodelist=technique_nodes, node_color="skyblue", label="Technique", node_size=600)
-    nx.draw_networkx_edges(G, pos, alpha=0.4)
-    nx.draw_networkx_labels(G, pos, font_size=8)
-    plt.title("Malware ↔ MITRE Technique Relationships (Top 20 Malware Observed Today)")
-    plt.axis("off")
-    plt.tight_layout()
-    plt.legend()
-    plt.show()
+        return None
+    groups = {
+        "malware": {"color": "lightcoral", "label": "Malware"},
+        "technique": {"color": "skyblue", "label": "Technique"}
+    }
+    return charts.network(nodes.items(), edges, "Malware ↔ MITRE Technique Relationships (Top 20 Malware Observed Today)",
+                          groups, size=(14, 10), layout_key="observed_relationships", node_size=600, edge_alpha=0.4, font_size=8)
 
-# === Main Execution ===
-print("[*] Extracting today's malware...")
-observed = extract_malware_from_feeds()
-observed = sorted(observed)[:20]  # Top 20
-print(f"[+] Today's malware families: {observed}")
+def figures():
+    print("[*] Extracting today's malware...")
+    observed = extract_malware_from_feeds()
+    observed = sorted(observed)[:20]  # Top 20
+    print(f"[+] Today's malware families: {observed}")
+
+    print("[*] Loading mapping data...")
+    mapping_data = load_mapping_data()
+    if not mapping_data:
+        print("[-] No mapping data available.")
+        return {}
 
-print("[*] Loading mapping data...")
-mapping_data = load_mapping_data()
-if not mapping_data:
-    print("[-] No mapping data available.")
-    exit(1)
+    print("[*] Resolving malware names against ATT&CK...")
+    focus = resolve_focus(observed, MalwareResolver.from_cache())
+    print(f"[+] Matched {len(focus)} of {len(observed)} families to ATT&CK software")
 
-print("[*] Building graph...")
-G = build_graph(mapping_data, observed)
+    print("[*] Building graph...")
+    nodes, edges = build_graph(mapping_data, focus)
 
-print("[DEBUG] Total nodes in full graph:", G.number_of_nodes())
-print("[DEBUG] Malware in final subgraph:", [n for n in G.nodes if G.nodes[n]['type'] == 'malware'])
+    figs = {
+        "observed_top_techniques": top_techniques_chart(mapping_data),
+        "observed_relationships": relationship_graph(nodes, edges)
+    }
+    return {name: spec for name, spec in figs.items() if spec}
 
-# === Output Charts ===
-plot_top_techniques(mapping_data)
-plot_relationship_graph(G)
+# === Main Execution ===
+if __name__ == "__main__":
+    args = charts.output_parser("Plot the top techniques and the ATT&CK relationships of today's malware").parse_args()
+    figs = figures()
+    if not figs:
+        sys.exit(1)
+    charts.output(figs, args)
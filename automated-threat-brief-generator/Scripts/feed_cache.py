@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+cache_path = base_path / "data" / "http_cache"
+
+# === Settings ===
+# Seconds a cached response is served without touching the network
+FEED_TTLS = {
+    "otx": 15 * 60,
+    "abuseipdb": 6 * 60 * 60,
+    "threatfox": 10 * 60
+}
+DEFAULT_TTL = 15 * 60
+
+# CTI_CACHE_MODE:
+#   on      - serve fresh entries, revalidate stale ones with ETag/If-Modified-Since (default)
+#   refresh - always revalidate, even when the entry is still fresh
+#   replay  - serve recorded responses only, never touch the network
+#   off     - bypass the cache entirely
+MODES = ("on", "refresh", "replay", "off")
+MODE = os.getenv("CTI_CACHE_MODE", "on").lower()
+if MODE not in MODES:
+    raise ValueError(f"CTI_CACHE_MODE must be one of {', '.join(MODES)}, got {MODE!r}")
+
+# Response headers kept alongside the body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+class ReplayMiss(Exception):
+    pass
+
+# === Cache Entries ===
+class CacheEntry:
+    def __init__(self, feed, key, meta):
+        self.feed = feed
+        self.key = key
+        self.meta = meta
+
+    @property
+    def body_file(self):
+        return cache_path / self.feed / f"{self.key}.body"
+
+    @property
+    def meta_file(self):
+        return cache_path / self.feed / f"{self.key}.json"
+
+    @property
+    def headers(self):
+        return self.meta.get("headers", {})
+
+    def is_fresh(self):
+        ttl = FEED_TTLS.get(self.feed, DEFAULT_TTL)
+        return time.time() - self.meta.get("fetched_at", 0) < ttl
+
+    def validators(self):
+        # Conditional request headers for revalidating this entry
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def read_body(self):
+        return self.body_file.read_bytes()
+
+    def touch(self):
+        # A 304 means the stored body is still current, so restart its TTL
+        self.meta["fetched_at"] = time.time()
+        _write_atomic(self.meta_file, json.dumps(self.meta).encode("utf-8"))
+
+# === Helpers ===
+def enabled():
+    return MODE != "off"
+
+def replaying():
+    return MODE == "replay"
+
+def repeat_last_request(feed, requested_at):
+    # The incremental syncs build their request from a watermark that moves on every run, so
+    # a new request never matches a recorded one. They repeat their last request instead when
+    # replaying, and while its response is still fresh, so repeat runs inside the TTL stay
+    # off the network.
+    if replaying():
+        return True
+    if MODE != "on" or requested_at is None:
+        return False
+    return time.time() - requested_at < FEED_TTLS.get(feed, DEFAULT_TTL)
+
+def request_key(method, url, params=None, body=None):
+    # Auth headers are left out on purpose so recordings are portable between API keys
+    material = json.dumps([method.upper(), url, params or {}, body], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def _write_atomic(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def lookup(feed, key):
+    meta_file = cache_path / feed / f"{key}.json"
+    try:
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    entry = CacheEntry(feed, key, meta)
+    if not entry.body_file.exists():
+        return None
+    return entry
+
+def store(feed, key, url, status_code, headers, body):
+    meta = {
+        "url": url,
+        "status": status_code,
+        "fetched_at": time.time(),
+        "headers": {name: headers[name] for name in KEPT_HEADERS if name in headers}
+    }
+    entry = CacheEntry(feed, key, meta)
+    # Body first, so a meta file never points at a missing or partial body
+    _write_atomic(entry.body_file, body)
+    _write_atomic(entry.meta_file, json.dumps(meta).encode("utf-8"))
+    return entry
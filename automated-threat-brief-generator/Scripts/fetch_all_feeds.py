@@ -1,86 +1,173 @@
 import os
-import requests
-import json
-from datetime import datetime
+import sys
+import time
+import hashlib
+import argparse
+import http_client
+import abuseipdb_snapshot
+import otx_sync
+import threatfox_sync
+import snapshot_catalog
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from dotenv import load_dotenv
 
 # Load API keys from .env file
 load_dotenv()
-OTX_API_KEY = os.getenv("OTX_API_KEY")
 ABUSEIPDB_API_KEY = os.getenv("ABUSEIPDB_API_KEY")
-THREATFOX_API_KEY = os.getenv("THREATFOX_API_KEY")
+
+# Feed endpoints (overridable so the fetchers can be pointed at a local stub server,
+# the OTX and ThreatFox endpoints live in otx_sync.py and threatfox_sync.py)
+ABUSEIPDB_URL = os.getenv("ABUSEIPDB_URL", "https://api.abuseipdb.com/api/v2/blacklist")
+
+# Per-feed time budgets in seconds (the AbuseIPDB blacklist is by far the largest download).
+# A feed gets one deadline for all its requests and retries; a feed that misses it saves no
+# snapshot and leaves its sync watermark where it was.
+FEED_TIMEOUTS = {
+    "otx": 30,
+    "abuseipdb": 90,
+    "threatfox": 30
+}
 
 # Get absolute path to /data/ folder
 script_dir = os.path.dirname(os.path.abspath(__file__))
 data_folder = os.path.join(script_dir, "..", "data")
 
 def save_json(data, name_prefix):
-    # Ensure the data folder exists
-    os.makedirs(data_folder, exist_ok=True)
-    timestamp = datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')
-    filename = os.path.join(data_folder, f"{name_prefix}_{timestamp}.json")
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Streamed to compressed NDJSON, written atomically and recorded in the snapshot catalog
+    filename = snapshot_catalog.save_records(data, name_prefix, data_folder)
     print(f"[+] Saved {name_prefix} data to {filename}")
 
 # -------------------- OTX --------------------
-def fetch_otx():
-    print("[*] Fetching data from AlienVault OTX...")
-    headers = {"X-OTX-API-KEY": OTX_API_KEY}
-    url = "https://otx.alienvault.com/api/v1/pulses/subscribed"
-    r = requests.get(url, headers=headers)
-    if r.status_code != 200:
-        print(f"[!] OTX error: {r.status_code}")
-        return []
-    data = r.json()["results"]
-    save_json(data, "otx")
-    print(f"[+] OTX: {len(data)} pulses")
+def fetch_otx(timeout=FEED_TIMEOUTS["otx"], deadline=None):
+    # Incremental: only pulses modified since the last successful sync are pulled and saved.
+    # The deadline is checked once, before anything is written; the snapshot is then saved
+    # before the sync commits its watermark, so an interrupted run is fetched again next time.
+    print("[*] Syncing data from AlienVault OTX...")
+    data, commit = otx_sync.pull_pulses(timeout=timeout, deadline=deadline)
+    http_client.check_deadline(deadline, "OTX")
+    if data:
+        save_json(data, "otx")  # an empty delta would only hide the last real snapshot
+    commit()
+    print(f"[+] OTX: {len(data)} new/updated pulses")
     return data
 
 # -------------------- AbuseIPDB --------------------
-def fetch_abuseipdb():
+def fetch_abuseipdb(timeout=FEED_TIMEOUTS["abuseipdb"], deadline=None):
     print("[*] Fetching data from AbuseIPDB...")
-    url = "https://api.abuseipdb.com/api/v2/blacklist"
     headers = {
         "Key": ABUSEIPDB_API_KEY,
         "Accept": "application/json"
     }
     params = {"confidenceMinimum": "90"}
-    r = requests.get(url, headers=headers, params=params)
+    r = http_client.get(ABUSEIPDB_URL, headers=headers, params=params, timeout=timeout, cache="abuseipdb", deadline=deadline)
     if r.status_code != 200:
         print(f"[!] AbuseIPDB error: {r.status_code}")
         return []
     data = r.json()["data"]
-    save_json(data, "abuseipdb")
+    # The blacklist only changes every few hours, an identical response is not snapshotted again
+    content_hash = hashlib.sha256(r.content).hexdigest()
+    previous = snapshot_catalog.latest_entry("abuseipdb")
+    if previous and previous["content_hash"] == content_hash:
+        print(f"[*] AbuseIPDB: blacklist unchanged since {previous['fetched_at']}")
+        return data
+    http_client.check_deadline(deadline, "AbuseIPDB")
+    abuseipdb_snapshot.save_snapshot(data, data_folder, content_hash)
     print(f"[+] AbuseIPDB: {len(data)} blacklisted IPs")
     return data
 
 # -------------------- ThreatFox --------------------
-def fetch_threatfox():
-    print("[*] Fetching data from ThreatFox...")
-    url = "https://threatfox-api.abuse.ch/api/v1/"
-    headers = {
-        "Content-Type": "application/json",
-        "Auth-Key": THREATFOX_API_KEY
-    }
-    payload = {
-        "query": "get_iocs",
-        "limit": 100
-    }
-    r = requests.post(url, headers=headers, json=payload)
-    if r.status_code != 200:
-        print(f"[!] ThreatFox error: {r.status_code}")
-        print(r.text)
-        return []
-    data = r.json().get("data", [])
-    save_json(data, "threatfox")
-    print(f"[+] ThreatFox: {len(data)} indicators")
+def fetch_threatfox(timeout=FEED_TIMEOUTS["threatfox"], deadline=None):
+    # Incremental: only IOCs newer than the stored high-water mark are saved, snapshot first
+    # and high-water mark last (see fetch_otx)
+    print("[*] Syncing data from ThreatFox...")
+    data, commit = threatfox_sync.pull_iocs(timeout=timeout, deadline=deadline)
+    http_client.check_deadline(deadline, "ThreatFox")
+    if data:
+        save_json(data, "threatfox")
+    commit()
+    print(f"[+] ThreatFox: {len(data)} new indicators")
     return data
 
+# -------------------- Concurrent Fetch --------------------
+FEEDS = {
+    "otx": fetch_otx,
+    "abuseipdb": fetch_abuseipdb,
+    "threatfox": fetch_threatfox
+}
+
+FeedResult = namedtuple("FeedResult", ["name", "data", "elapsed", "error"])
+
+def _timed_fetch(fetch, timeout, deadline=None):
+    start = time.monotonic()
+    if deadline is None and timeout is not None:
+        deadline = start + timeout
+    data = fetch(timeout=timeout, deadline=deadline)
+    return data, time.monotonic() - start
+
+def run_feeds_sequentially(feeds=None, timeouts=None):
+    feeds = feeds or FEEDS
+    timeouts = {**FEED_TIMEOUTS, **(timeouts or {})}
+    results = {}
+    for name, fetch in feeds.items():
+        start = time.monotonic()
+        try:
+            data, elapsed = _timed_fetch(fetch, timeouts.get(name))
+            results[name] = FeedResult(name, data, elapsed, None)
+        except Exception as e:
+            results[name] = FeedResult(name, [], time.monotonic() - start, str(e))
+    return results
+
+def run_feeds_concurrently(feeds=None, timeouts=None, max_workers=None):
+    # Every feed runs in its own worker; a slow or failing feed only affects its own result
+    feeds = feeds or FEEDS
+    timeouts = {**FEED_TIMEOUTS, **(timeouts or {})}
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(feeds), thread_name_prefix="feed")
+    start = time.monotonic()
+    # The workers get the same deadlines the results are awaited with, so a feed reported as
+    # timed out stops at its next request or retry and never saves a snapshot
+    deadlines = {name: None if timeouts.get(name) is None else start + timeouts[name] for name in feeds}
+    futures = {name: pool.submit(_timed_fetch, fetch, timeouts.get(name), deadlines[name]) for name, fetch in feeds.items()}
+    for name, future in futures.items():
+        timeout = timeouts.get(name)
+        remaining = None if timeout is None else max(deadlines[name] - time.monotonic(), 0)
+        try:
+            data, elapsed = future.result(timeout=remaining)
+            results[name] = FeedResult(name, data, elapsed, None)
+        except FuturesTimeout:
+            future.cancel()
+            results[name] = FeedResult(name, [], time.monotonic() - start, f"timed out after {timeout}s")
+        except Exception as e:
+            results[name] = FeedResult(name, [], time.monotonic() - start, str(e))
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def print_timings(results, total):
+    print("\n[*] Feed timings:")
+    for result in results.values():
+        status = f"FAILED ({result.error})" if result.error else f"{len(result.data)} records"
+        print(f"    {result.name:<10} {result.elapsed:7.2f}s  {status}")
+    print(f"    {'total':<10} {total:7.2f}s")
+
 # -------------------- Main Execution --------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch OTX, AbuseIPDB and ThreatFox feeds")
+    parser.add_argument("--sequential", action="store_true", help="fetch feeds one after another")
+    parser.add_argument("--timeout", type=float, help="override the per-feed timeout (seconds)")
+    args = parser.parse_args()
+
     print("[*] Starting Combined Feed Fetch...\n")
-    otx_data = fetch_otx()
-    abuse_data = fetch_abuseipdb()
-    threatfox_data = fetch_threatfox()
+    timeouts = {name: args.timeout for name in FEEDS} if args.timeout else None
+    start = time.monotonic()
+    if args.sequential:
+        results = run_feeds_sequentially(timeouts=timeouts)
+    else:
+        results = run_feeds_concurrently(timeouts=timeouts)
+    print_timings(results, time.monotonic() - start)
+
+    failed = [r.name for r in results.values() if r.error]
+    if failed:
+        print(f"\n[!] Feeds failed: {', '.join(failed)}")
+        sys.exit(1)
     print("\n[*] All feeds pulled and saved successfully.")
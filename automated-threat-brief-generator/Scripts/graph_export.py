@@ -0,0 +1,607 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+import attack_cache
+import graph_layout
+from html_templates import Template
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+visuals_path = base_path / "reports" / "visuals"
+
+# The whole malware <-> technique graph, for exploring outside a matplotlib window: every ATT&CK
+# software and technique (nothing truncated or filtered), laid out by graph_layout.py, written as
+#   <name>.graphml  for Gephi, yEd, Cytoscape or networkx, with x/y on every node
+#   <name>.json     compact columnar node table plus a flat [source, target, ...] edge list
+#   <name>.html     self-contained canvas viewer with the JSON inlined, so it opens from file://
+# The viewer merges neighbouring nodes of a column into clusters as you zoom out (level of
+# detail), so only a few hundred items and their aggregated edges are drawn per frame.
+GRAPH_VERSION = 1
+NAME = "malware_technique_graph"
+LAYERS = ("malware", "technique")
+GROUPS = {
+    "malware": {"color": "#f08080", "label": "Malware / tool"},
+    "technique": {"color": "#87ceeb", "label": "Technique"}
+}
+ROW_HEIGHT = 20       # world units between two nodes of the fullest column
+COLUMN_WIDTH = 600    # world units between two columns
+
+# === Graph ===
+def build_graph(mapping_data):
+    # {node: group}, [(software, technique)] and {node: extra attributes}
+    nodes, edges, attrs = {}, {}, {}
+    for entry in mapping_data:
+        software = entry.get("malware")
+        techniques = entry.get("techniques", [])
+        if not software or not techniques:
+            continue
+        nodes[software] = "malware"
+        attrs[software] = {"type": entry.get("type", "malware"), "ref": ""}
+        refs = entry.get("technique_ids") or []
+        for i, tech in enumerate(techniques):
+            nodes.setdefault(tech, "technique")
+            attrs.setdefault(tech, {"type": "technique", "ref": refs[i] if i < len(refs) else ""})
+            edges[(software, tech)] = None
+    return nodes, list(edges), attrs
+
+def observed_software():
+    # ATT&CK software seen in today's OTX/ThreatFox snapshots (lowercase), highlighted in the viewer
+    try:
+        import exec_combined_mitre_visual as combined
+        from malware_resolver import MalwareResolver
+        return combined.resolve_focus(combined.extract_malware_from_feeds(), MalwareResolver.from_cache())
+    except Exception as e:
+        print(f"[!] Could not resolve today's malware, nothing is highlighted: {e}")
+        return set()
+
+def compact(nodes, edges, attrs, positions, observed, title):
+    # Nodes are ordered column by column, top to bottom, so the viewer can cluster a column by
+    # slicing it: at level l a cluster is FANOUT^l consecutive nodes of one column
+    layers = [group for group in LAYERS if group in nodes.values()]
+    layers += sorted(set(nodes.values()) - set(layers))
+    column_of = {group: i for i, group in enumerate(layers)}
+    order = sorted(nodes, key=lambda name: (column_of[nodes[name]], -positions[name][1], name))
+    index = {name: i for i, name in enumerate(order)}
+
+    columns, start = [], 0
+    for group in layers:
+        count = sum(1 for name in order if nodes[name] == group)
+        columns.append([start, count])
+        start += count
+    degree = [0] * len(order)
+    flat = []
+    for source, target in edges:
+        flat += (index[source], index[target])
+        degree[index[source]] += 1
+        degree[index[target]] += 1
+
+    # World coordinates: y grows downwards like the screen
+    height = ROW_HEIGHT * max(max(count for _, count in columns) - 1, 1)
+    width = COLUMN_WIDTH * max(len(layers) - 1, 1)
+    return {
+        "version": GRAPH_VERSION,
+        "title": title,
+        "generated": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
+        "width": width,
+        "height": height,
+        "groups": [{"name": group, **GROUPS.get(group, {"color": "#cccccc", "label": group})} for group in layers],
+        "columns": columns,
+        "nodes": {
+            "name": order,
+            "x": [round(positions[name][0] * width, 1) for name in order],
+            "y": [round((1 - positions[name][1]) * height, 1) for name in order],
+            "degree": degree,
+            "ref": [attrs[name]["ref"] for name in order]
+        },
+        "tools": [index[name] for name in order if attrs[name]["type"] == "tool"],
+        "observed": [index[name] for name in order if nodes[name] == "malware" and name.lower() in observed],
+        "edges": flat
+    }
+
+# === Writers ===
+def _write_atomic(path, write):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+def write_json(path, data):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    _write_atomic(path, write)
+
+GRAPHML_HEAD = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">
+  <key id="label" for="node" attr.name="label" attr.type="string"/>
+  <key id="group" for="node" attr.name="group" attr.type="string"/>
+  <key id="type" for="node" attr.name="type" attr.type="string"/>
+  <key id="ref" for="node" attr.name="ref" attr.type="string"/>
+  <key id="degree" for="node" attr.name="degree" attr.type="int"/>
+  <key id="observed" for="node" attr.name="observed" attr.type="boolean"/>
+  <key id="x" for="node" attr.name="x" attr.type="double"/>
+  <key id="y" for="node" attr.name="y" attr.type="double"/>
+  <key id="relationship" for="edge" attr.name="relationship" attr.type="string"/>
+  <graph id="{{ title }}" edgedefault="directed">
+""")
+GRAPHML_NODE = Template("""    <node id="n{{ id }}"><data key="label">{{ label }}</data><data key="group">{{ group }}</data><data key="type">{{ type }}</data><data key="ref">{{ ref }}</data><data key="degree">{{ degree }}</data><data key="observed">{{ observed }}</data><data key="x">{{ x }}</data><data key="y">{{ y }}</data></node>
+""")
+GRAPHML_EDGE = Template("""    <edge source="n{{ source }}" target="n{{ target }}"><data key="relationship">uses</data></edge>
+""")
+GRAPHML_FOOT = "  </graph>\n</graphml>\n"
+
+def write_graphml(path, data):
+    # Streamed row by row like the HTML reports; networkx builds the whole tree first and is
+    # about 10x slower on large graphs. networkx.read_graphml, Gephi, yEd and Cytoscape read it.
+    table = data["nodes"]
+    observed, tools = set(data["observed"]), set(data["tools"])
+    def rows():
+        for column, (start, count) in zip(data["groups"], data["columns"]):
+            for i in range(start, start + count):
+                yield {
+                    "id": i, "label": table["name"][i], "group": column["name"],
+                    "type": "technique" if column["name"] == "technique" else ("tool" if i in tools else "malware"),
+                    "ref": table["ref"][i], "degree": table["degree"][i], "observed": str(i in observed).lower(),
+                    "x": table["x"][i], "y": table["y"][i]
+                }
+    edges = data["edges"]
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            GRAPHML_HEAD.write(f, title=data["title"])
+            GRAPHML_NODE.write_rows(f, rows())
+            GRAPHML_EDGE.write_rows(f, ({"source": edges[k], "target": edges[k + 1]} for k in range(0, len(edges), 2)))
+            f.write(GRAPHML_FOOT)
+    _write_atomic(path, write)
+
+def write_viewer(path, data, src=None):
+    # Inlines the JSON unless src is given, in which case the viewer fetches it (served over HTTP)
+    payload = "" if src else json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            VIEWER.write(f, title=data["title"], heading=data["title"], generated=data["generated"],
+                         src=src or "", data=payload, script=VIEWER_SCRIPT)
+    _write_atomic(path, write)
+
+def export(directory=None, name=NAME, embed=True):
+    # Writes <name>.graphml/.json/.html into directory (default reports/visuals/<date>), returns the paths
+    directory = Path(directory) if directory else visuals_path / datetime.utcnow().strftime("%Y-%m-%d")
+    mapping_data = attack_cache.load_mapping()
+    if not mapping_data:
+        print("[-] No MITRE mapping found, run the map step first.")
+        return []
+    start = time.monotonic()
+    nodes, edges, attrs = build_graph(mapping_data)
+    positions = graph_layout.layout(nodes.items(), edges, LAYERS, key=name)
+    data = compact(nodes, edges, attrs, positions, observed_software(), "Malware ↔ MITRE Technique Relationships")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = [directory / f"{name}.graphml", directory / f"{name}.json", directory / f"{name}.html"]
+    write_graphml(paths[0], data)
+    write_json(paths[1], data)
+    write_viewer(paths[2], data, src=None if embed else paths[1].name)
+    print(f"[+] Graph export: {len(nodes)} nodes, {len(edges)} edges in {time.monotonic() - start:.2f}s -> {directory}")
+    return paths
+
+# === Viewer ===
+VIEWER = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{{ title }}</title>
+    <style>
+        html, body { margin: 0; height: 100%; overflow: hidden; font-family: Arial, sans-serif; }
+        canvas { display: block; cursor: grab; }
+        canvas.dragging { cursor: grabbing; }
+        #panel { position: absolute; top: 10px; left: 10px; width: 300px; padding: 8px 10px; font-size: 12px; color: #333;
+                 background: rgba(255, 255, 255, 0.92); border: 1px solid #ccc; border-radius: 4px; }
+        #panel h1 { font-size: 14px; margin: 0 0 4px; }
+        .meta { color: #777; margin: 3px 0; }
+        .swatch { display: inline-block; width: 10px; height: 10px; border-radius: 50%; margin: 0 4px 0 8px; vertical-align: middle; }
+        #search { width: 100%; box-sizing: border-box; margin: 6px 0 2px; padding: 3px 4px; }
+        #tooltip { position: absolute; display: none; pointer-events: none; max-width: 360px; padding: 5px 7px; font-size: 12px;
+                   color: #fff; background: rgba(40, 40, 40, 0.9); border-radius: 3px; }
+    </style>
+</head>
+<body>
+    <canvas id="view"></canvas>
+    <div id="panel">
+        <h1>{{ heading }}</h1>
+        <p class="meta">Generated: {{ generated }}</p>
+        <p id="legend"></p>
+        <p id="stats" class="meta"></p>
+        <input id="search" type="search" placeholder="Find malware, technique or ID (Enter)">
+        <p id="status" class="meta"></p>
+        <p class="meta">Scroll to zoom, drag to pan, click a node for its links, click a cluster to zoom in, Esc clears, 0 resets.</p>
+    </div>
+    <div id="tooltip"></div>
+    <script type="application/json" id="graph-data" data-src="{{ src }}">{{ data|raw }}</script>
+    <script>{{ script|raw }}</script>
+</body>
+</html>
+""")
+
+VIEWER_SCRIPT = r"""
+"use strict";
+const FANOUT = 4;           // a cluster at level l holds FANOUT^l neighbouring nodes of a column
+const MIN_SPACING = 7;      // px between items of a column below which they are clustered
+const LABEL_SPACING = 12;   // px between items of a column from which they are labelled
+const MARGIN = 240;         // px kept free left and right for labels
+const EDGE_LIMIT = 30000;   // most edges drawn per frame, heaviest first
+const MAX_LABEL = 34;
+
+const canvas = document.getElementById("view");
+const ctx = canvas.getContext("2d");
+const tooltip = document.getElementById("tooltip");
+let g, n, levels, items, colOf, adjacency, tools, xmin, xmax;
+let view = {top: 0, scale: 1}, width = 0, height = 0;
+let drawn = [], selected = -1, pending = false, aggregated = new Map();
+let matches = [], matchQuery = "", matchAt = 0;
+
+function load() {
+    const block = document.getElementById("graph-data");
+    if (block.dataset.src) return fetch(block.dataset.src).then(r => r.json());
+    return Promise.resolve(JSON.parse(block.textContent));
+}
+
+function prepare(data) {
+    g = data;
+    const nodes = g.nodes;
+    n = nodes.name.length;
+    colOf = new Int32Array(n);
+    g.columns.forEach(([start, count], c) => colOf.fill(c, start, start + count));
+    tools = new Set(g.tools);
+    xmin = Math.min(...nodes.x);
+    xmax = Math.max(...nodes.x);
+
+    // CSR adjacency, both directions
+    const edges = g.edges, offsets = new Int32Array(n + 1);
+    for (const i of edges) offsets[i + 1]++;
+    for (let i = 0; i < n; i++) offsets[i + 1] += offsets[i];
+    const fill = offsets.slice(0, n), targets = new Int32Array(edges.length);
+    for (let k = 0; k < edges.length; k += 2) {
+        targets[fill[edges[k]]++] = edges[k + 1];
+        targets[fill[edges[k + 1]]++] = edges[k];
+    }
+    adjacency = {offsets, targets};
+
+    // Every level's clusters in one flat item table, level 0 being the nodes themselves
+    const observed = new Uint8Array(n);
+    for (const i of g.observed) observed[i] = 1;
+    const largest = Math.max(...g.columns.map(c => c[1]));
+    const total = Math.ceil(n * FANOUT / (FANOUT - 1)) + g.columns.length * 32;
+    items = {x: new Float64Array(total), y: new Float64Array(total), first: new Int32Array(total),
+             count: new Int32Array(total), lead: new Int32Array(total), observed: new Uint8Array(total),
+             level: new Int32Array(total), column: new Int32Array(total), length: 0};
+    levels = [];
+    for (let size = 1; ; size *= FANOUT) {
+        const level = {size, of: new Int32Array(n), columns: []};
+        g.columns.forEach(([start, count], c) => {
+            const firstItem = items.length;
+            for (let lo = start; lo < start + count; lo += size) {
+                const hi = Math.min(lo + size, start + count), k = items.length++;
+                let x = 0, y = 0, lead = lo, seen = 0;
+                for (let i = lo; i < hi; i++) {
+                    x += nodes.x[i]; y += nodes.y[i]; seen |= observed[i];
+                    if (nodes.degree[i] > nodes.degree[lead]) lead = i;
+                    level.of[i] = k;
+                }
+                items.x[k] = x / (hi - lo); items.y[k] = y / (hi - lo);
+                items.first[k] = lo; items.count[k] = hi - lo; items.lead[k] = lead;
+                items.observed[k] = seen; items.level[k] = levels.length; items.column[k] = c;
+            }
+            level.columns.push([firstItem, items.length - firstItem]);
+        });
+        levels.push(level);
+        if (size >= largest) break;
+    }
+}
+
+// === View ===
+function resize() {
+    const ratio = window.devicePixelRatio || 1;
+    width = window.innerWidth; height = window.innerHeight;
+    canvas.width = width * ratio; canvas.height = height * ratio;
+    canvas.style.width = width + "px"; canvas.style.height = height + "px";
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+}
+
+function reset() {
+    view.scale = (height - 40) / g.height;
+    view.top = -20 / view.scale;
+    redraw();
+}
+
+function clampView() {
+    const fit = (height - 40) / g.height;
+    // From half the fitted size down to 60px between the nodes of the fullest column
+    view.scale = Math.min(Math.max(view.scale, fit * 0.5), 60 * largestColumn() / g.height);
+    const visible = height / view.scale, pad = 20 / view.scale;
+    view.top = visible > g.height + 2 * pad ? (g.height - visible) / 2
+        : Math.min(Math.max(view.top, -pad), g.height + pad - visible);
+}
+
+function largestColumn() { return Math.max(...g.columns.map(c => c[1]), 2) - 1; }
+function sx(x) { return MARGIN + (xmax > xmin ? (x - xmin) / (xmax - xmin) : 0.5) * (width - 2 * MARGIN); }
+function sy(y) { return (y - view.top) * view.scale; }
+
+// Average px between neighbouring nodes of a column, and the coarsest level that keeps them apart
+function spacing(c) {
+    const [start, count] = g.columns[c];
+    if (count < 2) return Infinity;
+    return (g.nodes.y[start + count - 1] - g.nodes.y[start]) * view.scale / (count - 1) || Infinity;
+}
+function columnLevel(c) {
+    const px = spacing(c);
+    let level = 0;
+    while (level < levels.length - 1 && px * levels[level].size < MIN_SPACING) level++;
+    return level;
+}
+function itemOf(i, lv) { return levels[lv[colOf[i]]].of[i]; }
+
+// Edges between the items shown at these levels, weighted by how many node edges they merge
+function edgesAt(lv) {
+    const key = lv.join(",");
+    if (aggregated.has(key)) return aggregated.get(key);
+    const edges = g.edges, weights = new Map(), total = items.length;
+    for (let k = 0; k < edges.length; k += 2) {
+        const id = itemOf(edges[k], lv) * total + itemOf(edges[k + 1], lv);
+        weights.set(id, (weights.get(id) || 0) + 1);
+    }
+    const list = Array.from(weights).sort((a, b) => b[1] - a[1]);
+    const result = {a: new Int32Array(list.length), b: new Int32Array(list.length), w: new Float64Array(list.length)};
+    list.forEach(([id, w], k) => {
+        result.a[k] = Math.floor(id / total); result.b[k] = id % total; result.w[k] = w;
+    });
+    if (aggregated.size > 16) aggregated.clear();
+    aggregated.set(key, result);
+    return result;
+}
+
+function visibleRange(first, count) {
+    // Items of a column are sorted by y: binary search the ones on screen
+    const top = view.top - 40 / view.scale, bottom = view.top + (height + 40) / view.scale;
+    let lo = first, hi = first + count;
+    while (lo < hi) { const mid = (lo + hi) >> 1; if (items.y[mid] < top) lo = mid + 1; else hi = mid; }
+    let end = lo;
+    while (end < first + count && items.y[end] <= bottom) end++;
+    return [lo, end];
+}
+
+function label(k) {
+    const text = g.nodes.name[items.lead[k]];
+    const short = text.length > MAX_LABEL ? text.slice(0, MAX_LABEL - 1) + "…" : text;
+    return items.count[k] > 1 ? `${short} +${items.count[k] - 1}` : short;
+}
+
+// === Drawing ===
+function draw() {
+    ctx.clearRect(0, 0, width, height);
+    const lv = g.columns.map((_, c) => columnLevel(c));
+    const focus = new Set();
+    let focusItem = -1;
+    if (selected >= 0) {
+        focusItem = itemOf(selected, lv);
+        for (let k = adjacency.offsets[selected]; k < adjacency.offsets[selected + 1]; k++) focus.add(itemOf(adjacency.targets[k], lv));
+    }
+
+    // Edges: bucketed by width so a frame is a handful of strokes
+    const edges = edgesAt(lv), top = 0, bottom = height;
+    const maxW = edges.w.length ? edges.w[0] : 1, buckets = [[], [], [], []];
+    let shown = 0;
+    for (let k = 0; k < edges.a.length && shown < EDGE_LIMIT; k++) {
+        const a = edges.a[k], b = edges.b[k], ya = sy(items.y[a]), yb = sy(items.y[b]);
+        if (Math.max(ya, yb) < top || Math.min(ya, yb) > bottom) continue;
+        buckets[Math.min(3, Math.floor(Math.sqrt(edges.w[k] / maxW) * 4))].push(k);
+        shown++;
+    }
+    const alpha = Math.min(0.5, Math.max(0.04, 1500 / (shown + 1))) * (selected >= 0 ? 0.3 : 1);
+    ctx.strokeStyle = "#555";
+    buckets.forEach((bucket, i) => {
+        if (!bucket.length) return;
+        ctx.globalAlpha = alpha * (1 + i * 0.5);
+        ctx.lineWidth = maxW > 1 ? 0.5 + i * 1.2 : 0.6;
+        ctx.beginPath();
+        for (const k of bucket) {
+            ctx.moveTo(sx(items.x[edges.a[k]]), sy(items.y[edges.a[k]]));
+            ctx.lineTo(sx(items.x[edges.b[k]]), sy(items.y[edges.b[k]]));
+        }
+        ctx.stroke();
+    });
+    if (focusItem >= 0) {
+        ctx.globalAlpha = 0.8; ctx.strokeStyle = "#c0392b"; ctx.lineWidth = 1.2;
+        ctx.beginPath();
+        for (const k of focus) {
+            ctx.moveTo(sx(items.x[focusItem]), sy(items.y[focusItem]));
+            ctx.lineTo(sx(items.x[k]), sy(items.y[k]));
+        }
+        ctx.stroke();
+    }
+    ctx.globalAlpha = 1;
+
+    // Nodes and clusters, column by column
+    drawn = [];
+    let count = 0;
+    lv.forEach((level, c) => {
+        const [first, total] = levels[level].columns[c], px = spacing(c) * levels[level].size;
+        const [lo, hi] = visibleRange(first, total);
+        const left = c === 0 && g.columns.length > 1, color = g.groups[c].color;
+        ctx.font = "11px Arial";
+        ctx.textAlign = left ? "right" : "left";
+        ctx.textBaseline = "middle";
+        for (let k = lo; k < hi; k++) {
+            const x = sx(items.x[k]), y = sy(items.y[k]), members = items.count[k];
+            const r = Math.max(1.5, Math.min(px * 0.45, members > 1 ? 3 + Math.sqrt(members) : 2 + Math.sqrt(g.nodes.degree[items.lead[k]]) * 0.4, 14));
+            const active = selected < 0 || k === focusItem || focus.has(k);
+            ctx.globalAlpha = active ? 1 : 0.25;
+            ctx.fillStyle = color;
+            ctx.beginPath(); ctx.arc(x, y, r, 0, 2 * Math.PI); ctx.fill();
+            if (members > 1 || items.observed[k]) {
+                ctx.strokeStyle = items.observed[k] ? "#8b0000" : "#666";
+                ctx.lineWidth = items.observed[k] ? 2 : 0.8;
+                ctx.stroke();
+            }
+            if (px >= LABEL_SPACING || (selected >= 0 && active && focus.size <= 80)) {
+                ctx.fillStyle = "#222";
+                ctx.font = items.observed[k] || k === focusItem ? "bold 11px Arial" : "11px Arial";
+                ctx.fillText(label(k), left ? x - r - 4 : x + r + 4, y);
+            }
+            drawn.push([k, x, y, r]);
+            count++;
+        }
+    });
+    ctx.globalAlpha = 1;
+    const levelsShown = lv.map((level, c) => `${g.groups[c].label} ${levels[level].size > 1 ? "clusters of " + levels[level].size : "nodes"}`);
+    document.getElementById("stats").textContent =
+        `${n} nodes, ${g.edges.length / 2} edges. Showing ${count} items, ${shown} edges (${levelsShown.join(", ")}).`;
+}
+
+function redraw() {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(() => { pending = false; clampView(); draw(); });
+}
+
+// === Interaction ===
+function hit(mx, my) {
+    let best = -1, bestD = Infinity;
+    for (const [k, x, y, r] of drawn) {
+        const d = Math.hypot(mx - x, my - y);
+        if (d <= Math.max(r, 6) && d < bestD) { best = k; bestD = d; }
+    }
+    return best;
+}
+
+function describe(k) {
+    const nodes = g.nodes, group = g.groups[items.column[k]].label;
+    if (items.count[k] === 1) {
+        const i = items.first[k];
+        const kind = tools.has(i) ? "Tool" : group;
+        return `<b>${escapeHtml(nodes.name[i])}</b>${nodes.ref[i] ? " (" + escapeHtml(nodes.ref[i]) + ")" : ""}<br>` +
+            `${kind}, ${nodes.degree[i]} links` + (items.observed[k] ? "<br>Seen in today's feeds" : "");
+    }
+    const members = [];
+    for (let i = items.first[k]; i < items.first[k] + items.count[k]; i++) members.push(i);
+    members.sort((a, b) => nodes.degree[b] - nodes.degree[a]);
+    const top = members.slice(0, 6).map(i => `${escapeHtml(nodes.name[i])} (${nodes.degree[i]})`);
+    return `<b>${items.count[k]} × ${escapeHtml(group)}</b><br>${top.join("<br>")}` +
+        (items.count[k] > 6 ? "<br>…" : "") + "<br><i>Click to zoom in</i>";
+}
+
+function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, ch => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})[ch]);
+}
+
+function zoomTo(y0, y1) {
+    view.scale = (height * 0.6) / Math.max(y1 - y0, 1e-6);
+    view.top = (y0 + y1) / 2 - height / 2 / view.scale;
+    redraw();
+}
+
+function focusNode(i) {
+    selected = i;
+    const c = colOf[i], [start, count] = g.columns[c];
+    const span = (g.nodes.y[start + count - 1] - g.nodes.y[start]) / Math.max(count - 1, 1);
+    if (span > 0) view.scale = Math.max(view.scale, LABEL_SPACING * 1.6 / span);
+    view.top = g.nodes.y[i] - height / 2 / view.scale;
+    redraw();
+}
+
+function search(query) {
+    query = query.trim().toLowerCase();
+    const status = document.getElementById("status");
+    if (!query) { status.textContent = ""; return; }
+    if (query !== matchQuery) {
+        const names = g.nodes.name, refs = g.nodes.ref;
+        // Exact names and ATT&CK IDs first, then substrings
+        const exact = [], partial = [];
+        for (let i = 0; i < n; i++) {
+            const name = names[i].toLowerCase();
+            if (name === query || refs[i].toLowerCase() === query) exact.push(i);
+            else if (name.includes(query)) partial.push(i);
+        }
+        matches = exact.concat(partial);
+        matchQuery = query; matchAt = 0;
+    } else {
+        matchAt = (matchAt + 1) % Math.max(matches.length, 1);
+    }
+    if (!matches.length) { status.textContent = "No match"; return; }
+    status.textContent = `${matchAt + 1} of ${matches.length}: ${g.nodes.name[matches[matchAt]]} (Enter for next)`;
+    focusNode(matches[matchAt]);
+}
+
+function bind() {
+    let drag = null;
+    canvas.addEventListener("wheel", e => {
+        e.preventDefault();
+        const y = view.top + e.offsetY / view.scale;
+        view.scale *= Math.exp(-e.deltaY * 0.0015);
+        clampView();
+        view.top = y - e.offsetY / view.scale;
+        redraw();
+    }, {passive: false});
+    canvas.addEventListener("mousedown", e => { drag = {y: e.clientY, top: view.top, moved: false}; });
+    window.addEventListener("mouseup", e => {
+        if (drag && !drag.moved) {
+            const k = hit(e.offsetX, e.offsetY);
+            if (k < 0) selected = -1;
+            else if (items.count[k] > 1) zoomTo(g.nodes.y[items.first[k]], g.nodes.y[items.first[k] + items.count[k] - 1]);
+            else selected = selected === items.first[k] ? -1 : items.first[k];
+            redraw();
+        }
+        drag = null;
+        canvas.classList.remove("dragging");
+    });
+    canvas.addEventListener("mousemove", e => {
+        if (drag) {
+            if (Math.abs(e.clientY - drag.y) > 3) { drag.moved = true; canvas.classList.add("dragging"); }
+            view.top = drag.top - (e.clientY - drag.y) / view.scale;
+            tooltip.style.display = "none";
+            redraw();
+            return;
+        }
+        const k = hit(e.offsetX, e.offsetY);
+        if (k < 0) { tooltip.style.display = "none"; return; }
+        tooltip.innerHTML = describe(k);
+        tooltip.style.display = "block";
+        tooltip.style.left = Math.min(e.clientX + 14, width - 370) + "px";
+        tooltip.style.top = (e.clientY + 14) + "px";
+    });
+    canvas.addEventListener("mouseleave", () => { tooltip.style.display = "none"; });
+    document.getElementById("search").addEventListener("keydown", e => { if (e.key === "Enter") search(e.target.value); });
+    window.addEventListener("keydown", e => {
+        if (e.target.tagName === "INPUT") return;
+        if (e.key === "Escape") { selected = -1; redraw(); }
+        if (e.key === "0") reset();
+    });
+    window.addEventListener("resize", () => { resize(); redraw(); });
+}
+
+function legend() {
+    const parts = g.groups.map(group => `<span class="swatch" style="background:${group.color}"></span>${escapeHtml(group.label)}`);
+    if (g.observed.length) parts.push(`<span class="swatch" style="border:2px solid #8b0000"></span>Seen today (${g.observed.length})`);
+    document.getElementById("legend").innerHTML = parts.join("");
+}
+
+load().then(data => {
+    prepare(data);
+    legend();
+    resize();
+    bind();
+    reset();
+}).catch(e => { document.getElementById("stats").textContent = "Could not load the graph: " + e; });
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the full malware-technique graph as GraphML, compact JSON and an HTML viewer")
+    parser.add_argument("--out", help="output directory, defaults to reports/visuals/<date>")
+    parser.add_argument("--name", default=NAME, help="file name (and layout cache key) for the export")
+    parser.add_argument("--no-embed", action="store_true", help="let the viewer fetch the .json instead of inlining it (serve the folder over HTTP)")
+    args = parser.parse_args()
+
+    if not export(args.out, args.name, embed=not args.no_embed):
+        sys.exit(1)
@@ -0,0 +1,163 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+cache_path = base_path / "data" / "layout_cache"
+
+# Layered layout for malware <-> technique graphs, deterministic and stable from day to day.
+#   - every group (malware, technique, ...) is a column, in the order the groups are given
+#   - within a column nodes start in a fixed order (most connected first, then by name), or at
+#     the position they had last time
+#   - a few rounds of vectorised relaxation pull every node towards the mean height of its
+#     neighbours (fewer crossings) and back towards its previous height, then spread each column
+#     so no two nodes are closer than MIN_GAP of an even spacing
+# Each round is O(nodes log nodes + edges), unlike spring layouts which are O(nodes^2).
+LAYOUT_VERSION = 1
+ITERATIONS = 60               # rounds for a graph laid out from scratch
+INCREMENTAL_ITERATIONS = 15   # rounds when most nodes already have a cached position
+STEP = 0.5                    # how far a node moves towards its neighbours per round
+STABILITY = 0.3               # pull back towards the cached position per round
+MIN_GAP = 0.6                 # minimum distance between nodes, as a share of even spacing
+EVEN_SHARE = 0.5              # final heights are blended this much with even spacing
+STAGGER_ABOVE = 30            # columns with more nodes are staggered so labels overlap less
+STAGGER = 0.08
+MAX_AGE_DAYS = 30             # cached nodes not seen for this long are forgotten
+
+def _spread(y, gap):
+    # Keeps the order of y, pushes neighbours at least gap apart and rescales to [0, 1]
+    import numpy as np
+
+    order = np.argsort(y, kind="stable")
+    offsets = gap * np.arange(len(y))
+    spaced = np.maximum.accumulate(y[order] - offsets) + offsets
+    span = spaced[-1] - spaced[0]
+    result = np.empty_like(y)
+    result[order] = (spaced - spaced[0]) / span if span > 0 else 0.5
+    return result
+
+def layered_layout(nodes, edges, layers, previous=None, iterations=None):
+    # nodes: [(name, group)], edges: [(source, target)], layers: groups from left to right,
+    # previous: {name: y} from an earlier run. Returns {name: (x, y)} with x and y in [0, 1].
+    import numpy as np
+
+    previous = previous or {}
+    names = [name for name, _ in nodes]
+    if not names:
+        return {}
+    present = {group for _, group in nodes}
+    layers = [group for group in layers if group in present] + sorted(present - set(layers))
+    layer_of = {group: i for i, group in enumerate(layers)}
+    index = {name: i for i, name in enumerate(names)}
+    layer = np.array([layer_of[group] for _, group in nodes])
+    pairs = np.array([(index[s], index[t]) for s, t in edges if s in index and t in index], dtype=np.int64).reshape(-1, 2)
+    source, target = pairs[:, 0], pairs[:, 1]
+    degree = np.bincount(np.concatenate([source, target]), minlength=len(names)).astype(float)
+
+    # Heights run top (0) to bottom (1) internally
+    anchor = np.array([1.0 - previous[name] if name in previous else np.nan for name in names])
+    known = ~np.isnan(anchor)
+    if iterations is None:
+        iterations = INCREMENTAL_ITERATIONS if known.sum() >= len(names) / 2 else ITERATIONS
+
+    # Starting heights: the cached position; a new node next to cached neighbours starts at
+    # their mean height, any other new node by rank (most connected first, ties by name)
+    # below everything cached in its column
+    y = np.where(known, anchor, 0.0)
+    total = np.zeros(len(names))
+    count = np.zeros(len(names))
+    for a, b in ((source, target), (target, source)):
+        np.add.at(total, a, np.where(known[b], anchor[b], 0.0))
+        np.add.at(count, a, known[b])
+    columns = [np.flatnonzero(layer == i) for i in range(len(layers))]
+    for members in columns:
+        fresh = [i for i in members if not known[i]]
+        fresh.sort(key=lambda i: (-degree[i], names[i]))
+        if not fresh:
+            continue
+        start = anchor[members[known[members]]].max() if known[members].any() else 0.0
+        for rank, i in enumerate(fresh):
+            y[i] = total[i] / count[i] if count[i] else start + (rank + 1) / (len(members) + 1)
+    for members in columns:
+        y[members] = _spread(y[members], 0.0)
+
+    for _ in range(iterations):
+        # Mean height of every node's neighbours, nodes without edges stay put
+        total = np.zeros(len(names))
+        np.add.at(total, source, y[target])
+        np.add.at(total, target, y[source])
+        target_y = np.where(degree > 0, total / np.maximum(degree, 1), y)
+        y = y + STEP * (target_y - y)
+        y = np.where(known, y + STABILITY * (anchor - y), y)
+        for members in columns:
+            if len(members) > 1:
+                y[members] = _spread(y[members], MIN_GAP / (len(members) - 1))
+
+    x = layer / max(len(layers) - 1, 1)
+    for members in columns:
+        if len(members) > 1:
+            # Keeps the order but uses the column's full height
+            ranks = np.argsort(np.argsort(y[members], kind="stable"), kind="stable")
+            y[members] = (1 - EVEN_SHARE) * y[members] + EVEN_SHARE * ranks / (len(members) - 1)
+        if len(members) > STAGGER_ABOVE:
+            # Alternating sub-columns, so neighbouring labels do not sit on one line
+            ranks = np.argsort(np.argsort(y[members], kind="stable"), kind="stable")
+            x[members] = x[members] + STAGGER * ((ranks % 3) - 1)
+    # Top of the figure first
+    return {name: (float(x[i]), float(1.0 - y[i])) for i, name in enumerate(names)}
+
+# === Position Cache ===
+def _cache_file(key):
+    slug = re.sub(r"[^a-z0-9]+", "_", key.lower()).strip("_") or "graph"
+    return cache_path / f"{slug}.json"
+
+def graph_hash(nodes, edges, layers):
+    material = json.dumps([LAYOUT_VERSION, list(layers), sorted(map(list, nodes)), sorted(map(list, edges))],
+                          separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def load_positions(key):
+    # {"graph": hash of the graph last laid out, "nodes": {name: {"x", "y", "seen"}}}
+    path = _cache_file(key)
+    if not path.exists():
+        return {"graph": None, "nodes": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        cached = json.load(f)
+    if cached.get("version") != LAYOUT_VERSION:
+        return {"graph": None, "nodes": {}}
+    return cached
+
+def save_positions(key, graph, nodes):
+    path = _cache_file(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": LAYOUT_VERSION, "graph": graph, "nodes": nodes}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def layout(nodes, edges, layers, key=None):
+    # Layered layout; with a key, positions are cached per node across runs so the graph is
+    # laid out incrementally and stays in place from one day to the next. An unchanged graph
+    # gets exactly its previous positions back, so its chart stays a chart cache hit.
+    if not key:
+        return layered_layout(nodes, edges, layers)
+    cached = load_positions(key)
+    current = graph_hash(nodes, edges, layers)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    if cached["graph"] == current:
+        positions = {name: (cached["nodes"][name]["x"], cached["nodes"][name]["y"]) for name, _ in nodes}
+    else:
+        previous = {name: entry["y"] for name, entry in cached["nodes"].items()}
+        positions = layered_layout(nodes, edges, layers, previous)
+        positions = {name: (round(x, 6), round(y, 6)) for name, (x, y) in positions.items()}
+
+    cutoff = (datetime.utcnow() - timedelta(days=MAX_AGE_DAYS)).strftime("%Y-%m-%d")
+    kept = {name: entry for name, entry in cached["nodes"].items() if entry["seen"] >= cutoff}
+    kept.update({name: {"x": x, "y": y, "seen": today} for name, (x, y) in positions.items()})
+    save_positions(key, current, kept)
+    return positions
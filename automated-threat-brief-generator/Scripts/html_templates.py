@@ -0,0 +1,56 @@
+import re
+from html import escape
+
+# Minimal precompiled templates for the HTML reports.
+#   {{ name }}      value is HTML-escaped (the default, feed data is never trusted)
+#   {{ name|raw }}  value is inserted as is, for markup the report builds itself
+# A template is compiled once into a str.format pattern, so rendering is a single format call
+# and a report is streamed to its file one section or one table row at a time.
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)(?:\|(\w+))?\s*\}\}")
+
+def _escape(value):
+    return escape("" if value is None else str(value), quote=True)
+
+def _raw(value):
+    return "" if value is None else str(value)
+
+FILTERS = {
+    "escape": _escape,
+    "raw": _raw
+}
+
+class Template:
+    def __init__(self, source):
+        pattern = []
+        self.fields = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            pattern.append(source[position:match.start()].replace("{", "{{").replace("}", "}}"))
+            pattern.append("{}")
+            name, filter_name = match.group(1), match.group(2) or "escape"
+            if filter_name not in FILTERS:
+                raise ValueError(f"Unknown template filter {filter_name!r} in {match.group(0)}")
+            self.fields.append((name, FILTERS[filter_name]))
+            position = match.end()
+        pattern.append(source[position:].replace("{", "{{").replace("}", "}}"))
+        self._pattern = "".join(pattern)
+
+    def render(self, values=None, **kwargs):
+        if kwargs:
+            values = {**values, **kwargs} if values else kwargs
+        try:
+            return self._pattern.format(*[apply(values[name]) for name, apply in self.fields])
+        except KeyError as e:
+            raise KeyError(f"Template value {e.args[0]!r} is missing") from None
+
+    def write(self, out, values=None, **kwargs):
+        out.write(self.render(values, **kwargs))
+
+    def write_rows(self, out, rows):
+        # One render per row, so memory stays flat however many rows there are
+        fill, fields, write = self._pattern.format, self.fields, out.write
+        try:
+            for row in rows:
+                write(fill(*[apply(row[name]) for name, apply in fields]))
+        except KeyError as e:
+            raise KeyError(f"Template value {e.args[0]!r} is missing") from None
@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import feed_cache
+
+# requests is imported on first use: it is the slowest import of the fetchers, and cache
+# bookkeeping, replays and most commands never send a request
+
+# === Settings ===
+DEFAULT_TIMEOUT = 30         # seconds, used when a caller does not pass its own
+MAX_RETRIES = 4              # retries after the first attempt
+BACKOFF_BASE = 1.0           # seconds, doubled on every retry
+BACKOFF_MAX = 60.0           # cap for a single backoff sleep
+RETRY_AFTER_MAX = 300.0      # never honour a Retry-After longer than this
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_SIZE = 10               # keep-alive connections kept per host
+
+# Minimum seconds between two requests to the same host
+HOST_RATE_LIMITS = {
+    "otx.alienvault.com": 0.5,
+    "api.abuseipdb.com": 1.0,
+    "threatfox-api.abuse.ch": 0.5,
+    "threatfox.abuse.ch": 0.5
+}
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "CTI-Tools-V2"
+}
+
+# === Shared Session ===
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    # One pooled session for every connector so TLS connections are reused between calls
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+    return _session
+
+# === Per-Host Rate Limiting ===
+class HostRateLimiter:
+    def __init__(self, limits):
+        self.limits = limits
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        interval = self.limits.get(host, 0)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, host, seconds):
+        # A Retry-After from one host holds back every thread talking to it
+        with self._lock:
+            self._next_slot[host] = max(self._next_slot.get(host, 0), time.monotonic() + seconds)
+
+_limiter = HostRateLimiter(HOST_RATE_LIMITS)
+
+# === Deadlines ===
+# A deadline is a time.monotonic() value covering a whole feed run (every page and retry),
+# unlike timeout, which applies to a single attempt
+class DeadlineExceeded(Exception):
+    pass
+
+def time_left(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+def check_deadline(deadline, what):
+    # Called before anything is committed (snapshots, sync watermarks): once the deadline has
+    # passed the run counts as timed out and must leave no trace
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded(f"{what}: deadline passed, nothing saved")
+
+# === Retry Helpers ===
+def _backoff(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), RETRY_AFTER_MAX)
+
+# === Requests ===
+def _send(method, url, timeout, retries, deadline=None, **kwargs):
+    import requests
+    session = get_session()
+    host = urlsplit(url).hostname
+    for attempt in range(retries + 1):
+        _limiter.wait(host)
+        left = time_left(deadline)
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"{method} {host}: deadline passed before attempt {attempt + 1}")
+        try:
+            response = session.request(method, url, timeout=timeout if left is None else min(timeout, left), **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise
+            delay = _backoff(attempt)
+            left = time_left(deadline)
+            if left is not None and delay >= left:
+                raise DeadlineExceeded(f"{method} {host} failed ({e.__class__.__name__}), no time left to retry") from e
+            print(f"[!] {method} {host} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+
+        delay = _retry_after(response)
+        left = time_left(deadline)
+        if left is not None and (delay or 0) >= left:
+            return response  # no time left for another attempt, the caller sees the error status
+        if delay is None:
+            delay = _backoff(attempt)
+            if left is not None:
+                delay = min(delay, left)
+        else:
+            _limiter.defer(host, delay)
+        print(f"[!] {method} {host} returned {response.status_code}, retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+def _cached_response(entry):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    response = requests.Response()
+    response.status_code = 200
+    response.url = entry.meta.get("url")
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = entry.read_body()
+    response.from_cache = True
+    return response
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, cache=None, deadline=None, **kwargs):
+    # cache names the feed whose TTL applies; without it the request always hits the network.
+    # deadline (time.monotonic()) bounds every attempt and retry of this request.
+    if not cache or not feed_cache.enabled():
+        return _send(method, url, timeout, retries, deadline, **kwargs)
+
+    body = kwargs.get("json", kwargs.get("data"))
+    key = feed_cache.request_key(method, url, kwargs.get("params"), body)
+    entry = feed_cache.lookup(cache, key)
+
+    if feed_cache.replaying():
+        if entry is None:
+            raise feed_cache.ReplayMiss(f"No recorded {cache} response for {method} {url}")
+        return _cached_response(entry)
+    if entry is not None and feed_cache.MODE == "on" and entry.is_fresh():
+        return _cached_response(entry)
+
+    if entry is not None:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **entry.validators()}
+    response = _send(method, url, timeout, retries, deadline, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        entry.touch()
+        return _cached_response(entry)
+    if response.status_code == 200:
+        feed_cache.store(cache, key, url, response.status_code, response.headers, response.content)
+    return response
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,188 @@
+import re
+import ipaddress
+from sys import intern
+from urllib.parse import urlsplit
+
+# One normalised record type for every feed. Reports, graphs and the IOC store all
+# consume Indicator objects, so a new feed only needs a parse_<feed>() generator here.
+
+UNKNOWN_FAMILIES = {"", "unknown", "unknown malware", "none"}
+# Hashes and host names are case-insensitive; URLs keep their path as reported
+CASE_INSENSITIVE_TYPES = {"domain", "hostname", "md5", "sha1", "sha256", "filehash-md5", "filehash-sha1",
+                          "filehash-sha256", "md5_hash", "sha1_hash", "sha256_hash"}
+HASH_KINDS = {32: "md5", 40: "sha1", 64: "sha256"}
+HEX_VALUE = re.compile(r"^[0-9a-fA-F]+$")
+IPV4 = re.compile(r"^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(?::(\d{1,5}))?$")
+
+class Indicator:
+    # __slots__ and interned family/threat type/tag/timestamp strings keep a record a fraction of
+    # the size of the per-record dicts the parsers used to build
+    __slots__ = ("source", "value", "kind", "family", "threat_type", "confidence",
+                 "tags", "first_seen", "last_seen", "name", "references")
+
+    def __init__(self, source, value=None, kind=None, family=None, threat_type=None, confidence=None,
+                 tags=(), first_seen=None, last_seen=None, name=None, references=()):
+        self.source = source
+        self.value = value
+        self.kind = kind
+        self.family = family
+        self.threat_type = threat_type
+        self.confidence = confidence
+        self.tags = tags
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self.name = name
+        self.references = references
+
+    def __repr__(self):
+        return f"Indicator({self.source}, {self.value or self.name!r}, family={self.family!r})"
+
+# === Field Normalisation ===
+def _intern(value):
+    return intern(str(value)) if value else None
+
+def family_name(name):
+    if name is None or str(name).strip().lower() in UNKNOWN_FAMILIES:
+        return None
+    return intern(str(name).strip())
+
+def timestamp(value):
+    # "2025-06-01 10:00:00 UTC", "2025-06-01T10:00:00.123" and "2025-06-01T10:00:00+00:00"
+    # all become "2025-06-01 10:00:00", which sorts chronologically as text
+    if not value:
+        return None
+    return intern(str(value)[:19].replace("T", " "))
+
+def clean_value(value, kind):
+    value = str(value).strip()
+    if kind and kind.lower() in CASE_INSENSITIVE_TYPES:
+        return value.lower()
+    return value
+
+def refang(value):
+    # hxxp://evil[.]com -> http://evil.com
+    return value.replace("[.]", ".").replace("(.)", ".").replace("hxxp", "http").replace("[:]", ":")
+
+def split_address(value):
+    # "1.2.3.4", "1.2.3.4:443", "[2001:db8::1]:443" -> (canonical address text, port or None),
+    # or (None, None) for anything that is not an address
+    match = IPV4.match(value)
+    if match:
+        # Most indicators are dotted quads, which are much cheaper to check by hand
+        octets = [int(octet) for octet in match.groups()[:4]]
+        if max(octets) > 255:
+            return None, None
+        return ".".join(map(str, octets)), int(match.group(5)) if match.group(5) else None
+    try:
+        return str(ipaddress.ip_address(value)), None
+    except ValueError:
+        pass
+    if value.startswith("[") and "]" in value:
+        host, _, port = value[1:].partition("]")
+        port = port[1:] if port.startswith(":") else ""
+    elif value.count(":") == 1:
+        host, port = value.split(":", 1)
+    else:
+        return None, None
+    try:
+        return str(ipaddress.ip_address(host)), int(port) if port.isdigit() else None
+    except ValueError:
+        return None, None
+
+def normalise_ip(value):
+    return split_address(value)[0]
+
+def guess_kind(value):
+    # For a bare value typed by a user (no feed type to go by)
+    value = str(value).strip()
+    if "://" in value:
+        return "url"
+    if len(value) in HASH_KINDS and HEX_VALUE.match(value):
+        return HASH_KINDS[len(value)]
+    if ":" in value or value.replace(".", "").isdigit():
+        return "ip"
+    return "domain" if "." in value else None
+
+def store_value(value, kind=None):
+    # (value, port) as the IOC store keys an indicator, so every feed's form of it meets in one
+    # row: refanged, "ip:port" split into the address and its port, host names and hashes
+    # lowercased. URLs only get their scheme and host lowercased, the path stays as reported.
+    value = refang(str(value).strip())
+    kind = (kind or guess_kind(value) or "").lower()
+    if "url" in kind or "://" in value:
+        parts = urlsplit(value)
+        return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()).geturl(), None
+    if "ip" in kind:
+        address, port = split_address(value)
+        if address:
+            return address, port
+    if kind in ("domain", "hostname"):
+        return value.lower().rstrip("."), None
+    return clean_value(value, kind), None
+
+def normalise(value, kind=None):
+    # The form the IOC store keeps a value in, for lookups
+    return store_value(value, kind)[0]
+
+_TAG_SETS = {}
+
+def _tags(tags):
+    # Feeds repeat the same few tag combinations, so equal tuples are shared too
+    tags = tuple(intern(str(t)) for t in tags or () if t)
+    return _TAG_SETS.setdefault(tags, tags)
+
+# === Feed Parsers ===
+def _otx_family(pulse):
+    family = family_name(pulse.get("malware_family"))
+    if family is None:
+        families = pulse.get("malware_families") or []
+        if families:
+            first = families[0]
+            family = family_name(first.get("display_name") if isinstance(first, dict) else first)
+    return family
+
+def parse_otx(pulses, expand=False):
+    # One record per pulse, or with expand=True one per pulse indicator
+    source = intern("otx")
+    for pulse in pulses:
+        if not isinstance(pulse, dict):
+            continue
+        family = _otx_family(pulse)
+        tags = _tags(pulse.get("tags"))
+        first_seen = timestamp(pulse.get("created"))
+        last_seen = timestamp(pulse.get("modified")) or first_seen
+        if not expand:
+            yield Indicator(source, family=family, tags=tags, first_seen=first_seen, last_seen=last_seen,
+                            name=pulse.get("name"), references=tuple(pulse.get("references") or ()))
+            continue
+        for ind in pulse.get("indicators") or ():
+            if not ind.get("indicator"):
+                continue
+            kind = _intern(ind.get("type"))
+            yield Indicator(source, clean_value(ind["indicator"], kind), kind, family, tags=tags,
+                            first_seen=timestamp(ind.get("created")) or last_seen, last_seen=last_seen,
+                            name=pulse.get("name"))
+
+def parse_threatfox(iocs):
+    source = intern("threatfox")
+    for ioc in iocs:
+        if not isinstance(ioc, dict) or not ioc.get("ioc"):
+            continue  # skip strings or malformed entries
+        kind = _intern(ioc.get("ioc_type"))
+        first_seen = timestamp(ioc.get("first_seen"))
+        yield Indicator(source, clean_value(ioc["ioc"], kind), kind,
+                        family_name(ioc.get("malware_printable") or ioc.get("malware")),
+                        _intern(ioc.get("threat_type")), ioc.get("confidence_level"), _tags(ioc.get("tags")),
+                        first_seen, timestamp(ioc.get("last_seen")) or first_seen,
+                        references=(ioc["reference"],) if ioc.get("reference") else ())
+
+def parse_abuseipdb(records):
+    source = intern("abuseipdb")
+    kind = intern("ip")
+    threat_type = intern("abusive_ip")
+    for record in records:
+        if not isinstance(record, dict) or not record.get("ipAddress"):
+            continue
+        seen = timestamp(record.get("lastReportedAt"))
+        yield Indicator(source, record["ipAddress"], kind, threat_type=threat_type,
+                        confidence=record.get("abuseConfidenceScore"), first_seen=seen, last_seen=seen)
@@ -0,0 +1,232 @@
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import indicators
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+store_file = data_path / "ioc_store.sqlite"
+
+SCHEMA_VERSION = 2
+BATCH_SIZE = 50000
+
+# (indicator, source) is the primary key of a WITHOUT ROWID table, so "has this been seen?"
+# is a single B-tree probe. Secondary indexes carry the primary key, which makes the
+# family and recency queries below covering. Indicators are keyed in the form
+# indicators.store_value() gives them, so a ThreatFox "1.2.3.4:443" is the address 1.2.3.4
+# with port 443 and meets the same address from OTX or AbuseIPDB.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS iocs (
+    indicator TEXT NOT NULL,
+    source TEXT NOT NULL,
+    type TEXT,
+    port INTEGER,
+    family TEXT,
+    threat_type TEXT,
+    confidence INTEGER,
+    first_seen TEXT,
+    last_seen TEXT,
+    times_seen INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (indicator, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_iocs_family_seen ON iocs (family COLLATE NOCASE, last_seen, threat_type);
+CREATE INDEX IF NOT EXISTS idx_iocs_last_seen ON iocs (last_seen, first_seen, family);
+"""
+
+# times_seen counts sightings, not ingests: it only goes up when a record brings a newer
+# last_seen, so re-ingesting the same ThreatFox window or AbuseIPDB response leaves it alone
+UPSERT = """
+INSERT INTO iocs (indicator, source, type, port, family, threat_type, confidence, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (indicator, source) DO UPDATE SET
+    type = coalesce(excluded.type, type),
+    port = coalesce(excluded.port, port),
+    family = coalesce(excluded.family, family),
+    threat_type = coalesce(excluded.threat_type, threat_type),
+    confidence = coalesce(excluded.confidence, confidence),
+    first_seen = min(coalesce(first_seen, excluded.first_seen), coalesce(excluded.first_seen, first_seen)),
+    last_seen = max(coalesce(last_seen, excluded.last_seen), coalesce(excluded.last_seen, last_seen)),
+    times_seen = times_seen + coalesce(excluded.last_seen > coalesce(last_seen, ''), 0)
+"""
+
+# v1 kept indicators as the feeds sent them (ports attached, defanged, mixed-case hosts). The
+# upgrade re-keys every row in one transaction; rows that turn out to be the same indicator
+# are merged and their sightings added up.
+UPGRADE_V1 = """
+BEGIN;
+DROP INDEX IF EXISTS idx_iocs_family_seen;
+DROP INDEX IF EXISTS idx_iocs_last_seen;
+ALTER TABLE iocs RENAME TO iocs_v1;
+""" + SCHEMA
+MERGE = """
+INSERT INTO iocs (indicator, source, type, port, family, threat_type, confidence, first_seen, last_seen, times_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (indicator, source) DO UPDATE SET
+    type = coalesce(excluded.type, type),
+    port = coalesce(excluded.port, port),
+    family = coalesce(excluded.family, family),
+    threat_type = coalesce(excluded.threat_type, threat_type),
+    confidence = coalesce(excluded.confidence, confidence),
+    first_seen = min(coalesce(first_seen, excluded.first_seen), coalesce(excluded.first_seen, first_seen)),
+    last_seen = max(coalesce(last_seen, excluded.last_seen), coalesce(excluded.last_seen, last_seen)),
+    times_seen = times_seen + excluded.times_seen
+"""
+
+# === Database ===
+def connect(path=store_file):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        with conn:
+            if version == 1:
+                _upgrade_v1(conn)
+            else:
+                conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+def _upgrade_v1(conn):
+    conn.executescript(UPGRADE_V1)
+    def rows():
+        for row in conn.execute("SELECT * FROM iocs_v1"):
+            value, port = indicators.store_value(row["indicator"], row["type"])
+            yield (value, row["source"], row["type"], port, row["family"], row["threat_type"], row["confidence"],
+                   row["first_seen"], row["last_seen"], row["times_seen"])
+    conn.executemany(MERGE, rows())
+    conn.execute("DROP TABLE iocs_v1")
+
+# === Rows ===
+def to_rows(records):
+    # Indicator objects -> upsert rows; pulse-level OTX records without a value are skipped
+    for ind in records:
+        if ind.value:
+            value, port = indicators.store_value(ind.value, ind.kind)
+            yield (value, ind.source, ind.kind, port, ind.family, ind.threat_type, ind.confidence,
+                   ind.first_seen, ind.last_seen)
+
+# === Bulk Upsert ===
+def upsert(rows, conn=None):
+    # rows: (indicator, source, type, port, family, threat_type, confidence, first_seen, last_seen)
+    own = conn is None
+    conn = conn or connect()
+    total = 0
+    try:
+        batch = []
+        with conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    conn.executemany(UPSERT, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(UPSERT, batch)
+                total += len(batch)
+    finally:
+        if own:
+            conn.close()
+    return total
+
+def ingest_otx(pulses):
+    count = upsert(to_rows(indicators.parse_otx(pulses, expand=True)))
+    print(f"[+] IOC store: {count} OTX indicators upserted")
+    return count
+
+def ingest_threatfox(iocs):
+    count = upsert(to_rows(indicators.parse_threatfox(iocs)))
+    print(f"[+] IOC store: {count} ThreatFox indicators upserted")
+    return count
+
+def ingest_abuseipdb(records):
+    count = upsert(to_rows(indicators.parse_abuseipdb(records)))
+    print(f"[+] IOC store: {count} AbuseIPDB indicators upserted")
+    return count
+
+# === Queries ===
+def _since(days):
+    return (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+def lookup(indicator, conn=None, kind=None):
+    # Every source that has reported this indicator, normalised the way ingest stores it
+    # (refanged, port dropped, hosts and hashes lowercased); the value as typed is tried too in
+    # case the kind is guessed wrong
+    own = conn is None
+    conn = conn or connect()
+    values = (indicators.normalise(indicator, kind), indicator.strip())
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM iocs WHERE indicator IN (?, ?)", values)]
+    finally:
+        if own:
+            conn.close()
+
+def by_family(family, days=30, threat_type=None, conn=None):
+    # e.g. all Cobalt Strike C2s seen this month
+    own = conn is None
+    conn = conn or connect()
+    sql = "SELECT indicator, source, threat_type, last_seen FROM iocs WHERE family = ? COLLATE NOCASE AND last_seen >= ?"
+    args = [family, _since(days)]
+    if threat_type:
+        sql += " AND threat_type = ?"
+        args.append(threat_type)
+    try:
+        return [dict(row) for row in conn.execute(sql + " ORDER BY last_seen DESC", args)]
+    finally:
+        if own:
+            conn.close()
+
+def summary(days=1, conn=None):
+    # Counts the reports print: total stored, seen and new within the window, top families
+    own = conn is None
+    conn = conn or connect()
+    since = _since(days)
+    try:
+        total = conn.execute("SELECT count(*) FROM iocs").fetchone()[0]
+        seen = conn.execute("SELECT count(*) FROM iocs WHERE last_seen >= ?", (since,)).fetchone()[0]
+        new = conn.execute("SELECT count(*) FROM iocs WHERE last_seen >= ? AND first_seen >= ?", (since, since)).fetchone()[0]
+        families = conn.execute(
+            "SELECT family, count(*) AS n FROM iocs WHERE last_seen >= ? AND family IS NOT NULL "
+            "GROUP BY family ORDER BY n DESC LIMIT 10", (since,)).fetchall()
+        return {"total": total, "seen": seen, "new": new, "repeat": seen - new,
+                "families": [(row["family"], row["n"]) for row in families]}
+    finally:
+        if own:
+            conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local IOC store")
+    parser.add_argument("indicators", nargs="*", help="indicators to look up")
+    parser.add_argument("--family", help="list indicators of a malware family")
+    parser.add_argument("--threat-type", help="with --family, e.g. botnet_cc")
+    parser.add_argument("--days", type=int, default=30, help="window for --family and the summary")
+    args = parser.parse_args()
+
+    conn = connect()
+    for indicator in args.indicators:
+        rows = lookup(indicator, conn)
+        if not rows:
+            print(f"[-] {indicator}: never seen")
+        for row in rows:
+            port = f" port {row['port']}" if row["port"] else ""
+            print(f"[+] {indicator}: {row['source']}{port} {row['family'] or '-'} {row['threat_type'] or '-'} "
+                  f"first {row['first_seen']} last {row['last_seen']} ({row['times_seen']}x)")
+    if args.family:
+        rows = by_family(args.family, args.days, args.threat_type, conn)
+        print(f"[+] {args.family}: {len(rows)} indicators in the last {args.days} days")
+        for row in rows[:50]:
+            print(f"  - {row['indicator']} ({row['source']}, {row['threat_type'] or '-'}, {row['last_seen']})")
+    if not args.indicators and not args.family:
+        stats = summary(args.days, conn)
+        print(f"[+] {stats['total']} indicators stored, {stats['seen']} seen in the last {args.days} days "
+              f"({stats['new']} new, {stats['repeat']} seen before)")
+        for family, count in stats["families"]:
+            print(f"  - {family}: {count}")
+    conn.close()
@@ -0,0 +1,130 @@
+import re
+import sys
+import time
+import difflib
+from collections import namedtuple
+from functools import lru_cache
+
+import attack_cache
+
+# === Normalisation ===
+# Malpedia-style platform prefixes used by ThreatFox (win.lumma, elf.mirai, apk.hydra, ...)
+PLATFORM_PREFIX = re.compile(r"^(win|elf|apk|osx|ios|jar|js|ps1|py|php|vbs|asp|sh|lnk|symbian|fas|aix|pl)\.")
+# Descriptive words that ATT&CK names carry and feed names often drop ("Lumma Stealer" vs "win.lumma")
+GENERIC_WORDS = {"stealer", "rat", "loader", "bot", "botnet", "ransomware", "backdoor", "trojan",
+                 "malware", "banker", "miner", "worm", "dropper", "downloader", "c2", "framework"}
+FUZZY_MIN_LENGTH = 5   # shorter names are too ambiguous to fuzzy-match
+FUZZY_CUTOFF = 0.85
+
+def _words(name):
+    name = PLATFORM_PREFIX.sub("", name.strip().lower())
+    return [w for w in re.split(r"[^a-z0-9]+", name) if w]
+
+def normalise(name):
+    # "win.cobalt_strike" and "Cobalt Strike" -> "cobaltstrike"
+    return "".join(_words(name))
+
+def core_name(name):
+    # Normalised name without descriptive words: "Lumma Stealer" and "win.lumma" -> "lumma"
+    words = [w for w in _words(name) if w not in GENERIC_WORDS]
+    core = "".join(words)
+    return core if len(core) >= 3 else None
+
+Resolution = namedtuple("Resolution", ["query", "malware", "techniques", "confidence", "method"])
+
+# === Index ===
+class MalwareResolver:
+    # Method -> confidence reported with a match
+    CONFIDENCE = {"exact": 1.0, "normalised": 0.95, "core": 0.85}
+
+    def __init__(self, mapping, aliases=None):
+        aliases = aliases or {}
+        self.entries = mapping
+        self.exact, self.normalised, self.core = {}, {}, {}
+
+        # Primary names first so an alias can never shadow another family's real name
+        for i, entry in enumerate(mapping):
+            self._add(entry["malware"], i)
+        for i, entry in enumerate(mapping):
+            for alias in aliases.get(entry.get("id"), []):
+                self._add(alias, i)
+        # Fuzzy candidates bucketed by length: a ratio >= cutoff bounds how much lengths can differ
+        self._fuzzy_keys = {}
+        for key in self.normalised:
+            if len(key) >= FUZZY_MIN_LENGTH:
+                self._fuzzy_keys.setdefault(len(key), []).append(key)
+        self.resolve = lru_cache(maxsize=None)(self._resolve)
+
+    def _add(self, name, i):
+        self.exact.setdefault(name.strip().lower(), i)
+        key = normalise(name)
+        if key:
+            self.normalised.setdefault(key, i)
+        core = core_name(name)
+        if core:
+            self.core.setdefault(core, i)
+
+    @classmethod
+    def from_cache(cls):
+        # Aliases are only available from the compiled ATT&CK cache (rebuilt first if the bundle changed since)
+        cache = attack_cache.load_cache(rebuild=True)
+        if cache is not None:
+            return cls(cache["software"], cache["aliases"])
+        return cls(attack_cache.load_mapping())
+
+    def _result(self, query, i, confidence, method):
+        entry = self.entries[i]
+        return Resolution(query, entry["malware"], entry["techniques"], confidence, method)
+
+    def _resolve(self, name):
+        # O(1) exact / normalised / core lookups, then a ranked fuzzy fallback
+        if not name or not name.strip():
+            return None
+        i = self.exact.get(name.strip().lower())
+        if i is not None:
+            return self._result(name, i, self.CONFIDENCE["exact"], "exact")
+        key = normalise(name)
+        i = self.normalised.get(key)
+        if i is not None:
+            return self._result(name, i, self.CONFIDENCE["normalised"], "normalised")
+        core = core_name(name)
+        i = self.core.get(core) if core else None
+        if i is not None:
+            return self._result(name, i, self.CONFIDENCE["core"], "core")
+        candidates = self.candidates(name, n=1)
+        return candidates[0] if candidates else None
+
+    def candidates(self, name, n=5):
+        key = normalise(name)
+        if len(key) < FUZZY_MIN_LENGTH:
+            return []
+        low = int(len(key) * FUZZY_CUTOFF / (2 - FUZZY_CUTOFF))
+        high = int(len(key) * (2 - FUZZY_CUTOFF) / FUZZY_CUTOFF) + 1
+        pool = [k for length in range(low, high + 1) for k in self._fuzzy_keys.get(length, ())]
+        ranked = []
+        for match in difflib.get_close_matches(key, pool, n=n, cutoff=FUZZY_CUTOFF):
+            ratio = difflib.SequenceMatcher(None, key, match).ratio()
+            ranked.append(self._result(name, self.normalised[match], round(0.8 * ratio, 3), "fuzzy"))
+        return ranked
+
+    def techniques_for(self, name):
+        resolution = self.resolve(name)
+        return resolution.techniques if resolution else []
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    if not names:
+        print("Usage: python malware_resolver.py <family name> [<family name> ...]")
+        exit(1)
+
+    resolver = MalwareResolver.from_cache()
+    start = time.perf_counter()
+    results = [resolver.resolve(name) for name in names]
+    elapsed = time.perf_counter() - start
+
+    for name, result in zip(names, results):
+        if result:
+            print(f"{name:<35} -> {result.malware:<30} {result.confidence:.2f} ({result.method})")
+        else:
+            print(f"{name:<35} -> no match")
+    print(f"\n[+] Resolved {len(names)} names in {elapsed * 1000:.1f} ms")
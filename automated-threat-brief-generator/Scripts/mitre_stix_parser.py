@@ -1,79 +1,111 @@
-from stix2 import FileSystemSource, Filter
 from pathlib import Path
-import json
+import argparse
 from datetime import datetime
 
-# Update this path to your actual MITRE repo path
-MITRE_PATH = "C:/Users/<User>/Documents/CTI GIT Project/cti/enterprise-attack"
+import attack_cache
+import snapshot_catalog
 
+# Objects whose "uses" relationships we map onto techniques
+SOFTWARE_TYPES = ("malware", "tool")
+SOURCE_TYPES = SOFTWARE_TYPES + ("intrusion-set",)
+INDEXED_TYPES = SOURCE_TYPES + ("attack-pattern",)
 
-print(f"[*] Loading STIX files from: {MITRE_PATH}")
-fs = FileSystemSource(MITRE_PATH)
-
-# Get all malware entries
-malware_list = fs.query([Filter("type", "=", "malware")])
-print(f"[+] Loaded {len(malware_list)} malware entries.")
-
-# Print a few to verify
-for mw in malware_list[:5]:
-    print(f"- {mw.name}")
-
-
-print("\n[*] Parsing relationships between malware and techniques...")
-
-# Fetch all relationships
-relationships = fs.query([Filter("type", "=", "relationship")])
-
-# Build a dictionary: malware_name -> list of technique_names
-malware_to_techniques = {}
-
-for rel in relationships:
-    if rel.relationship_type != "uses":
-        continue
-    try:
-        # Only look for malware → technique links
-        source = fs.get(rel.source_ref)
-        target = fs.get(rel.target_ref)
-        if source is None or target is None:
-            continue
-        if source.type == "malware" and target.type == "attack-pattern":
-            malware_name = source.name
-            technique_name = target.name
-
-            if malware_name not in malware_to_techniques:
-                malware_to_techniques[malware_name] = []
-            malware_to_techniques[malware_name].append(technique_name)
-    except Exception as e:
-        continue  # skip malformed records
-
-# Print a sample mapping
-print("\n[+] Sample Malware → Techniques Mapping:")
-for malware, techniques in list(malware_to_techniques.items())[:5]:
-    print(f"\n{malware}:")
-    for t in techniques:
-        print(f"  - {t}")
-
-import json
-from datetime import datetime
-
-# Prepare data for export
-export_data = []
-for malware, techniques in malware_to_techniques.items():
-    export_data.append({
-        "malware": malware,
-        "techniques": list(set(techniques))  # remove duplicates
-    })
-
-# Save to file
+# === Paths ===
 script_path = Path(__file__).resolve()
 base_path = script_path.parent.parent  # Goes up to automated-threat-brief-generator
 data_path = base_path / "data"
-data_path.mkdir(parents=True, exist_ok=True)
 
-date_str = datetime.now().strftime("%Y-%m-%d")
-output_path = data_path / f"malware_mitre_mapping_{date_str}.json"
-
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(export_data, f, indent=2)
-
-print(f"\n✅ Mapping exported to: {output_path}")
+# ATT&CK source, see attack_cache.MITRE_PATH
+MITRE_PATH = attack_cache.MITRE_PATH
+
+# === Load ===
+# stix2 is imported where it is used: it is slow to import, and a compiled cache hit never needs it
+def open_source(path=MITRE_PATH):
+    from stix2 import FileSystemSource, MemorySource
+
+    path = Path(path)
+    if path.is_file():
+        source = MemorySource(allow_custom=True)
+        source.load_from_file(str(path))
+        return source
+    return FileSystemSource(str(path), allow_custom=True)
+
+def _usable(obj):
+    return not obj.get("revoked", False) and not obj.get("x_mitre_deprecated", False)
+
+def build_index(source):
+    # One pass over the ATT&CK objects we care about, keyed by STIX id
+    from stix2 import Filter
+    objects = source.query([Filter("type", "in", list(INDEXED_TYPES))])
+    return {obj.id: obj for obj in objects if _usable(obj)}
+
+def load_uses_relationships(source):
+    from stix2 import Filter
+    return [rel for rel in source.query([Filter("type", "=", "relationship"),
+                                         Filter("relationship_type", "=", "uses")])
+            if _usable(rel)]
+
+def technique_id(technique):
+    for ref in technique.get("external_references", []):
+        if ref.get("source_name") == "mitre-attack" and ref.get("external_id"):
+            return ref["external_id"]
+    return None
+
+# === Resolve ===
+def resolve_uses(index, relationships):
+    # source STIX id -> set of technique STIX ids, resolved entirely in memory
+    uses = {}
+    for rel in relationships:
+        source = index.get(rel.source_ref)
+        target = index.get(rel.target_ref)
+        if source is None or target is None:
+            continue
+        if source.type in SOURCE_TYPES and target.type == "attack-pattern":
+            uses.setdefault(source.id, set()).add(target.id)
+    return uses
+
+def build_mappings(index, uses):
+    software, groups = [], []
+    for source_id, technique_refs in uses.items():
+        source = index[source_id]
+        techniques = sorted((index[ref] for ref in technique_refs), key=lambda t: t.name)
+        entry = {
+            "id": source.id,
+            "type": source.type,
+            "techniques": [t.name for t in techniques],
+            "technique_ids": [technique_id(t) for t in techniques]
+        }
+        if source.type in SOFTWARE_TYPES:
+            software.append({"malware": source.name, **entry})
+        else:
+            groups.append({"group": source.name, **entry})
+    software.sort(key=lambda e: e["malware"])
+    groups.sort(key=lambda e: e["group"])
+    return software, groups
+
+# === Export ===
+def export_mappings(software, groups):
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    output_path = snapshot_catalog.save_json(software, "malware_mitre_mapping", data_path, date_str)
+    groups_path = snapshot_catalog.save_json(groups, "group_mitre_mapping", data_path, date_str)
+    return output_path, groups_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the ATT&CK malware/group → technique mappings")
+    parser.add_argument("--force", action="store_true", help="rebuild the compiled cache even if the bundle is unchanged")
+    args = parser.parse_args()
+
+    # The compiled cache is keyed on the bundle's content hash, so STIX is only re-parsed when it changed
+    cache = attack_cache.build_cache(MITRE_PATH, force=args.force)
+    software, groups = cache["software"], cache["groups"]
+
+    # Print a sample mapping
+    print("\n[+] Sample Malware → Techniques Mapping:")
+    for entry in software[:5]:
+        print(f"\n{entry['malware']}:")
+        for name, tid in zip(entry["techniques"], entry["technique_ids"]):
+            print(f"  - {tid} {name}")
+
+    output_path, groups_path = export_mappings(software, groups)
+    print(f"\n✅ Mapping exported to: {output_path}")
+    print(f"✅ Group mapping exported to: {groups_path}")
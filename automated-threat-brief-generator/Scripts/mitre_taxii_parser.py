@@ -1,22 +1,149 @@
-from taxii2client.v20 import Server
-from stix2 import MemoryStore
+import os
+import json
+import uuid
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 
-# Connect to MITRE's TAXII 2.0 Server
-print("[*] Connecting to MITRE TAXII server...")
-server = Server("https://cti-taxii.mitre.org/taxii/")
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+attack_path = base_path / "data" / "attack"
+state_file = attack_path / "taxii_state.json"
 
-# Get API root
-api_root = server.api_roots[0]
+# MITRE's TAXII 2.0 server (override to sync from a mirror or a local stand-in)
+TAXII_URL = os.getenv("MITRE_TAXII_URL", "https://cti-taxii.mitre.org/taxii/")
+PAGE_SIZE = 1000
+TAXII_TIMESTAMP = "%Y-%m-%dT%H:%M:%S.000Z"
 
-# Find Enterprise ATT&CK collection
-collection = None
-for c in api_root.collections:
-    if "Enterprise ATT&CK" in c.title:
-        collection = c
-        break
+# Domain -> collection title on the TAXII server
+DOMAINS = {
+    "enterprise": "Enterprise ATT&CK",
+    "mobile": "Mobile ATT&CK",
+    "ics": "ICS ATT&CK"
+}
 
-if not collection:
-    print("[!] Enterprise ATT&CK collection not found.")
-    exit()
+def bundle_path(domain):
+    # Same bundle layout mitre_stix_parser.py reads
+    return attack_path / f"{domain}-attack.json"
 
-print(f"[+] Connected to: {collection.title}")
+# === Local State ===
+def load_state():
+    if not state_file.exists():
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+# === TAXII ===
+def find_collections(domains, server_url=TAXII_URL):
+    from taxii2client.v20 import Server
+
+    print("[*] Connecting to MITRE TAXII server...")
+    server = Server(server_url)
+    api_root = server.api_roots[0]
+    found = {}
+    for c in api_root.collections:
+        for domain in domains:
+            if DOMAINS[domain] in c.title:
+                found[domain] = c
+    for domain in domains:
+        if domain in found:
+            print(f"[+] Connected to: {found[domain].title}")
+        else:
+            print(f"[!] {DOMAINS[domain]} collection not found.")
+    return found
+
+def fetch_objects(collection, added_after=None):
+    # Returns the objects and the added_after to ask for next time. That watermark comes from
+    # the server, never from this machine's clock: X-TAXII-Date-Added-Last (when the newest
+    # object returned was added), or if the server leaves it out, the Date of the first page,
+    # which is earlier than anything added while the pages were being fetched. When nothing
+    # new came back the watermark stays where it was.
+    from taxii2client.v20 import as_pages
+
+    server = {}
+    def get_page(**kwargs):
+        response = collection.get_objects(**kwargs)
+        added_last = response.headers.get("X-TAXII-Date-Added-Last")
+        if added_last and added_last > server.get("added_last", ""):
+            server["added_last"] = added_last
+        if "date" not in server and response.headers.get("Date"):
+            server["date"] = parsedate_to_datetime(response.headers["Date"]).strftime(TAXII_TIMESTAMP)
+        return response
+
+    filters = {"added_after": added_after} if added_after else {}
+    objects = []
+    for page in as_pages(get_page, per_request=PAGE_SIZE, **filters):
+        objects.extend(page.get("objects", []))
+    if not objects:
+        return objects, added_after
+    return objects, server.get("added_last") or server.get("date") or added_after
+
+# === Local Store ===
+def merge_into_bundle(domain, objects):
+    # Newest version of every object wins; revocations arrive as newer versions with revoked=true
+    path = bundle_path(domain)
+    bundle = {"type": "bundle", "id": f"bundle--{uuid.uuid4()}", "spec_version": "2.0", "objects": []}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            bundle = json.load(f)
+
+    store = {obj["id"]: obj for obj in bundle.get("objects", [])}
+    changed = 0
+    for obj in objects:
+        current = store.get(obj["id"])
+        if current is None or obj.get("modified", "") >= current.get("modified", ""):
+            store[obj["id"]] = obj
+            changed += 1
+    bundle["objects"] = list(store.values())
+    _save_atomic(path, bundle)
+    return changed, len(store)
+
+# === Sync ===
+def sync_domain(domain, collection, added_after=None):
+    objects, watermark = fetch_objects(collection, added_after)
+    changed, total = merge_into_bundle(domain, objects)
+    print(f"[+] {DOMAINS[domain]}: {len(objects)} objects added since {added_after or 'the beginning'}, "
+          f"{changed} stored/updated, {total} in {bundle_path(domain).name}")
+    # Next run asks for everything the server added after the last object it sent
+    return {"added_after": watermark, "collection_id": collection.id, "objects": total}
+
+def sync_collections(domains=("enterprise",), full=False, server_url=TAXII_URL):
+    collections = find_collections(domains, server_url)
+    state = load_state()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(len(collections), 1), thread_name_prefix="taxii") as pool:
+        futures = {
+            domain: pool.submit(sync_domain, domain, collection,
+                                None if full else state.get(domain, {}).get("added_after"))
+            for domain, collection in collections.items()
+        }
+        for domain, future in futures.items():
+            try:
+                results[domain] = future.result()
+            except Exception as e:
+                print(f"[!] {DOMAINS[domain]} sync failed: {e}")
+
+    # Watermarks only move for domains that synced completely
+    state.update(results)
+    _save_atomic(state_file, state)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync ATT&CK collections from MITRE's TAXII server")
+    parser.add_argument("--domains", nargs="+", choices=sorted(DOMAINS), default=["enterprise"],
+                        help="collections to sync (fetched concurrently)")
+    parser.add_argument("--full", action="store_true", help="ignore the added_after watermark")
+    args = parser.parse_args()
+
+    results = sync_collections(args.domains, full=args.full)
+    if len(results) != len(args.domains):
+        exit(1)
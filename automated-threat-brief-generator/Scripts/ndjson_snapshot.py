@@ -0,0 +1,73 @@
+import os
+import gzip
+import json
+import hashlib
+from pathlib import Path
+
+# One JSON record per line, gzip compressed. Records are encoded and compressed one at a
+# time, so neither writing nor reading ever holds the whole feed in memory.
+EXTENSION = ".ndjson.gz"
+FORMAT = "ndjson.gz"
+COMPRESS_LEVEL = 6
+
+# === Writer ===
+class SnapshotWriter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = self.path.with_name(f".{self.path.name}.tmp")
+        self.count = 0
+        self.digest = hashlib.sha256()
+        self._file = gzip.open(self.tmp, "wb", compresslevel=COMPRESS_LEVEL)
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+        self._file.write(line)
+        self.digest.update(line)
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self
+
+    def close(self):
+        # The snapshot only appears under its real name once it is complete
+        self._file.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        self._file.close()
+        self.tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+def write_records(records, path):
+    # Returns (record count, sha256 of the uncompressed lines)
+    with SnapshotWriter(path) as writer:
+        writer.write_all(records)
+    return writer.count, writer.digest.hexdigest()
+
+# === Reader ===
+def iter_records(path):
+    # Yields records from an .ndjson.gz snapshot, or from a legacy .json dump
+    if not path:
+        return
+    path = Path(path)
+    if path.name.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from data.get("data", []) if isinstance(data, dict) else data
+        return
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
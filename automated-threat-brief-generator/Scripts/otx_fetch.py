@@ -1,35 +1,23 @@
 import os
-import requests
+import otx_sync
+import snapshot_catalog
 from dotenv import load_dotenv
-from datetime import datetime
 
 # Load API key from .env file
 load_dotenv()
 API_KEY = os.getenv("OTX_API_KEY")
 
-if not API_KEY:
-    raise ValueError("Missing OTX_API_KEY in .env file")
-
-headers = {
-    'X-OTX-API-KEY': API_KEY
-}
-
-# OTX endpoint to fetch latest threat pulses
-url = "https://otx.alienvault.com/api/v1/pulses/subscribed"
+def check_api_key():
+    if not API_KEY:
+        raise ValueError("Missing OTX_API_KEY in .env file")
 
 def fetch_pulses():
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"API error: {response.status_code}")
-    data = response.json()
-    return data['results']
+    # Follows pagination and only returns pulses modified since the last successful run,
+    # plus the commit() that advances the sync watermark once they are saved
+    return otx_sync.pull_pulses()
 
 def save_raw_data(data):
-    timestamp = datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')
-    filename = f"../data/otx_raw_{timestamp}.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        import json
-        json.dump(data, f, indent=2)
+    filename = snapshot_catalog.save_records(data, "otx_raw")
     print(f"[+] Saved raw data to {filename}")
 
 def print_summary(pulses):
@@ -40,7 +28,9 @@ def print_summary(pulses):
         print("-" * 50)
 
 if __name__ == "__main__":
+    check_api_key()
     print("[*] Fetching threat pulses from AlienVault OTX...")
-    pulses = fetch_pulses()
+    pulses, commit = fetch_pulses()
     print_summary(pulses)
     save_raw_data(pulses)
+    commit()
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+import http_client
+import ioc_store
+import feed_cache
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+store_file = data_path / "otx_pulse_store.json"
+state_file = data_path / "otx_sync_state.json"
+
+load_dotenv()
+OTX_API_KEY = os.getenv("OTX_API_KEY")
+OTX_URL = os.getenv("OTX_URL", "https://otx.alienvault.com/api/v1/pulses/subscribed")
+PAGE_SIZE = 50
+
+# === Local State ===
+def _load(path, default):
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def load_state():
+    return _load(state_file, {})
+
+def load_store():
+    # Every pulse ever synced, keyed by pulse id
+    return _load(store_file, {})
+
+# === Paginated Fetch ===
+def iter_pulse_pages(modified_since=None, timeout=30, deadline=None):
+    headers = {"X-OTX-API-KEY": OTX_API_KEY}
+    params = {"limit": PAGE_SIZE}
+    if modified_since:
+        params["modified_since"] = modified_since
+    url = OTX_URL
+    page_number = 1
+    while url:
+        r = http_client.get(url, headers=headers, params=params, timeout=timeout, cache="otx", deadline=deadline)
+        if r.status_code != 200:
+            raise Exception(f"OTX error on page {page_number}: {r.status_code}")
+        page = r.json()
+        yield page.get("results", [])
+        # "next" already carries the query string
+        url = page.get("next")
+        params = None
+        page_number += 1
+
+# === Incremental Sync ===
+def pull_pulses(full=False, timeout=30, deadline=None):
+    # Fetch every page of pulses modified since the last successful run, without writing
+    # anything. Returns the delta and a commit() that merges it into the pulse and IOC stores
+    # and advances the watermark; callers save their snapshot of the delta first, so a run
+    # interrupted before commit() is pulled again instead of skipped.
+    state = load_state()
+    since = None if full else state.get("modified_since")
+    # modified_since is inclusive, so the pulses sitting exactly on the watermark come back
+    # every run; they are only new if they were modified again
+    seen_at_watermark = set() if full else set(state.get("watermark_ids", []))
+    # A replay repeats the last live run exactly; inside the cache TTL the last request is
+    # repeated too, but only pulses past the current watermark count as new
+    request = {"modified_since": since, "watermark_ids": sorted(seen_at_watermark), "at": time.time()}
+    last = state.get("request")
+    if last and not full and feed_cache.repeat_last_request("otx", last.get("at")):
+        request = last
+        if feed_cache.replaying():
+            since, seen_at_watermark = last["modified_since"], set(last["watermark_ids"])
+
+    delta = []
+    watermark = since
+    for pulses in iter_pulse_pages(request["modified_since"], timeout=timeout, deadline=deadline):
+        for pulse in pulses:
+            modified = pulse.get("modified")
+            if since and modified and modified < since:
+                continue  # only returned because an older request was repeated
+            if modified == since and pulse["id"] in seen_at_watermark:
+                continue
+            delta.append(pulse)
+            if modified and (watermark is None or modified > watermark):
+                watermark = modified
+    if watermark == since:
+        at_watermark = seen_at_watermark | {pulse["id"] for pulse in delta if pulse.get("modified") == watermark}
+    else:
+        at_watermark = {pulse["id"] for pulse in delta if pulse.get("modified") == watermark}
+
+    def commit():
+        # The store is only rewritten when something changed; the watermark moves last, and
+        # not at all when replaying, so the same run can be replayed again
+        stored = state.get("pulses_stored", 0)
+        if delta:
+            store = load_store()
+            store.update((pulse["id"], pulse) for pulse in delta)
+            _save_atomic(store_file, store)
+            stored = len(store)
+        ioc_store.ingest_otx(delta)
+        if feed_cache.replaying():
+            print(f"[*] OTX sync: replayed {len(delta)} pulses, sync state left as it was")
+            return
+        _save_atomic(state_file, {
+            "modified_since": watermark,
+            "watermark_ids": sorted(at_watermark),
+            "request": request,
+            "last_run": datetime.utcnow().isoformat(timespec="seconds"),
+            "pulses_in_last_run": len(delta),
+            "pulses_stored": stored
+        })
+        print(f"[+] OTX sync: {len(delta)} new/updated pulses since {since or 'the beginning'}, {stored} stored")
+    return delta, commit
+
+def sync_pulses(full=False, timeout=30, deadline=None):
+    # Pull and commit in one go, for callers that keep no snapshot of their own
+    delta, commit = pull_pulses(full, timeout, deadline)
+    http_client.check_deadline(deadline, "OTX sync")
+    commit()
+    return delta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally sync subscribed OTX pulses")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and re-sync every pulse")
+    args = parser.parse_args()
+
+    if not OTX_API_KEY:
+        raise ValueError("Missing OTX_API_KEY in .env file")
+    print("[*] Syncing subscribed pulses from AlienVault OTX...")
+    sync_pulses(full=args.full)
@@ -1,11 +1,8 @@
-import os
-import json
-import glob
-from collections import Counter, defaultdict
+import sys
+from collections import Counter
 from pathlib import Path
-from datetime import datetime
-import matplotlib.pyplot as plt
-import networkx as nx
+import attack_cache
+import charts
 
 # === Paths ===
 script_path = Path(__file__).resolve()
@@ -13,61 +10,49 @@ base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-
 data_path = base_path / "data"
 
 
-# 1. Locate latest mapping file
-mapping_files = sorted(data_path.glob("malware_mitre_mapping_*.json"), key=os.path.getmtime, reverse=True)
-if not mapping_files:
-    print("[-] No MITRE mapping files found in /data/")
-    exit(1)
-
-latest_mapping_file = mapping_files[0]
-
-# 2. Load data
-with open(latest_mapping_file, "r", encoding="utf-8") as f:
-    mapping_data = json.load(f)
-
-# 3. Count top techniques and prepare malware-to-technique edges
-technique_counter = Counter()
-malware_edges = []
-
-for entry in mapping_data:
-    malware = entry.get("malware", "unknown")
-    techniques = entry.get("techniques", [])
-    for tech in techniques:
-        technique_counter[tech] += 1
-        malware_edges.append((malware, tech))
-
-# 4. Plotting
-fig, axs = plt.subplots(1, 2, figsize=(18, 8))
-
-# A. Left: Bar chart of top 15 MITRE techniques
-top_techniques = technique_counter.most_common(15)
-if top_techniques:
-    techniques, counts = zip(*top_techniques)
-    axs[0].barh(techniques, counts, color='skyblue')
-    axs[0].invert_yaxis()
-    axs[0].set_xlabel("Malware Mapped Count")
-    axs[0].set_title("Top 15 MITRE ATT&CK Techniques")
-    for i, v in enumerate(counts):
-        axs[0].text(v + 0.2, i, str(v), va='center')
-else:
-    axs[0].text(0.5, 0.5, "No techniques to plot", ha='center')
-
-# B. Right: Malware to technique network
-G = nx.DiGraph()
-G.add_edges_from(malware_edges)
-
-# Only show part of the graph (limit nodes for performance)
-subgraph_nodes = set()
-for malware, tech in malware_edges:
-    if technique_counter[tech] >= 2:  # Filter noise
-        subgraph_nodes.add(malware)
-        subgraph_nodes.add(tech)
-
-subG = G.subgraph(subgraph_nodes)
-
-pos = nx.spring_layout(subG, k=0.6)
-nx.draw(subG, pos, with_labels=True, node_color='lightgreen', node_size=1000, font_size=8, ax=axs[1])
-axs[1].set_title("Malware → MITRE Technique Relationships")
-
-plt.tight_layout()
-plt.show()
+# Count top techniques and prepare malware-to-technique edges
+def count_techniques(mapping_data):
+    technique_counter = Counter()
+    malware_edges = []
+    for entry in mapping_data:
+        malware = entry.get("malware", "unknown")
+        techniques = entry.get("techniques", [])
+        for tech in techniques:
+            technique_counter[tech] += 1
+            malware_edges.append((malware, tech))
+    return technique_counter, malware_edges
+
+def overview_chart(technique_counter, malware_edges):
+    # A. Left: Bar chart of top 15 MITRE techniques
+    top_techniques = technique_counter.most_common(15)
+    techniques, counts = zip(*top_techniques) if top_techniques else ((), ())
+    bar = charts.barh(techniques, counts, "Top 15 MITRE ATT&CK Techniques", xlabel="Malware Mapped Count",
+                      empty="No techniques to plot")
+
+    # B. Right: Malware to technique network
+    # Only show part of the graph (limit nodes for performance)
+    edges = list(dict.fromkeys(
+        (malware, tech) for malware, tech in malware_edges if technique_counter[tech] >= 2  # Filter noise
+    ))
+    nodes = {malware: "malware" for malware, _ in edges}
+    nodes.update({tech: "technique" for _, tech in edges})
+    groups = {"malware": {"color": "lightgreen"}, "technique": {"color": "lightgreen"}}
+    graph = charts.network(nodes.items(), edges, "Malware → MITRE Technique Relationships", groups, directed=True,
+                           layout_key="malware_technique_overview", node_size=1000, font_size=8,
+                           edge_alpha=0.15, width=0.5)
+    return charts.panels([bar, graph], size=(18, 8))
+
+def figures():
+    # Mapping: compiled ATT&CK cache, falling back to the latest mapping file
+    mapping_data = attack_cache.load_mapping()
+    if not mapping_data:
+        print("[-] No MITRE mapping files found in /data/")
+        return {}
+    return {"malware_technique_overview": overview_chart(*count_techniques(mapping_data))}
+
+if __name__ == "__main__":
+    args = charts.output_parser("Plot the top ATT&CK techniques next to the malware-technique network").parse_args()
+    figs = figures()
+    if not figs:
+        sys.exit(1)
+    charts.output(figs, args)
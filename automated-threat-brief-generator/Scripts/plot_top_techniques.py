@@ -1,65 +1,50 @@
-import os
-import glob
-import json
+import sys
 from collections import Counter
-from datetime import datetime
 from pathlib import Path
-import matplotlib.pyplot as plt
+import attack_cache
+import charts
 
 # === Paths ===
 script_path = Path(__file__).resolve()
 base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
 data_path = base_path / "data"
 
-# Find latest MITRE mapping file
-def get_latest_mapping_file():
-    files = sorted(data_path.glob("malware_mitre_mapping_*.json"), key=os.path.getmtime, reverse=True)
-    return files[0] if files else None
-
-# Load and parse techniques
-def extract_techniques(mapping_file):
-    with open(mapping_file, "r", encoding="utf-8") as f:
-        mapping_data = json.load(f)
-
+# Parse techniques
+def extract_techniques(mapping_data):
     technique_counter = Counter()
     for entry in mapping_data:
         for technique in entry.get("techniques", []):
             technique_counter[technique] += 1
     return technique_counter
 
-# Main
-mapping_file = get_latest_mapping_file()
-if not mapping_file:
-    print("[-] No MITRE mapping file found.")
-    exit(1)
-
-technique_counter = extract_techniques(mapping_file)
-
-# Plot
-top_techniques = technique_counter.most_common(15)
-if not top_techniques:
-    print("[-] No techniques found to plot.")
-    exit(1)
-
-techniques, counts = zip(*top_techniques)
-max_count = max(counts)
-
-plt.figure(figsize=(12, 8))
-bars = plt.barh(techniques, counts, edgecolor='black')
-
-# Add labels to each bar
-for bar in bars:
-    width = bar.get_width()
-    plt.text(width + 1.0, bar.get_y() + bar.get_height() / 2,
-             f'{int(width)} threats', va='center', fontsize=9)
-
-# Set X-axis limit dynamically to fit text
-plt.xlim(0, max_count + max_count * 0.2)
-
-# Titles and labels
-plt.xlabel("Frequency (Number of Mapped Malware Families)", fontsize=12)
-plt.title("Top 15 MITRE ATT&CK Techniques Mapped from Malware", fontsize=14, fontweight='bold')
-plt.gca().invert_yaxis()  # Most frequent on top
-plt.grid(axis='x', linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show()
+# Chart
+def top_techniques_chart(technique_counter):
+    top_techniques = technique_counter.most_common(15)
+    if not top_techniques:
+        return None
+    techniques, counts = zip(*top_techniques)
+    return charts.barh(
+        techniques, counts, "Top 15 MITRE ATT&CK Techniques Mapped from Malware",
+        xlabel="Frequency (Number of Mapped Malware Families)", color=None, edgecolor="black", size=(12, 8),
+        value_format="{} threats", label_pad=1.0, label_size=9, xlim_margin=0.2, grid=True,
+        title_size=14, title_weight="bold", xlabel_size=12
+    )
+
+def figures():
+    # Mapping comes from the compiled ATT&CK cache
+    mapping_data = attack_cache.load_mapping()
+    if not mapping_data:
+        print("[-] No MITRE mapping file found.")
+        return {}
+    chart = top_techniques_chart(extract_techniques(mapping_data))
+    if not chart:
+        print("[-] No techniques found to plot.")
+        return {}
+    return {"top_techniques": chart}
+
+if __name__ == "__main__":
+    args = charts.output_parser("Plot the most frequently mapped ATT&CK techniques").parse_args()
+    figs = figures()
+    if not figs:
+        sys.exit(1)
+    charts.output(figs, args)
@@ -0,0 +1,345 @@
+import os
+import argparse
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import abuseipdb_snapshot
+import snapshot_catalog
+import ioc_store
+import indicators
+import charts
+import aggregates
+import correlation
+from malware_resolver import MalwareResolver
+from html_templates import Template
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+report_path = base_path / "reports"
+
+# The snapshots are located, parsed and counted once into a plain dict (the model), and every
+# format is rendered from it. The model only holds counts, samples and top lists, so it is
+# cheap to hand to worker processes.
+SAMPLE_IOCS = 10
+SAMPLE_PULSES = 5
+TOP_N = 10
+# The feed summary, samples and per-family mappings cover the same window as the 24h top lists
+REPORT_DAYS = 1
+WRITE_BUFFER = 1 << 16
+
+# === Model ===
+def _feed_summary(otx, threatfox):
+    # One pass over each feed: counts, samples and the families in the order they appear
+    summary = {"otx_pulses": 0, "threatfox_iocs": 0, "otx_references": [], "threatfox_samples": []}
+    families = {}
+    for pulse in otx:
+        if summary["otx_pulses"] < SAMPLE_PULSES:
+            summary["otx_references"].extend(pulse.references[:2])
+        summary["otx_pulses"] += 1
+        families.setdefault(pulse.family or "Unknown", None)
+    for ioc in threatfox:
+        if summary["threatfox_iocs"] < SAMPLE_IOCS:
+            summary["threatfox_samples"].append(ioc)
+        summary["threatfox_iocs"] += 1
+        families.setdefault(ioc.family or "Unknown", None)
+    summary["families"] = list(families)
+    return summary
+
+def _abuse_count():
+    # The packed snapshot header already holds the record count
+    path = abuseipdb_snapshot.latest_snapshot()
+    if not path:
+        return 0
+    with abuseipdb_snapshot.Snapshot(path) as snapshot:
+        return len(snapshot)
+
+def _technique_counts(mapping):
+    counts = Counter()
+    for entry in mapping:
+        counts.update(entry.get("techniques", []))
+    return counts
+
+def load_model():
+    otx = indicators.parse_otx(snapshot_catalog.recent_records("otx", REPORT_DAYS))
+    threatfox = indicators.parse_threatfox(snapshot_catalog.recent_records("threatfox", REPORT_DAYS))
+    model = _feed_summary(otx, threatfox)
+
+    # Feed family names -> ATT&CK software via names, aliases and Malpedia-style normalisation.
+    # The resolver's entries are the mapping the MITRE report tabulates.
+    resolver = MalwareResolver.from_cache()
+    mapping = resolver.entries
+
+    # Rolling daily aggregates, only snapshots not counted yet are read
+    aggregates.update()
+    # Indicators reported by more than one feed over the last week
+    corroborated = correlation.corroborated(days=7)
+
+    now = datetime.utcnow()
+    model.update({
+        "generated": now.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        "date": now.strftime('%Y-%m-%d'),
+        "abuse_records": _abuse_count(),
+        "top_families": aggregates.top("family", days=1, n=TOP_N),
+        "top_tags": aggregates.top("tag", days=1, n=TOP_N),
+        "family_trend": aggregates.week_over_week("family", n=TOP_N),
+        "technique_trend": aggregates.week_over_week("technique", n=TOP_N),
+        "corroborated_count": len(corroborated),
+        "corroborated": [correlation.describe(key, seen) for key, seen in corroborated[:20]],
+        # History across runs comes from the IOC store rather than old JSON dumps
+        "store_stats": ioc_store.summary(days=1),
+        "monthly_stats": ioc_store.summary(days=30),
+        "resolutions": [(family, resolver.resolve(family)) for family in model["families"]],
+        "mapping": [{"malware": entry["malware"], "techniques": entry["techniques"]} for entry in mapping],
+    })
+    top_techniques = _technique_counts(mapping).most_common(15)
+    model["charts"] = {}
+    if top_techniques:
+        techniques, counts = zip(*top_techniques)
+        model["charts"]["top_techniques"] = charts.barh(techniques, counts, "Top 15 MITRE ATT&CK Techniques",
+                                                        xlabel="Number of Malware Families")
+    return model
+
+# === Markdown ===
+def render_markdown(model, out):
+    store_stats = model["store_stats"]
+    report_lines = [
+        f"# Daily Threat Intelligence Report\n",
+        f"**Generated:** {model['generated']}\n",
+        "## 🔍 Summary",
+        f"- Total OTX Pulses (24h): {model['otx_pulses']}",
+        f"- Total ThreatFox IOCs (24h): {model['threatfox_iocs']}",
+        f"- Total AbuseIPDB Records: {model['abuse_records']}\n",
+        "## 🗄️ Indicator History",
+        f"- Indicators seen in the last 24h: {store_stats['seen']} ({store_stats['new']} new, {store_stats['repeat']} seen before)",
+        f"- Indicators stored across all runs: {store_stats['total']}",
+        "- Most active families (30 days):",
+        *[f"  - {family}: {count}" for family, count in model["monthly_stats"]["families"]],
+        "",
+        "## 🧬 Top Malware Families (24h)",
+        *[f"- {malware}: {count}" for malware, count in model["top_families"]],
+        "\n## 🏷️ Top Tags (24h)",
+        *[f"- {tag}: {count}" for tag, count in model["top_tags"]],
+        "\n## 📈 Week over Week",
+        "**Malware families** (last 7 days vs previous 7 days)",
+        *[f"- {key}: {current} vs {previous} ({change})" for key, current, previous, change in model["family_trend"]],
+        "\n**ATT&CK techniques**",
+        *[f"- {key}: {current} vs {previous} ({change})" for key, current, previous, change in model["technique_trend"]],
+        "\n## 🤝 Corroborated by Multiple Sources",
+        f"_{model['corroborated_count']} indicators seen by more than one feed in the last 7 days_",
+        *[f"- {line}" for line in model["corroborated"]],
+        "\n## 📌 Sample ThreatFox IOCs",
+        *[f"- {entry.value} ({entry.threat_type}) [Confidence: {entry.confidence}]" for entry in model["threatfox_samples"]],
+        "\n## 📌 Sample OTX References",
+        *[f"- {ref}" for ref in model["otx_references"]],
+        "\n---\n## 🔍 MITRE Mappings"
+    ]
+
+    for malware_name, resolution in model["resolutions"]:
+        if not malware_name.strip():
+            continue
+        techniques = resolution.techniques if resolution else []
+
+        report_lines.append(f"\n### {malware_name}")
+        if resolution and resolution.malware.lower() != malware_name.lower():
+            report_lines.append(f"_Matched ATT&CK software: {resolution.malware} ({resolution.method}, confidence {resolution.confidence:.2f})_")
+        if techniques:
+            for t in techniques:
+                report_lines.append(f"- {t}")
+        else:
+            report_lines.append("- _No mapped MITRE techniques found_")
+
+    report_lines.append("\n---\n_Report auto-generated by CTI Tools V2._")
+    out.write("\n".join(report_lines))
+
+# === HTML Templates ===
+# Compiled once at import. Every value is escaped unless marked |raw.
+HTML_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{{ title }}</title>
+    <style>{{ style|raw }}</style>
+</head>
+<body>
+    <h1>{{ heading }}</h1>
+    <p class="meta">Generated: {{ generated }}</p>
+""")
+HTML_FOOT = Template("""
+    <footer>
+        <p class="meta">{{ footer }}</p>
+    </footer>
+</body>
+</html>
+""")
+SECTION_OPEN = Template("""
+    <div class="{{ css }}">
+        <h2>{{ title }}</h2>
+""")
+SECTION_NOTE = Template("""        <p class="meta">{{ text }}</p>
+""")
+SECTION_CLOSE = "    </div>\n"
+LIST_OPEN = "        <ul>\n"
+LIST_CLOSE = "        </ul>\n"
+LIST_ITEM = Template("""            <li>{{ text }}</li>
+""")
+COUNT_ITEM = Template("""            <li><strong>{{ key }}:</strong> {{ count }}</li>
+""")
+CHART = Template("""        <img src="data:image/png;base64,{{ png|raw }}" alt="{{ alt }}">
+""")
+TABLE_OPEN = Template("""        <table>
+            <tr><th>{{ first }}</th><th>{{ second }}</th></tr>
+""")
+TABLE_ROW = Template("""            <tr><td class="malware-name">{{ malware }}</td><td>{{ techniques }}</td></tr>
+""")
+TABLE_CLOSE = "        </table>\n"
+
+DAILY_STYLE = """
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        h1 { color: #333; }
+        h2 { margin-top: 30px; color: #555; }
+        ul { margin-bottom: 20px; }
+        .section { margin-bottom: 40px; }
+        .meta { font-size: 0.9em; color: #777; }
+    """
+MITRE_STYLE = """
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        h1 { color: #1F4E79; }
+        .section { margin-bottom: 30px; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ccc; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        .malware-name { font-weight: bold; }
+        ul { list-style-type: none; padding: 0; }
+        ul li { padding: 4px 0; }
+        .meta { font-size: 0.9em; color: #777; }
+        .summary-section { background-color: #f9f9f9; padding: 15px; border: 1px solid #ddd; }
+    """
+
+def _html_list(out, title, items, item=LIST_ITEM, note=None, css="section"):
+    # items are dicts for `item`, streamed one row at a time
+    SECTION_OPEN.write(out, css=css, title=title)
+    if note:
+        SECTION_NOTE.write(out, text=note)
+    out.write(LIST_OPEN)
+    item.write_rows(out, items)
+    out.write(LIST_CLOSE)
+    out.write(SECTION_CLOSE)
+
+def _texts(values):
+    return ({"text": value} for value in values)
+
+def _counts(pairs):
+    return ({"key": key, "count": count} for key, count in pairs)
+
+def _summary_counts(model):
+    return [("Total OTX Pulses (24h)", model["otx_pulses"]),
+            ("Total ThreatFox IOCs (24h)", model["threatfox_iocs"]),
+            ("Total AbuseIPDB Records", model["abuse_records"])]
+
+def _history(model):
+    # IOC store counts shared by every format
+    stats = model["store_stats"]
+    return [f"Indicators seen in the last 24h: {stats['seen']} ({stats['new']} new, {stats['repeat']} seen before)",
+            f"Indicators stored across all runs: {stats['total']}",
+            "Most active families (30 days): " + (", ".join(f"{family} ({count})" for family, count in model["monthly_stats"]["families"]) or "none")]
+
+def _samples(out, model):
+    _html_list(out, "📌 Sample ThreatFox IOCs", _texts(f"{entry.value} ({entry.threat_type})" for entry in model["threatfox_samples"]))
+    _html_list(out, "📌 Sample OTX References", _texts(model["otx_references"]))
+
+# === HTML ===
+def render_html(model, out):
+    HTML_HEAD.write(out, title="Daily Threat Report", style=DAILY_STYLE,
+                    heading="🛡️ Daily Threat Intelligence Report", generated=model["generated"])
+    _html_list(out, "🔍 Summary", _texts(f"{key}: {count}" for key, count in _summary_counts(model)))
+    _html_list(out, "🗄️ Indicator History", _texts(_history(model)))
+    _html_list(out, "🧬 Top Malware Families (24h)", _texts(f"{m}: {c}" for m, c in model["top_families"]))
+    _html_list(out, "🏷️ Top Tags (24h)", _texts(f"{tag}: {count}" for tag, count in model["top_tags"]))
+    _html_list(out, "📈 Week over Week",
+               _texts(f"{key}: {current} vs {previous} ({change})" for key, current, previous, change in model["family_trend"]),
+               note="Malware families, last 7 days vs the previous 7 days")
+    _html_list(out, "🤝 Corroborated by Multiple Sources", _texts(model["corroborated"]),
+               note=f"{model['corroborated_count']} indicators seen by more than one feed in the last 7 days")
+    _samples(out, model)
+    HTML_FOOT.write(out, footer="Auto-generated by CTI Tools V2.")
+
+# === MITRE HTML ===
+def render_mitre(model, out):
+    if not model["mapping"]:
+        print("[-] No mapping data available.")
+        return False
+    # Drawn once per distinct set of counts, see charts.py
+    bar_chart_base64 = charts.png_base64(model["charts"]["top_techniques"])
+
+    HTML_HEAD.write(out, title="MITRE Threat Report", style=MITRE_STYLE,
+                    heading="MITRE Threat Mapping Report", generated=model["generated"])
+    SECTION_OPEN.write(out, css="section", title="📊 Top Techniques Chart")
+    CHART.write(out, png=bar_chart_base64, alt="Top Techniques")
+    out.write(SECTION_CLOSE)
+    _html_list(out, "🔍 Summary", _counts(_summary_counts(model)), COUNT_ITEM, css="section summary-section")
+    _html_list(out, "🗄️ Indicator History", _texts(_history(model)), css="section summary-section")
+    _html_list(out, "🧬 Top Malware Families (24h)", _counts(model["top_families"]), COUNT_ITEM)
+    _html_list(out, "🏷️ Top Tags (24h)", _counts(model["top_tags"]), COUNT_ITEM)
+    _samples(out, model)
+
+    # One row per mapped family, written as it is rendered
+    SECTION_OPEN.write(out, css="section", title="📁 Mapped Malware Families")
+    TABLE_OPEN.write(out, first="Malware", second="MITRE Techniques")
+    TABLE_ROW.write_rows(out, ({"malware": item["malware"], "techniques": ", ".join(item["techniques"])}
+                               for item in model["mapping"]))
+    out.write(TABLE_CLOSE)
+    out.write(SECTION_CLOSE)
+    HTML_FOOT.write(out, footer="Report generated by Bobservation's CTI Tools V2")
+
+# === Output ===
+FORMATS = {
+    # format: (renderer, file name)
+    "markdown": (render_markdown, "threat_report_{date}_v2.md"),
+    "html": (render_html, "preview_threat_report.html"),
+    "mitre": (render_mitre, "threat_report_{date}_MITRE.html")
+}
+
+def render(fmt, model, directory=report_path):
+    # The renderer streams straight into a temporary file, which replaces the report once complete.
+    # A renderer returning False has nothing to report.
+    renderer, filename = FORMATS[fmt]
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / filename.format(date=model["date"])
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+            written = renderer(model, f)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if written is False:
+        tmp.unlink(missing_ok=True)
+        return None
+    os.replace(tmp, path)
+    print(f"[+] {fmt} report saved to: {path}")
+    return path
+
+def generate(formats=tuple(FORMATS), processes=None, directory=report_path):
+    # Loads the model once and renders every format from it. With processes > 1 the formats
+    # are rendered in a process pool, which only pays off when rendering outweighs starting
+    # the workers.
+    model = load_model()
+    # Charts whose data changed are drawn up front, side by side; the renderers get cache hits
+    charts.render_many(list(model["charts"].values()), processes=processes)
+    if not processes or processes < 2 or len(formats) < 2:
+        return {fmt: render(fmt, model, directory) for fmt in formats}
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(processes, len(formats))) as pool:
+        futures = {fmt: pool.submit(render, fmt, model, directory) for fmt in formats}
+        return {fmt: future.result() for fmt, future in futures.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the threat reports from one load of the feed data")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS), dest="formats")
+    parser.add_argument("--processes", type=int, default=0, help="render the formats in this many worker processes")
+    args = parser.parse_args()
+
+    generate(args.formats, args.processes)
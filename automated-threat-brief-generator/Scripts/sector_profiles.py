@@ -0,0 +1,130 @@
+import os
+import json
+import argparse
+from collections import deque
+from pathlib import Path
+
+import attack_cache
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+PROFILES_PATH = os.getenv("SECTOR_PROFILES_PATH", str(base_path / "config" / "sector_profiles.json"))
+
+# === Name Matcher (Aho-Corasick) ===
+class NameMatcher:
+    # All profile name patterns in one automaton: one scan of a technique name finds every
+    # pattern it contains, however many sectors are configured. Each pattern carries a bitmask.
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [0]
+        for pattern, mask in patterns.items():
+            self._insert(pattern.lower(), mask)
+        self._link()
+
+    def _insert(self, pattern, mask):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(0)
+            state = nxt
+        self.out[state] |= mask
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def match(self, text):
+        mask, state = 0, 0
+        for ch in text.lower():
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            mask |= self.out[state]
+        return mask
+
+# === Profiles ===
+class SectorProfiles:
+    def __init__(self, profiles):
+        self.names = list(profiles)
+        self.labels = {name: p.get("label", name) for name, p in profiles.items()}
+        self.id_masks = {}
+        patterns = {}
+        for bit, (name, profile) in enumerate(profiles.items()):
+            for tid in profile.get("technique_ids", []):
+                self.id_masks[tid] = self.id_masks.get(tid, 0) | (1 << bit)
+            for pattern in profile.get("techniques", []):
+                patterns[pattern] = patterns.get(pattern, 0) | (1 << bit)
+        self.matcher = NameMatcher(patterns)
+        self._memo = {}
+
+    @classmethod
+    def load(cls, path=PROFILES_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def mask(self, name, tid=None):
+        # Technique ID first (a parent ID also covers its sub-techniques), name patterns as fallback
+        key = (name, tid)
+        mask = self._memo.get(key)
+        if mask is None:
+            if tid:
+                mask = self.id_masks.get(tid, 0) | self.id_masks.get(tid.split(".")[0], 0)
+            else:
+                mask = self.matcher.match(name)
+            self._memo[key] = mask
+        return mask
+
+    def sectors(self, mask):
+        return [name for bit, name in enumerate(self.names) if mask >> bit & 1]
+
+    def evaluate(self, mapping_data, observed=None):
+        # One pass over the mapping for every sector: {sector: {malware: [techniques]}}
+        results = {name: {} for name in self.names}
+        for entry in mapping_data:
+            malware = entry.get("malware", "").strip()
+            if observed is not None and malware not in observed:
+                continue
+            techniques = entry.get("techniques", [])
+            tids = entry.get("technique_ids") or [None] * len(techniques)
+            for technique, tid in zip(techniques, tids):
+                mask = self.mask(technique, tid)
+                bit = 0
+                while mask:
+                    if mask & 1:
+                        results[self.names[bit]].setdefault(malware, []).append(technique)
+                    mask >>= 1
+                    bit += 1
+        return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score ATT&CK software against every sector profile")
+    parser.add_argument("--profiles", default=PROFILES_PATH, help="sector profile config (JSON)")
+    parser.add_argument("--top", type=int, default=5, help="families to list per sector")
+    args = parser.parse_args()
+
+    mapping = attack_cache.load_mapping()
+    if not mapping:
+        print("[-] No MITRE mapping file found.")
+        exit(1)
+
+    profiles = SectorProfiles.load(args.profiles)
+    results = profiles.evaluate(mapping)
+    for sector, families in results.items():
+        print(f"\n[+] {profiles.labels[sector]}: {len(families)} families with relevant techniques")
+        for malware, techniques in sorted(families.items(), key=lambda x: len(x[1]), reverse=True)[:args.top]:
+            print(f"  - {malware}: {len(techniques)}")
@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import ndjson_snapshot
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+catalog_file = data_path / "snapshot_catalog.sqlite"
+
+SCHEMA_VERSION = 1
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H%M%S"
+
+# Snapshot file names written by the fetchers and the ATT&CK parser: <source>_<timestamp>.<ext>
+SNAPSHOT_NAME = re.compile(r"^(?P<source>[a-z_]+?)_(?P<stamp>\d{4}-\d{2}-\d{2}(?:_\d{6})?)\.(?P<format>json|abip|ndjson\.gz)$")
+
+# === Database ===
+def connect():
+    # Each caller gets its own connection, so concurrent fetchers can write safely
+    data_path.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(catalog_file, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        _create_schema(conn)
+    return conn
+
+def _create_schema(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                record_count INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                path TEXT NOT NULL UNIQUE,
+                format TEXT NOT NULL
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_source_time ON snapshots (source, fetched_at)")
+        # Files written before the catalog existed are picked up once
+        _backfill(conn, data_path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def _stored_path(path):
+    # Paths under data/ are stored relative so the folder can be moved
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(data_path.resolve()))
+    except ValueError:
+        return str(path)
+
+def _resolve_path(stored):
+    path = Path(stored)
+    return path if path.is_absolute() else data_path / path
+
+# === Record ===
+def count_records(data):
+    # Feed dumps are lists; AbuseIPDB responses wrap theirs in "data" and diffs list added/removed
+    if isinstance(data, dict):
+        if "data" in data:
+            return len(data["data"])
+        if "added" in data:
+            return len(data["added"]) + len(data.get("removed", []))
+    return len(data)
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def record(source, path, record_count, content_hash=None, fetched_at=None, fmt=None, conn=None):
+    # Only called once the file is fully in place, so a catalogued snapshot is always complete
+    path = Path(path)
+    row = (source,
+           (fetched_at or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%S"),
+           record_count,
+           content_hash or file_hash(path),
+           _stored_path(path),
+           fmt or path.suffix.lstrip("."))
+    own = conn is None
+    conn = conn or connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO snapshots (source, fetched_at, record_count, content_hash, path, format) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", row)
+    finally:
+        if own:
+            conn.close()
+
+def save_json(data, source, directory=data_path, timestamp=None, indent=2):
+    # Write <source>_<timestamp>.json atomically and catalog it (mappings, diffs)
+    fetched_at = datetime.utcnow()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{source}_{timestamp or fetched_at.strftime(TIMESTAMP_FORMAT)}.json"
+    payload = json.dumps(data, indent=indent).encode("utf-8")
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    record(source, path, count_records(data), hashlib.sha256(payload).hexdigest(), fetched_at, "json")
+    return path
+
+def save_records(records, source, directory=data_path, timestamp=None):
+    # Stream feed records into <source>_<timestamp>.ndjson.gz and catalog it
+    fetched_at = datetime.utcnow()
+    path = Path(directory) / f"{source}_{timestamp or fetched_at.strftime(TIMESTAMP_FORMAT)}{ndjson_snapshot.EXTENSION}"
+    count, content_hash = ndjson_snapshot.write_records(records, path)
+    record(source, path, count, content_hash, fetched_at, ndjson_snapshot.FORMAT)
+    return path
+
+# === Lookup ===
+def _rows(conn, sql, args, directory=None):
+    # Skip rows whose file was deleted by hand, and with a directory, files kept elsewhere
+    directory = Path(directory).resolve() if directory else None
+    for row in conn.execute(sql, args):
+        path = _resolve_path(row["path"])
+        if path.exists() and (directory is None or path.resolve().parent == directory):
+            yield row
+
+def _filter(source, fmt):
+    # fmt picks one file format, e.g. "abip" leaves out legacy abuseipdb_*.json dumps
+    if fmt:
+        return "SELECT * FROM snapshots WHERE source = ? AND format = ?", [source, fmt]
+    return "SELECT * FROM snapshots WHERE source = ?", [source]
+
+def snapshots(source, since=None, until=None, fmt=None, directory=None):
+    # Catalogued snapshots of a source, oldest first
+    sql, args = _filter(source, fmt)
+    if since:
+        sql += " AND fetched_at >= ?"
+        args.append(since.strftime("%Y-%m-%dT%H:%M:%S"))
+    if until:
+        sql += " AND fetched_at < ?"
+        args.append(until.strftime("%Y-%m-%dT%H:%M:%S"))
+    sql += " ORDER BY fetched_at, id"
+    conn = connect()
+    try:
+        return [dict(row, path=_resolve_path(row["path"])) for row in _rows(conn, sql, args, directory)]
+    finally:
+        conn.close()
+
+def recent(source, days=7, fmt=None):
+    return snapshots(source, since=datetime.utcnow() - timedelta(days=days), fmt=fmt)
+
+def recent_records(source, days=1):
+    # Records of the last `days` days of snapshots, newest snapshot first. OTX and ThreatFox
+    # snapshots are deltas, so a day of data is every snapshot of that day, not the latest one;
+    # a pulse or IOC sent again in a later delta is only yielded once, in its newest form.
+    seen = set()
+    for snapshot in reversed(recent(source, days)):
+        for record in ndjson_snapshot.iter_records(snapshot["path"]):
+            key = record.get("id") if isinstance(record, dict) else None
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            yield record
+
+def latest_entry(source, fmt=None, directory=None):
+    # Catalog row of the newest snapshot of a source, or None
+    sql, args = _filter(source, fmt)
+    conn = connect()
+    try:
+        for row in _rows(conn, sql + " ORDER BY fetched_at DESC, id DESC", args, directory):
+            return dict(row, path=_resolve_path(row["path"]))
+        return None
+    finally:
+        conn.close()
+
+def latest(source, fmt=None, directory=None):
+    # Path of the newest snapshot of a source, or None
+    entry = latest_entry(source, fmt, directory)
+    return entry["path"] if entry else None
+
+# === Backfill ===
+def _parse_stamp(stamp):
+    for fmt in (TIMESTAMP_FORMAT, "%Y-%m-%d"):
+        try:
+            return datetime.strptime(stamp, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _count_records(path, fmt):
+    if fmt == "abip":
+        import abuseipdb_snapshot
+        with abuseipdb_snapshot.Snapshot(path) as snapshot:
+            return len(snapshot)
+    if fmt == ndjson_snapshot.FORMAT:
+        return sum(1 for _ in ndjson_snapshot.iter_records(path))
+    with open(path, "r", encoding="utf-8") as f:
+        return count_records(json.load(f))
+
+def _backfill(conn, directory):
+    known = {row["path"] for row in conn.execute("SELECT path FROM snapshots")}
+    added = 0
+    for path in sorted(Path(directory).iterdir()):
+        match = SNAPSHOT_NAME.match(path.name)
+        if not match or _stored_path(path) in known:
+            continue
+        fetched_at = _parse_stamp(match["stamp"]) or datetime.utcfromtimestamp(path.stat().st_mtime)
+        try:
+            count = _count_records(path, match["format"])
+        except (OSError, ValueError):
+            print(f"[!] Skipping unreadable snapshot {path.name}")
+            continue
+        record(match["source"], path, count, fetched_at=fetched_at, fmt=match["format"], conn=conn)
+        added += 1
+    if added:
+        print(f"[+] Catalogued {added} existing snapshots from {directory}")
+    return added
+
+def backfill(directory=data_path):
+    conn = connect()
+    try:
+        return _backfill(conn, directory)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the feed snapshot catalog")
+    parser.add_argument("--source", help="e.g. otx, threatfox, abuseipdb, malware_mitre_mapping")
+    parser.add_argument("--days", type=int, default=7, help="how far back to list")
+    parser.add_argument("--backfill", metavar="DIR", nargs="?", const=str(data_path), help="catalog snapshot files already on disk")
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill(args.backfill)
+
+    conn = connect()
+    sources = [args.source] if args.source else [r[0] for r in conn.execute("SELECT DISTINCT source FROM snapshots ORDER BY source")]
+    conn.close()
+    for source in sources:
+        rows = recent(source, args.days)
+        print(f"\n[+] {source}: {len(rows)} snapshots in the last {args.days} days")
+        for row in rows:
+            print(f"  - {row['fetched_at']}  {row['record_count']:>7} records  {row['content_hash'][:12]}  {row['path'].name}")
@@ -1,47 +1,29 @@
 import os
-import requests
-import json
-from datetime import datetime
+import threatfox_sync
+import snapshot_catalog
 from dotenv import load_dotenv
 
 # Load API key
 load_dotenv()
 API_KEY = os.getenv("THREATFOX_API_KEY")
 
-if not API_KEY:
-    raise ValueError("Missing THREATFOX_API_KEY in .env file")
-
-url = "https://threatfox.abuse.ch/api/v1/"
+def check_api_key():
+    if not API_KEY:
+        raise ValueError("Missing THREATFOX_API_KEY in .env file")
 
 def fetch_threatfox_data():
-    headers = {
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "query": "get_iocs",
-        "limit": 100,
-        "api_key": API_KEY
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-
-    if response.status_code != 200:
-        print(response.text)  # Helpful debug
-        raise Exception(f"Error: {response.status_code}")
-
-    result = response.json()
-    return result["data"]
+    # Only IOCs newer than the last stored ThreatFox id, deduplicated by id, plus the commit()
+    # that moves the high-water mark once they are saved
+    return threatfox_sync.pull_iocs()
 
 def save_to_file(data):
-    timestamp = datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')
-    filename = f"../data/threatfox_{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    filename = snapshot_catalog.save_records(data, "threatfox")
     print(f"[+] Saved ThreatFox data to {filename}")
 
 if __name__ == "__main__":
+    check_api_key()
     print("[*] Fetching recent indicators from ThreatFox...")
-    data = fetch_threatfox_data()
+    data, commit = fetch_threatfox_data()
     print(f"[+] Retrieved {len(data)} indicators.")
     save_to_file(data)
+    commit()
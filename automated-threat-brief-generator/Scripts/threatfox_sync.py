@@ -0,0 +1,137 @@
+import os
+import json
+import math
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+import http_client
+import ioc_store
+import feed_cache
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+data_path = base_path / "data"
+store_file = data_path / "threatfox_ioc_store.json"
+state_file = data_path / "threatfox_sync_state.json"
+
+load_dotenv()
+THREATFOX_API_KEY = os.getenv("THREATFOX_API_KEY")
+THREATFOX_URL = os.getenv("THREATFOX_URL", "https://threatfox-api.abuse.ch/api/v1/")
+MAX_DAYS = 7  # largest "days" window get_iocs accepts
+FIRST_SEEN_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+
+# === Local State ===
+def _load(path, default):
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def load_state():
+    return _load(state_file, {})
+
+def load_store():
+    # Deduplicated IOCs keyed by ThreatFox id
+    return _load(store_file, {})
+
+# === Fetch ===
+def days_to_request(last_first_seen, now=None):
+    # get_iocs only takes a trailing "days" window, so ask for just enough days to cover
+    # everything newer than the last stored first_seen
+    if not last_first_seen:
+        return MAX_DAYS
+    now = now or datetime.utcnow()
+    gap = now - datetime.strptime(last_first_seen, FIRST_SEEN_FORMAT)
+    return min(MAX_DAYS, max(1, math.ceil(gap.total_seconds() / 86400)))
+
+def fetch_iocs(days, timeout=30, deadline=None):
+    headers = {
+        "Content-Type": "application/json",
+        "Auth-Key": THREATFOX_API_KEY
+    }
+    payload = {
+        "query": "get_iocs",
+        "days": days
+    }
+    r = http_client.post(THREATFOX_URL, headers=headers, json=payload, timeout=timeout, cache="threatfox", deadline=deadline)
+    if r.status_code != 200:
+        raise Exception(f"ThreatFox error: {r.status_code}")
+    result = r.json()
+    if result.get("query_status") == "no_result":
+        return []
+    if not isinstance(result.get("data"), list):
+        raise Exception(f"ThreatFox unexpected response: {result.get('query_status')}")
+    return [entry for entry in result["data"] if isinstance(entry, dict) and entry.get("id")]
+
+# === Incremental Sync ===
+def pull_iocs(full=False, timeout=30, deadline=None):
+    # Returns only IOCs whose id is above the stored high-water mark, plus a commit() that
+    # upserts everything received by id (overlapping windows never duplicate an IOC) and
+    # moves the high-water mark. Nothing is written before commit(), see otx_sync.pull_pulses.
+    state = load_state()
+    max_id = 0 if full else state.get("max_id", 0)
+    last_first_seen = None if full else state.get("max_first_seen")
+    days = days_to_request(last_first_seen)
+    # The "days" window moves with the clock, so the last request is repeated when replaying
+    # (the whole run, as it was) or while its response is fresh (see otx_sync.pull_pulses)
+    request = {"days": days, "max_id": max_id, "at": time.time()}
+    last = state.get("request")
+    if last and not full and feed_cache.repeat_last_request("threatfox", last.get("at")):
+        request = last
+        days = last["days"]
+        if feed_cache.replaying():
+            max_id = last["max_id"]
+    elif last_first_seen and days == MAX_DAYS:
+        print(f"[!] Last ThreatFox sync was more than {MAX_DAYS} days ago, older IOCs cannot be backfilled")
+
+    received = fetch_iocs(days, timeout=timeout, deadline=deadline)
+    delta = [ioc for ioc in received if int(ioc["id"]) > max_id]
+
+    new_max_id = max([max_id] + [int(ioc["id"]) for ioc in delta])
+    new_first_seen = max([last_first_seen or ""] + [ioc.get("first_seen") or "" for ioc in delta]) or None
+
+    def commit():
+        store = load_store()
+        store.update((str(ioc["id"]), ioc) for ioc in received)
+        _save_atomic(store_file, store)
+        # The whole window is upserted so last_seen moves for IOCs we already had
+        ioc_store.ingest_threatfox(received)
+        if feed_cache.replaying():
+            print(f"[*] ThreatFox sync: replayed {len(delta)} IOCs, sync state left as it was")
+            return
+        _save_atomic(state_file, {
+            "max_id": new_max_id,
+            "max_first_seen": new_first_seen,
+            "request": request,
+            "last_run": datetime.utcnow().isoformat(timespec="seconds"),
+            "iocs_in_last_run": len(delta),
+            "iocs_stored": len(store)
+        })
+        print(f"[+] ThreatFox sync: {len(delta)} new IOCs from a {days}-day window, {len(store)} stored")
+    return delta, commit
+
+def sync_iocs(full=False, timeout=30, deadline=None):
+    # Pull and commit in one go, for callers that keep no snapshot of their own
+    delta, commit = pull_iocs(full, timeout, deadline)
+    http_client.check_deadline(deadline, "ThreatFox sync")
+    commit()
+    return delta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally sync ThreatFox IOCs")
+    parser.add_argument("--full", action="store_true", help=f"ignore the watermark and re-pull the last {MAX_DAYS} days")
+    args = parser.parse_args()
+
+    print("[*] Syncing recent indicators from ThreatFox...")
+    sync_iocs(full=args.full)
@@ -0,0 +1,65 @@
+import sys
+import time
+import argparse
+import importlib
+from datetime import datetime
+from pathlib import Path
+import charts
+
+# === Paths ===
+script_path = Path(__file__).resolve()
+base_path = script_path.parent.parent  # Takes us to .../automated-threat-brief-generator
+visuals_path = base_path / "reports" / "visuals"
+
+# Every plotting script exposes figures() -> {name: chart spec}; the pack is all of them, drawn
+# headless in one process pool and written as images plus JSON sidecars.
+SOURCES = (
+    "plot_top_techniques",
+    "plot_malware_technique_graph",
+    "exec_combined_mitre_visual",
+    "exec_fintech_malware_CTI_graph"
+)
+
+def collect(sources=SOURCES):
+    figures = {}
+    for source in sources:
+        print(f"[*] {source}: collecting figures...")
+        try:
+            found = importlib.import_module(source).figures()
+        except Exception as e:
+            print(f"[!] {source} failed: {e}")
+            continue
+        figures.update(found)
+    return figures
+
+def build(directory=None, formats=("png", "svg"), processes=None, sources=SOURCES, graph=True):
+    # Writes reports/visuals/<date>/ and returns the written paths; graph adds the full
+    # malware-technique graph (GraphML, JSON and the HTML viewer, see graph_export.py)
+    directory = Path(directory) if directory else visuals_path / datetime.utcnow().strftime("%Y-%m-%d")
+    written = []
+    if graph:
+        import graph_export
+        try:
+            written += graph_export.export(directory)
+        except Exception as e:
+            print(f"[!] Graph export failed: {e}")
+    figures = collect(sources)
+    if not figures:
+        print("[-] No figures to render.")
+        return written
+    start = time.monotonic()
+    images = charts.export(figures, directory, formats, processes)
+    print(f"[+] Visual pack: {len(figures)} figures, {len(images)} images in {time.monotonic() - start:.2f}s -> {directory}")
+    return written + images
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every plotting script's figures headless, as images plus JSON sidecars")
+    parser.add_argument("--out", help="output directory, defaults to reports/visuals/<date>")
+    parser.add_argument("--format", nargs="+", choices=charts.FORMATS, default=list(charts.FORMATS), dest="formats")
+    parser.add_argument("--processes", type=int, help="worker processes for drawing, defaults to one per CPU")
+    parser.add_argument("--only", nargs="+", choices=SOURCES, default=list(SOURCES), help="only these plotting scripts")
+    parser.add_argument("--no-graph", action="store_true", help="skip the full graph export (GraphML and HTML viewer)")
+    args = parser.parse_args()
+
+    if not build(args.out, args.formats, args.processes, args.only, graph=not args.no_graph):
+        sys.exit(1)
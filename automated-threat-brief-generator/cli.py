@@ -0,0 +1,120 @@
+import sys
+import time
+import argparse
+import importlib
+from pathlib import Path
+
+# === Paths ===
+base_path = Path(__file__).resolve().parent  # .../automated-threat-brief-generator
+scripts_path = base_path / "Scripts"
+
+sys.path.insert(0, str(scripts_path))
+
+# One entry point for the individual steps:
+#   python cli.py fetch [otx threatfox abuseipdb]
+#   python cli.py map [--force]
+#   python cli.py report [--format markdown html mitre]
+#   python cli.py plot [--out DIR] [--format png svg] [--no-graph]
+# Building the parser imports nothing from Scripts/; each command imports only the modules it
+# needs once it runs, and those modules keep requests, stix2, taxii2client, matplotlib and
+# networkx out of their import path until they are actually used.
+# Choices are spelled out here rather than read from the modules, for the same reason.
+FEEDS = ("otx", "threatfox", "abuseipdb")
+REPORT_FORMATS = ("markdown", "html", "mitre")
+IMAGE_FORMATS = ("png", "svg")
+PLOT_SOURCES = (
+    "plot_top_techniques",
+    "plot_malware_technique_graph",
+    "exec_combined_mitre_visual",
+    "exec_fintech_malware_CTI_graph"
+)
+
+# Modules each command imports before doing any work (what bench_startup.py measures)
+MODULES = {
+    "fetch": ("fetch_all_feeds",),
+    "map": ("attack_cache", "mitre_stix_parser"),
+    "report": ("report_engine",),
+    "plot": ("visual_pack",)
+}
+
+def load(command):
+    return [importlib.import_module(name) for name in MODULES[command]]
+
+# === Commands ===
+def run_fetch(args):
+    fetch_all_feeds, = load("fetch")
+    feeds = {name: fetch_all_feeds.FEEDS[name] for name in args.feeds or FEEDS}
+    timeouts = {name: args.timeout for name in feeds} if args.timeout else None
+    start = time.monotonic()
+    if args.sequential:
+        results = fetch_all_feeds.run_feeds_sequentially(feeds, timeouts)
+    else:
+        results = fetch_all_feeds.run_feeds_concurrently(feeds, timeouts)
+    fetch_all_feeds.print_timings(results, time.monotonic() - start)
+    failed = [r.name for r in results.values() if r.error]
+    if failed:
+        print(f"\n[!] Feeds failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+def run_map(args):
+    # Compiled ATT&CK cache (STIX is only parsed when the bundle changed) plus the dated mapping exports
+    attack_cache, mitre_stix_parser = load("map")
+    cache = attack_cache.build_cache(args.path or attack_cache.MITRE_PATH, force=args.force)
+    output_path, groups_path = mitre_stix_parser.export_mappings(cache["software"], cache["groups"])
+    print(f"[+] Mapping exported to: {output_path}")
+    print(f"[+] Group mapping exported to: {groups_path}")
+    return 0
+
+def run_report(args):
+    report_engine, = load("report")
+    results = report_engine.generate(args.formats, args.processes)
+    return 0 if any(results.values()) else 1
+
+def run_plot(args):
+    visual_pack, = load("plot")
+    written = visual_pack.build(args.out, args.formats, args.processes, args.only, graph=not args.no_graph)
+    return 0 if written else 1
+
+COMMANDS = {
+    "fetch": run_fetch,
+    "map": run_map,
+    "report": run_report,
+    "plot": run_plot
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Automated threat brief: fetch feeds, map to ATT&CK, render reports and plots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="fetch the OTX, ThreatFox and AbuseIPDB feeds")
+    fetch.add_argument("feeds", nargs="*", help=f"only these feeds ({', '.join(FEEDS)}, default: all)")
+    fetch.add_argument("--sequential", action="store_true", help="fetch feeds one after another")
+    fetch.add_argument("--timeout", type=float, help="override the per-feed timeout (seconds)")
+
+    map_ = commands.add_parser("map", help="build the ATT&CK malware/group to technique mappings")
+    map_.add_argument("--path", help="ATT&CK bundle or folder (default: MITRE_ATTACK_PATH)")
+    map_.add_argument("--force", action="store_true", help="rebuild the compiled cache even if the bundle is unchanged")
+
+    report = commands.add_parser("report", help="render the Markdown, HTML and MITRE HTML reports")
+    report.add_argument("--format", nargs="+", choices=REPORT_FORMATS, default=list(REPORT_FORMATS), dest="formats")
+    report.add_argument("--processes", type=int, default=0, help="render the formats in this many worker processes")
+
+    plot = commands.add_parser("plot", help="render the plotting scripts' figures headless (the visual pack)")
+    plot.add_argument("--out", help="output directory, defaults to reports/visuals/<date>")
+    plot.add_argument("--format", nargs="+", choices=IMAGE_FORMATS, default=list(IMAGE_FORMATS), dest="formats")
+    plot.add_argument("--processes", type=int, help="worker processes for drawing, defaults to one per CPU")
+    plot.add_argument("--only", nargs="+", choices=PLOT_SOURCES, default=list(PLOT_SOURCES), help="only these plotting scripts")
+    plot.add_argument("--no-graph", action="store_true", help="skip the full graph export (GraphML and HTML viewer)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in getattr(args, "feeds", []) if name not in FEEDS]
+    if unknown:
+        parser.error(f"unknown feed {', '.join(unknown)} (expected {', '.join(FEEDS)})")
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+# === Paths ===
+base_path = Path(__file__).resolve().parent  # .../automated-threat-brief-generator
+scripts_path = base_path / "Scripts"
+data_path = base_path / "data"
+state_file = data_path / "pipeline_state.json"
+
+sys.path.insert(0, str(scripts_path))
+
+# fetch -> correlate -> map to ATT&CK -> aggregate -> render, plus the visual pack
+#
+# Every stage is keyed by a hash of its inputs: the output keys of the stages it depends on,
+# whatever extra input it declares and the code in Scripts/. A stage whose key matches the one
+# stored in data/pipeline_state.json is skipped and its previous output key is passed on.
+# Fetch stages always run (the feed cache keeps repeat runs off the network) and their output
+# key identifies the newest catalogued snapshot, so a fetch that brings nothing new
+# leaves everything downstream skipped.
+
+# === Stages ===
+class Stage:
+    def __init__(self, name, run, deps=(), key=None, output=None, source=False, required=True):
+        self.name = name
+        self.run = run          # does the work
+        self.deps = tuple(deps)
+        self.key = key          # extra input material, e.g. a content hash the stage reads
+        self.output = output    # output key after running, defaults to the input key
+        self.source = source    # fetch stages: always run, nothing upstream to compare
+        self.required = required  # optional stages fall back to their previous output on failure
+
+def _snapshot_key(source):
+    def output():
+        import snapshot_catalog
+        entry = snapshot_catalog.latest_entry(source)
+        # OTX and ThreatFox snapshots are deltas, so a new file is new data even if identical
+        return f"{entry['path'].name}|{entry['content_hash']}" if entry else "none"
+    return output
+
+def _fetch(feed):
+    def run():
+        import fetch_all_feeds
+        timeout = fetch_all_feeds.FEED_TIMEOUTS[feed]
+        fetch_all_feeds.FEEDS[feed](timeout=timeout, deadline=time.monotonic() + timeout)
+    return run
+
+def _attack_fingerprint():
+    import attack_cache
+    source = Path(attack_cache.MITRE_PATH)
+    return attack_cache.source_fingerprint(source) if source.exists() else "missing"
+
+def _map_attack():
+    # Compiled cache plus the dated mapping exports the reports read
+    import attack_cache
+    import mitre_stix_parser
+    cache = attack_cache.build_cache(attack_cache.MITRE_PATH)
+    mitre_stix_parser.export_mappings(cache["software"], cache["groups"])
+
+def _attack_output():
+    import attack_cache
+    manifest = attack_cache._read_manifest()
+    return manifest["source_hash"] if manifest else "none"
+
+def _correlate():
+    import correlation
+    correlation.corroborated(days=7)
+
+def _correlation_key():
+    import correlation
+    return correlation.window_key(days=7)
+
+def _aggregate():
+    import aggregates
+    aggregates.update()
+
+def _today():
+    # Reports cover the last 24h and 7 days, so they are rebuilt at least daily
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+def _render():
+    # One load of the data, every format rendered from it
+    import report_engine
+    report_engine.generate()
+
+def _visuals():
+    # Every plotting script's figures, drawn headless into reports/visuals/<date>/
+    import visual_pack
+    visual_pack.build()
+
+FEEDS = ("otx", "threatfox", "abuseipdb")
+FETCH_STAGES = tuple(f"fetch:{feed}" for feed in FEEDS)
+RENDER_INPUTS = FETCH_STAGES + ("correlate", "map", "aggregate")
+
+STAGES = {stage.name: stage for stage in [
+    *(Stage(f"fetch:{feed}", _fetch(feed), output=_snapshot_key(feed), source=True, required=False) for feed in FEEDS),
+    # The feeds are normalised into the IOC store as they sync (fetch stages); this stage only
+    # builds the cross-feed join of those indicators that the reports read
+    Stage("correlate", _correlate, FETCH_STAGES, key=_correlation_key),
+    Stage("map", _map_attack, key=_attack_fingerprint, output=_attack_output, required=False),
+    Stage("aggregate", _aggregate, ("fetch:otx", "fetch:threatfox", "map")),
+    Stage("render", _render, RENDER_INPUTS, key=_today),
+    Stage("visuals", _visuals, ("fetch:otx", "fetch:threatfox", "map"), key=_today, required=False),
+]}
+
+# === State ===
+def load_state():
+    if not state_file.exists():
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state):
+    data_path.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_name(f".{state_file.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, state_file)
+
+_code_key = None
+
+def code_key():
+    # One hash over Scripts/*.py, so editing any module re-runs the stages after it
+    global _code_key
+    if _code_key is None:
+        digest = hashlib.sha256()
+        for path in sorted(scripts_path.glob("*.py")):
+            digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+        _code_key = digest.hexdigest()
+    return _code_key
+
+def input_key(stage, outputs):
+    digest = hashlib.sha256(f"{stage.name}|{code_key()}\n".encode("utf-8"))
+    for dep in stage.deps:
+        digest.update(f"{dep}={outputs[dep]}\n".encode("utf-8"))
+    if stage.key:
+        digest.update(str(stage.key()).encode("utf-8"))
+    return digest.hexdigest()
+
+# === Runner ===
+def select(targets=None):
+    # The requested stages plus everything they depend on
+    if not targets:
+        return set(STAGES)
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage {name!r}, expected one of {', '.join(STAGES)}")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(STAGES[name].deps)
+    return selected
+
+def execute(stage, outputs, previous, force=False, fetch=True):
+    # Returns (status, input key, output key)
+    if stage.source and not fetch:
+        return "reused", None, stage.output()
+    key = input_key(stage, outputs)
+    if not stage.source and not force and previous.get("input") == key:
+        return "skipped", key, previous["output"]
+    try:
+        stage.run()
+    except Exception as e:
+        if stage.required:
+            raise
+        print(f"[!] {stage.name} failed ({e}), continuing with what is already on disk")
+        return "stale", previous.get("input"), stage.output() if stage.output else previous.get("output", "missing")
+    return "ran", key, stage.output() if stage.output else key
+
+def run_pipeline(targets=None, force=False, fetch=True, workers=None):
+    # Runs every selected stage once its dependencies are done, independent stages in parallel.
+    # Returns {stage: status}; a failed stage marks everything after it "blocked".
+    selected = select(targets)
+    state = load_state()
+    lock = threading.Lock()
+    outputs, statuses = {}, {}
+    waiting = {name: set(STAGES[name].deps) for name in selected}
+
+    def finish(name, status, key=None, output=None, elapsed=0.0):
+        statuses[name] = status
+        if output is not None:
+            outputs[name] = output
+        for deps in waiting.values():
+            deps.discard(name)
+        if status in ("ran", "stale"):
+            with lock:
+                state[name] = {
+                    "input": key,
+                    "output": output,
+                    "finished_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "elapsed": round(elapsed, 3)
+                }
+                save_state(state)
+
+    start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=workers or len(selected), thread_name_prefix="stage")
+    running = {}
+    try:
+        while waiting or running:
+            for name in [n for n, deps in waiting.items() if not deps]:
+                del waiting[name]
+                blocked = [dep for dep in STAGES[name].deps if statuses.get(dep) in ("failed", "blocked")]
+                if blocked:
+                    print(f"[-] {name}: blocked by {', '.join(blocked)}")
+                    finish(name, "blocked")
+                    continue
+                stage_start = time.monotonic()
+                future = pool.submit(execute, STAGES[name], dict(outputs), state.get(name, {}), force, fetch)
+                running[future] = (name, stage_start)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, stage_start = running.pop(future)
+                elapsed = time.monotonic() - stage_start
+                try:
+                    status, key, output = future.result()
+                except Exception as e:
+                    print(f"[!] {name} failed: {e}")
+                    finish(name, "failed", elapsed=elapsed)
+                    continue
+                if status == "ran":
+                    print(f"[+] {name} done in {elapsed:.2f}s")
+                elif status == "skipped":
+                    print(f"[*] {name}: inputs unchanged, skipped")
+                finish(name, status, key, output, elapsed)
+    finally:
+        pool.shutdown(wait=True)
+
+    ran = sum(status == "ran" for status in statuses.values())
+    print(f"\n[*] Pipeline finished in {time.monotonic() - start:.2f}s: {ran} of {len(statuses)} stages ran")
+    return statuses
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the threat brief pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument("stages", nargs="*", help=f"only run these stages and their dependencies ({', '.join(STAGES)})")
+    parser.add_argument("--force", action="store_true", help="re-run every selected stage")
+    parser.add_argument("--no-fetch", action="store_true", help="use the snapshots already on disk instead of fetching")
+    parser.add_argument("--workers", type=int, help="maximum number of stages running at once")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage {', '.join(unknown)} (expected {', '.join(STAGES)})")
+    statuses = run_pipeline(args.stages, force=args.force, fetch=not args.no_fetch, workers=args.workers)
+    if any(status in ("failed", "blocked") for status in statuses.values()):
+        sys.exit(1)
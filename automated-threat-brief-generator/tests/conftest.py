@@ -0,0 +1,34 @@
+import sys
+import shutil
+import importlib
+from pathlib import Path
+
+import pytest
+
+# === Paths ===
+tests_path = Path(__file__).resolve().parent
+scripts_path = tests_path.parent / "Scripts"
+
+# The scripts find data/ relative to their own file and read their settings from the
+# environment at import, so every test gets a fresh copy of Scripts/ under a temporary
+# directory and imports it from there: nothing a test does can touch the real data/.
+SCRIPT_MODULES = {path.stem for path in scripts_path.glob("*.py")}
+
+def _forget_scripts():
+    for name in SCRIPT_MODULES:
+        sys.modules.pop(name, None)
+
+@pytest.fixture
+def scripts(tmp_path, monkeypatch):
+    # Returns import(name) for modules of the copied tree; set env vars before importing
+    copy = tmp_path / "Scripts"
+    shutil.copytree(scripts_path, copy, ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setenv("CTI_CACHE_MODE", "off")
+    monkeypatch.syspath_prepend(str(copy))
+    _forget_scripts()
+    yield importlib.import_module
+    _forget_scripts()
+
+@pytest.fixture
+def data_path(tmp_path):
+    return tmp_path / "data"
@@ -0,0 +1,182 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Local stand-ins for the feed APIs, so the fetchers can be tested without the network.
+# Each runs a ThreadingHTTPServer on a free 127.0.0.1 port in a background thread:
+#
+#   with FeedStub() as feeds:
+#       feeds.delays["/otx"] = 1.5
+#       monkeypatch.setenv("OTX_URL", feeds.url("/otx"))
+#
+#   with TaxiiStandIn() as taxii:
+#       taxii.add(attack_pattern(1), "2020-01-01T00:00:00.000Z")
+#       mitre_taxii_parser.sync_collections(server_url=taxii.url("/taxii/"))
+
+# === Server Plumbing ===
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.stub.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.stub.handle(self, "POST")
+
+class StubServer:
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def url(self, path="/"):
+        return f"http://127.0.0.1:{self._server.server_port}{path}"
+
+    def handle(self, request, method):
+        parts = urlsplit(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        with self._lock:
+            self.requests.append((method, parts.path))
+        self.respond(request, method, parts, body)
+
+    def respond(self, request, method, parts, body):
+        raise NotImplementedError
+
+    @staticmethod
+    def send_json(request, payload, status=200, content_type="application/json", headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+# === Feeds ===
+def otx_pulse(n, modified="2026-10-01T00:00:00"):
+    return {"id": f"pulse-{n}", "name": f"Pulse {n}", "modified": modified, "created": modified,
+            "tags": ["stub"], "malware_family": "AsyncRAT",
+            "indicators": [{"indicator": f"evil{n}.example", "type": "domain", "created": modified}]}
+
+def threatfox_ioc(n, first_seen="2026-10-01 00:00:00 UTC"):
+    return {"id": str(1000 + n), "ioc": f"192.0.2.{n}:443", "ioc_type": "ip:port", "threat_type": "botnet_cc",
+            "malware": "win.lumma", "malware_printable": "Lumma Stealer", "confidence_level": 75,
+            "first_seen": first_seen}
+
+def abuseipdb_record(n):
+    return {"ipAddress": f"198.51.100.{n}", "abuseConfidenceScore": 100, "lastReportedAt": "2026-10-01T00:00:00+00:00"}
+
+class FeedStub(StubServer):
+    # OTX (GET /otx, one page), ThreatFox (POST /threatfox) and AbuseIPDB (GET /abuseipdb).
+    # delays[path] holds a response back, statuses[path] replaces it with an error status.
+    def __init__(self, records=3):
+        super().__init__()
+        self.delays = {}
+        self.statuses = {}
+        self.otx = [otx_pulse(n) for n in range(records)]
+        self.threatfox = [threatfox_ioc(n) for n in range(records)]
+        self.abuseipdb = [abuseipdb_record(n) for n in range(records)]
+
+    def env(self):
+        return {"OTX_URL": self.url("/otx"), "THREATFOX_URL": self.url("/threatfox"),
+                "ABUSEIPDB_URL": self.url("/abuseipdb"), "OTX_API_KEY": "stub",
+                "THREATFOX_API_KEY": "stub", "ABUSEIPDB_API_KEY": "stub"}
+
+    def respond(self, request, method, parts, body):
+        time.sleep(self.delays.get(parts.path, 0))
+        status = self.statuses.get(parts.path)
+        if status:
+            return self.send_json(request, {"error": "stub"}, status)
+        if parts.path == "/otx" and method == "GET":
+            return self.send_json(request, {"results": self.otx, "next": None})
+        if parts.path == "/threatfox" and method == "POST":
+            return self.send_json(request, {"query_status": "ok", "data": self.threatfox})
+        if parts.path == "/abuseipdb" and method == "GET":
+            return self.send_json(request, {"data": self.abuseipdb})
+        self.send_json(request, {"error": "not found"}, 404)
+
+# === TAXII ===
+TAXII = "application/vnd.oasis.taxii+json; version=2.0"
+STIX = "application/vnd.oasis.stix+json; version=2.0"
+
+def attack_pattern(n, modified="2020-01-01T00:00:00.000Z"):
+    return {"type": "attack-pattern", "id": f"attack-pattern--00000000-0000-4000-8000-{n:012d}",
+            "created": modified, "modified": modified, "name": f"Technique {n}",
+            "external_references": [{"source_name": "mitre-attack", "external_id": f"T{1000 + n}"}]}
+
+class TaxiiStandIn(StubServer):
+    # A TAXII 2.0 server with one API root (/api1/) holding the ATT&CK collections. add() puts
+    # an object in a collection with the date_added the server reports for it; the objects
+    # endpoint filters on added_after, pages by Range and sends X-TAXII-Date-Added-First/Last.
+    COLLECTIONS = {
+        "Enterprise ATT&CK": "95ecc380-afe9-11e4-9b6c-751b66dd541e",
+        "Mobile ATT&CK": "2f669986-b40b-4423-b720-4396ca6a462b",
+        "ICS ATT&CK": "02c3ef24-9cd4-48f3-a99f-b74ce24f1d34",
+    }
+
+    def __init__(self, added_headers=True):
+        super().__init__()
+        self.added_headers = added_headers
+        self.added = {title: [] for title in self.COLLECTIONS}
+        self.objects_requests = []
+
+    def add(self, obj, date_added, title="Enterprise ATT&CK"):
+        with self._lock:
+            self.added[title].append((date_added, obj))
+            self.added[title].sort(key=lambda entry: entry[0])
+
+    def _collection(self, title):
+        return {"id": self.COLLECTIONS[title], "title": title, "can_read": True, "can_write": False,
+                "media_types": [STIX]}
+
+    def respond(self, request, method, parts, body):
+        if parts.path == "/taxii/":
+            return self.send_json(request, {"title": "Stand-in", "api_roots": [self.url("/api1/")]}, content_type=TAXII)
+        if parts.path == "/api1/":
+            return self.send_json(request, {"title": "ATT&CK", "versions": ["taxii-2.0"],
+                                            "max_content_length": 10 ** 9}, content_type=TAXII)
+        if parts.path == "/api1/collections/":
+            return self.send_json(request, {"collections": [self._collection(t) for t in self.COLLECTIONS]},
+                                  content_type=TAXII)
+        for title, collection_id in self.COLLECTIONS.items():
+            if parts.path == f"/api1/collections/{collection_id}/":
+                return self.send_json(request, self._collection(title), content_type=TAXII)
+            if parts.path == f"/api1/collections/{collection_id}/objects/":
+                return self._objects(request, title, parse_qs(parts.query))
+        self.send_json(request, {"title": "not found"}, 404, content_type=TAXII)
+
+    def _objects(self, request, title, query):
+        added_after = query.get("added_after", [""])[0]
+        with self._lock:
+            self.objects_requests.append((title, added_after or None))
+            entries = [entry for entry in self.added[title] if entry[0] > added_after]
+        total = len(entries)
+        status, headers = 200, {}
+        if request.headers.get("Range"):
+            first, last = (int(n) for n in request.headers["Range"].split("=")[1].split("-"))
+            entries = entries[first:last + 1]
+            status = 206
+            headers["Content-Range"] = (f"items {first}-{first + len(entries) - 1}/{total}" if entries
+                                        else f"items */{total}")
+        if entries and self.added_headers:
+            headers["X-TAXII-Date-Added-First"] = entries[0][0]
+            headers["X-TAXII-Date-Added-Last"] = entries[-1][0]
+        bundle = {"type": "bundle", "id": "bundle--00000000-0000-4000-8000-000000000000",
+                  "spec_version": "2.0", "objects": [obj for _, obj in entries]}
+        self.send_json(request, bundle, status, content_type=STIX, headers=headers)
@@ -0,0 +1,117 @@
+import time
+import threading
+
+import pytest
+
+from stub_servers import FeedStub
+
+DELAY = 0.6
+
+@pytest.fixture
+def feeds(monkeypatch):
+    with FeedStub() as stub:
+        for name, value in stub.env().items():
+            monkeypatch.setenv(name, value)
+        yield stub
+
+def _snapshot_sources(scripts):
+    catalog = scripts("snapshot_catalog")
+    return {source for source in ("otx", "threatfox", "abuseipdb") if catalog.latest(source)}
+
+def _wait_for_feed_threads(timeout=5):
+    # A timed-out feed keeps running in its worker until it notices the deadline
+    end = time.monotonic() + timeout
+    while any(t.name.startswith("feed") for t in threading.enumerate()) and time.monotonic() < end:
+        time.sleep(0.05)
+
+# === Concurrency ===
+def test_concurrent_fetch_takes_about_the_slowest_feed(feeds, scripts):
+    for path in ("/otx", "/threatfox", "/abuseipdb"):
+        feeds.delays[path] = DELAY
+    fetch_all_feeds = scripts("fetch_all_feeds")
+
+    start = time.monotonic()
+    results = fetch_all_feeds.run_feeds_concurrently()
+    elapsed = time.monotonic() - start
+
+    assert all(result.error is None for result in results.values())
+    assert [len(result.data) for result in results.values()] == [3, 3, 3]
+    assert elapsed < 2 * DELAY
+    assert _snapshot_sources(scripts) == {"otx", "threatfox", "abuseipdb"}
+
+def test_sequential_fetch_takes_the_sum_of_the_feeds(feeds, scripts):
+    for path in ("/otx", "/threatfox", "/abuseipdb"):
+        feeds.delays[path] = DELAY
+    fetch_all_feeds = scripts("fetch_all_feeds")
+
+    start = time.monotonic()
+    results = fetch_all_feeds.run_feeds_sequentially()
+    elapsed = time.monotonic() - start
+
+    assert all(result.error is None for result in results.values())
+    assert elapsed >= 3 * DELAY
+
+# === Isolation ===
+def test_failing_feed_does_not_affect_the_others(feeds, scripts):
+    feeds.statuses["/otx"] = 404
+    fetch_all_feeds = scripts("fetch_all_feeds")
+
+    results = fetch_all_feeds.run_feeds_concurrently()
+
+    assert "404" in results["otx"].error
+    assert results["threatfox"].error is None and len(results["threatfox"].data) == 3
+    assert results["abuseipdb"].error is None and len(results["abuseipdb"].data) == 3
+    assert _snapshot_sources(scripts) == {"threatfox", "abuseipdb"}
+
+def test_slow_feed_times_out_alone(feeds, scripts):
+    feeds.delays["/abuseipdb"] = 3
+    fetch_all_feeds = scripts("fetch_all_feeds")
+
+    start = time.monotonic()
+    results = fetch_all_feeds.run_feeds_concurrently(timeouts={"abuseipdb": 0.5})
+    elapsed = time.monotonic() - start
+    _wait_for_feed_threads()
+
+    assert results["abuseipdb"].error == "timed out after 0.5s"
+    assert results["otx"].error is None and results["threatfox"].error is None
+    assert elapsed < 1.5
+    assert _snapshot_sources(scripts) == {"otx", "threatfox"}
+
+# === Deadlines ===
+def test_timed_out_feed_writes_nothing(feeds, scripts, data_path):
+    feeds.delays["/otx"] = 1.5
+    feeds.delays["/threatfox"] = 1.5
+    fetch_all_feeds = scripts("fetch_all_feeds")
+
+    results = fetch_all_feeds.run_feeds_concurrently(timeouts={"otx": 0.5, "threatfox": 0.5})
+    _wait_for_feed_threads()
+
+    assert results["otx"].error and results["threatfox"].error
+    assert _snapshot_sources(scripts) == {"abuseipdb"}
+    # The watermarks did not move, so the next run asks for the same records again
+    assert not (data_path / "otx_sync_state.json").exists()
+    assert not (data_path / "threatfox_sync_state.json").exists()
+    assert not (data_path / "otx_pulse_store.json").exists()
+
+def test_deadline_is_checked_before_anything_is_written(feeds, scripts, data_path):
+    fetch_all_feeds = scripts("fetch_all_feeds")
+    http_client = scripts("http_client")
+
+    with pytest.raises(http_client.DeadlineExceeded):
+        fetch_all_feeds.fetch_otx(deadline=time.monotonic())
+
+    assert not (data_path / "otx_sync_state.json").exists()
+    assert _snapshot_sources(scripts) == set()
+
+def test_snapshot_is_saved_before_the_watermark_moves(feeds, scripts, data_path, monkeypatch):
+    # A slow commit past the deadline still finishes: the check happens before any write
+    fetch_all_feeds = scripts("fetch_all_feeds")
+    ioc_store = scripts("ioc_store")
+    ingest = ioc_store.ingest_otx
+    monkeypatch.setattr(ioc_store, "ingest_otx", lambda pulses: (time.sleep(0.6), ingest(pulses))[1])
+
+    data = fetch_all_feeds.fetch_otx(deadline=time.monotonic() + 0.5)
+
+    assert len(data) == 3
+    assert _snapshot_sources(scripts) == {"otx"}
+    assert (data_path / "otx_sync_state.json").exists()
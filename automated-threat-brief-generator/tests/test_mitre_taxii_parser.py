@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from stub_servers import TaxiiStandIn, attack_pattern
+
+# Dates the stand-in reports are years behind this machine's clock, as a lagging server would be
+JAN = "2020-01-15T00:00:00.000Z"
+FEB = "2020-02-15T00:00:00.000Z"
+MAR = "2020-03-15T00:00:00.000Z"
+
+@pytest.fixture
+def taxii():
+    with TaxiiStandIn() as stand_in:
+        yield stand_in
+
+def _sync(scripts, taxii, **kwargs):
+    mitre_taxii_parser = scripts("mitre_taxii_parser")
+    return mitre_taxii_parser.sync_collections(server_url=taxii.url("/taxii/"), **kwargs)
+
+def _bundle_ids(data_path):
+    with open(data_path / "attack" / "enterprise-attack.json", "r", encoding="utf-8") as f:
+        return {obj["id"] for obj in json.load(f)["objects"]}
+
+def _state(data_path):
+    with open(data_path / "attack" / "taxii_state.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# === Watermark ===
+def test_watermark_is_the_servers_last_date_added(taxii, scripts, data_path):
+    taxii.add(attack_pattern(1), JAN)
+    taxii.add(attack_pattern(2), FEB)
+
+    results = _sync(scripts, taxii)
+
+    assert results["enterprise"]["added_after"] == FEB
+    assert _state(data_path)["enterprise"]["added_after"] == FEB
+    assert _bundle_ids(data_path) == {attack_pattern(1)["id"], attack_pattern(2)["id"]}
+
+def test_object_added_with_a_date_behind_the_client_is_fetched_next_time(taxii, scripts, data_path):
+    taxii.add(attack_pattern(1), JAN)
+    _sync(scripts, taxii)
+
+    # Added after the first sync, but dated long before this machine's "now"
+    taxii.add(attack_pattern(2), MAR)
+    results = _sync(scripts, taxii)
+
+    assert taxii.objects_requests[-1] == ("Enterprise ATT&CK", JAN)
+    assert results["enterprise"]["added_after"] == MAR
+    assert _bundle_ids(data_path) == {attack_pattern(1)["id"], attack_pattern(2)["id"]}
+
+def test_watermark_is_the_max_across_pages(taxii, scripts, data_path):
+    for n, month in enumerate(("01", "02", "03", "04", "05")):
+        taxii.add(attack_pattern(n), f"2020-{month}-01T00:00:00.000Z")
+    mitre_taxii_parser = scripts("mitre_taxii_parser")
+    mitre_taxii_parser.PAGE_SIZE = 2
+
+    results = mitre_taxii_parser.sync_collections(server_url=taxii.url("/taxii/"))
+
+    assert len(taxii.objects_requests) == 3
+    assert results["enterprise"]["added_after"] == "2020-05-01T00:00:00.000Z"
+    assert results["enterprise"]["objects"] == 5
+
+def test_nothing_new_keeps_the_watermark(taxii, scripts, data_path):
+    taxii.add(attack_pattern(1), JAN)
+    _sync(scripts, taxii)
+
+    results = _sync(scripts, taxii)
+
+    assert results["enterprise"]["added_after"] == JAN
+    assert results["enterprise"]["objects"] == 1
+
+def test_server_date_is_used_without_the_date_added_headers(scripts, data_path):
+    with TaxiiStandIn(added_headers=False) as taxii:
+        taxii.add(attack_pattern(1), JAN)
+        before = datetime.utcnow().replace(microsecond=0) - timedelta(seconds=1)
+        results = _sync(scripts, taxii)
+
+    watermark = datetime.strptime(results["enterprise"]["added_after"], "%Y-%m-%dT%H:%M:%S.000Z")
+    assert before <= watermark <= datetime.utcnow()